@@ -6,6 +6,10 @@ from flask_login import LoginManager
 from flask_mail import Mail
 from models import db, User
 from config import config
+from utils.sqlite import init_sqlite
+from utils.event_buffer import init_event_buffer
+from utils.passwords import init_password_hasher
+from utils.user_cache import init_user_cache, load_session_user
 import os
 import logging
 
@@ -21,8 +25,8 @@ mail = Mail()
 
 @login_manager.user_loader
 def load_user(user_id):
-    """Load user by ID"""
-    return User.query.get(int(user_id))
+    """Load user by ID (from the per-worker cache, see utils.user_cache)"""
+    return load_session_user(int(user_id))
 
 
 def create_app(config_name=None):
@@ -37,6 +41,12 @@ def create_app(config_name=None):
 
     # Initialize extensions
     db.init_app(app)
+    with app.app_context():
+        # PRAGMA profile, read pool and write retries for SQLite (before the first connection)
+        init_sqlite(app, db.engine)
+    init_event_buffer(app)
+    init_password_hasher(app)
+    init_user_cache(app)
     login_manager.init_app(app)
     mail.init_app(app)
 
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+PiggyBankPC Leaderboard - Results Extraction Benchmark
+Times the table-driven extractor (utils.results) against the hand-written one
+it replaced, over a corpus of .pbr files - a directory of real uploads, or a
+generated mix of legacy single-run, multi-configuration, Phase 2 and partial
+packages. Files are decoded up front, so only extraction is timed:
+
+    python bench_extraction.py
+    python bench_extraction.py /backups/uploads --repeat 5
+    python bench_extraction.py --files 5000
+"""
+import argparse
+import logging
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from security import BenchmarkSecurity
+from utils.results import extract_submission_data
+
+# Columns the new table deliberately reads differently: per-run thermal metrics
+# now take precedence over the Phase 2 gpu_metrics instead of being overwritten
+PRECEDENCE_CHANGES = {'gpu_temp_avg', 'gpu_temp_max'}
+
+THERMAL_KEYS = [f"{part}_{kind}_{stat}" for part in ('gpu', 'cpu') for kind in ('temp', 'util')
+                for stat in ('min', 'avg', 'max')]
+
+
+def baseline_extract(validated_results):
+    """The hand-written extractor from routes/submit.py, kept as the baseline"""
+    results = validated_results.get('results', {})
+    system_info = results.get('system_info', {})
+    fps_data = results.get('fps', {})
+    ai_data = results.get('ai', {})
+    cpu_data = results.get('cpu', {})
+
+    cpu = system_info.get('cpu', {})
+    gpu = system_info.get('gpu', {})
+    ram = system_info.get('ram', {})
+
+    cpu_max_mhz = cpu.get('max_mhz', '')
+    cpu_clock_speed = None
+    if cpu_max_mhz:
+        try:
+            mhz_value = float(cpu_max_mhz)
+            if mhz_value >= 1000:
+                cpu_clock_speed = f"{mhz_value / 1000:.2f} GHz"
+            else:
+                cpu_clock_speed = f"{mhz_value} MHz"
+        except (ValueError, TypeError):
+            cpu_clock_speed = str(cpu_max_mhz)
+
+    ram_speed = ram.get('speed', '')
+    ram_speed_mhz = None
+    if ram_speed and isinstance(ram_speed, str):
+        try:
+            speed_parts = ram_speed.split()
+            if speed_parts:
+                ram_speed_mhz = int(speed_parts[0])
+        except (ValueError, IndexError):
+            pass
+
+    data = {
+        'hardware_fingerprint': validated_results.get('hardware_fingerprint', ''),
+        'cpu_model': cpu.get('model', 'Unknown'),
+        'cpu_cores': cpu.get('cores'),
+        'cpu_threads': cpu.get('threads'),
+        'cpu_clock_speed': cpu_clock_speed,
+        'gpu_model': gpu.get('model', 'Unknown'),
+        'gpu_price': system_info.get('gpu_price', 0.0),
+        'ram_total': ram.get('total', 'Unknown'),
+        'ram_type': ram.get('type'),
+        'ram_speed_mhz': ram_speed_mhz,
+        'benchmark_version': validated_results.get('version', '1.0.0'),
+        'benchmark_timestamp': validated_results.get('timestamp', '')
+    }
+
+    if fps_data.get('status') == 'completed':
+        if 'configurations' in fps_data and fps_data['configurations']:
+            best_config = None
+            best_fps = 0
+            for config_data in fps_data['configurations'].values():
+                if config_data.get('average_fps', 0) > best_fps:
+                    best_fps = config_data.get('average_fps', 0)
+                    best_config = config_data
+
+            if best_config:
+                data['fps_avg'] = best_config.get('average_fps', 0.0)
+                data['fps_min'] = best_config.get('min_fps', 0.0)
+                data['fps_max'] = best_config.get('max_fps', 0.0)
+                data['fps_resolution'] = best_config.get('resolution', '')
+                data['fps_quality'] = best_config.get('quality', '')
+
+                thermal_metrics = best_config.get('thermal_metrics', {})
+                if thermal_metrics:
+                    for key in THERMAL_KEYS:
+                        data[key] = thermal_metrics.get(key)
+        else:
+            data['fps_avg'] = fps_data.get('average_fps', 0.0)
+            data['fps_min'] = fps_data.get('min_fps', 0.0)
+            data['fps_max'] = fps_data.get('max_fps', 0.0)
+
+            thermal_metrics = fps_data.get('thermal_metrics', {})
+            if thermal_metrics:
+                for key in THERMAL_KEYS:
+                    data[key] = thermal_metrics.get(key)
+
+    gpu_metrics = fps_data.get('gpu_metrics', {})
+    if gpu_metrics:
+        data['gpu_temp_max'] = gpu_metrics.get('temp_max', 0.0)
+        data['gpu_temp_avg'] = gpu_metrics.get('temp_avg', 0.0)
+        data['gpu_load_avg'] = gpu_metrics.get('load_avg', 0.0)
+
+    if ai_data.get('status') == 'completed':
+        data['ai_tokens_per_sec'] = ai_data.get('tokens_per_second', 0.0)
+
+    if cpu_data.get('status') == 'completed':
+        if cpu_data.get('benchmark_type') == 'geekbench':
+            data['cpu_score'] = cpu_data.get('multi_core_score', 0.0)
+        else:
+            data['cpu_score'] = cpu_data.get('events_per_second', 0.0)
+
+    return data
+
+
+def make_data_package(rng):
+    """One results package, in a randomly chosen client format"""
+    thermal = {key: round(rng.uniform(30, 95), 1) for key in THERMAL_KEYS}
+    fps = {'status': 'completed'}
+
+    layout = rng.choice(['legacy', 'configurations', 'configurations', 'phase2', 'failed'])
+    if layout == 'configurations':
+        fps['configurations'] = {
+            f"{resolution}_{quality}": {
+                'average_fps': round(rng.uniform(20, 200), 2),
+                'min_fps': 15.0,
+                'max_fps': 240.0,
+                'resolution': resolution,
+                'quality': quality,
+                'thermal_metrics': thermal
+            }
+            for resolution in ('720p', '1080p', '1440p') for quality in ('Low', 'Ultra')
+        }
+    elif layout == 'failed':
+        fps['status'] = 'failed'
+    else:
+        fps.update(average_fps=round(rng.uniform(20, 200), 2), min_fps=15.0, max_fps=240.0,
+                   resolution='1080p', quality='High', thermal_metrics=thermal)
+        if layout == 'phase2':
+            fps['gpu_metrics'] = {'temp_max': 85.0, 'temp_avg': 82.5, 'load_avg': 75.0}
+
+    return {
+        'version': BenchmarkSecurity.VERSION,
+        'timestamp': '2025-10-25T20:45:00',
+        'hardware_fingerprint': f"{rng.getrandbits(256):064x}",
+        'results': {
+            'system_info': {
+                'cpu': {'model': 'AMD Ryzen 5 5600X', 'cores': 6, 'threads': 12, 'max_mhz': '4650.0000'},
+                'gpu': {'model': 'NVIDIA GeForce RTX 3060'},
+                'ram': {'total': '32GB', 'type': 'DDR4', 'speed': '3200 MT/s'},
+                'gpu_price': 250.0
+            },
+            'fps': fps,
+            'ai': {'status': rng.choice(['completed', 'skipped']), 'tokens_per_second': 41.5},
+            'cpu': rng.choice([
+                {'status': 'completed', 'benchmark_type': 'sysbench', 'events_per_second': 8500.0},
+                {'status': 'completed', 'benchmark_type': 'geekbench', 'multi_core_score': 9800.0},
+                {'status': 'skipped'}
+            ])
+        }
+    }
+
+
+def generate_corpus(security, directory, count, seed=0):
+    """Write `count` signed .pbr files into `directory`"""
+    rng = random.Random(seed)
+    for i in range(count):
+        container = security.pack_container(make_data_package(rng))['container']
+        (directory / f"sample_{i:05d}.pbr").write_bytes(container)
+
+
+def load_corpus(security, directory):
+    """Decode every valid .pbr file under `directory`"""
+    packages = []
+    for path in sorted(directory.rglob('*.pbr')):
+        results = security.validate_submission_content(path.read_bytes())
+        if results is not None:
+            packages.append(results)
+    return packages
+
+
+def time_extractor(extract, packages, repeat):
+    """Best-of-`repeat` seconds to extract the whole corpus"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for package in packages:
+            extract(package)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def count_differences(packages):
+    """Columns where the two extractors disagree, split into expected and unexpected"""
+    expected = unexpected = 0
+    for package in packages:
+        old = baseline_extract(package)
+        new = extract_submission_data(package).as_dict()
+        for column, value in new.items():
+            if old.get(column) != value:
+                if column in PRECEDENCE_CHANGES:
+                    expected += 1
+                else:
+                    unexpected += 1
+                    print(f"   ⚠️  {column}: {old.get(column)!r} -> {value!r}")
+    return expected, unexpected
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark .pbr results extraction')
+    parser.add_argument('directory', nargs='?', help='Directory of .pbr files (default: generate a corpus)')
+    parser.add_argument('--files', type=int, default=2000, help='Generated corpus size (default: 2000)')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement (best is kept)')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    security = BenchmarkSecurity(base_dir='.')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(args.directory) if args.directory else Path(tmp)
+        if not args.directory:
+            generate_corpus(security, directory, args.files)
+        packages = load_corpus(security, directory)
+
+    if not packages:
+        print(f"❌ No valid .pbr files in {directory}")
+        return
+
+    print(f"📦 {len(packages)} packages")
+    expected, unexpected = count_differences(packages)
+    print(f"   {expected} thermal columns now read from the run before gpu_metrics, {unexpected} other differences")
+
+    extractors = (
+        ('hand-written', baseline_extract),
+        ('table-driven', extract_submission_data),
+        # What the routes pay: the record is turned into Submission(**kwargs)
+        ('+ as_dict()', lambda package: extract_submission_data(package).as_dict())
+    )
+    for name, extract in extractors:
+        elapsed = time_extractor(extract, packages, args.repeat)
+        print(f"{name:>13}: {elapsed * 1e6 / len(packages):7.2f} µs/file  ({len(packages) / elapsed:,.0f} files/s)")
+
+
+if __name__ == '__main__':
+    main()
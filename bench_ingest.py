@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+PiggyBankPC Leaderboard - Ingest Write-Lock Benchmark
+Uploads signed .pbr files through the real /submit route from several processes
+at once (standing in for gunicorn workers) against one SQLite file, then drains
+the post-upload jobs the same way. Reports commits per unit of work, how long
+each transaction held the SQLite write lock, and uploads/jobs per second:
+
+    python bench_ingest.py                          # 4 workers x 50 uploads
+    python bench_ingest.py --workers 4 --uploads 200
+"""
+import argparse
+import base64
+import hashlib
+import hmac
+import io
+import json
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+
+# SQL that takes the SQLite write lock (pysqlite defers BEGIN until the first one)
+WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+def make_pbr(signing_key, fingerprint, fps_avg):
+    """Build a signed .pbr file body the way the benchmark client does"""
+    data = {
+        'version': '1.0.0',
+        'timestamp': '2025-10-25T20:45:00',
+        'hardware_fingerprint': fingerprint,
+        'results': {
+            'system_info': {
+                'cpu': {'model': 'AMD Ryzen 5 5600', 'cores': 6, 'threads': 12, 'max_mhz': '4400'},
+                'gpu': {'model': 'NVIDIA GeForce RTX 3060'},
+                'ram': {'total': '16GB', 'type': 'DDR4', 'speed': '3200 MT/s'},
+                'gpu_price': 150.0
+            },
+            'fps': {
+                'status': 'completed',
+                'configurations': {
+                    '1080p_high': {
+                        'average_fps': fps_avg, 'min_fps': fps_avg * 0.7, 'max_fps': fps_avg * 1.3,
+                        'resolution': '1920x1080', 'quality': 'High',
+                        'thermal_metrics': {'gpu_temp_max': 72.0, 'cpu_temp_max': 96.0, 'gpu_util_avg': 80.0}
+                    }
+                }
+            },
+            'ai': {'status': 'completed', 'tokens_per_second': 25.0},
+            'cpu': {'status': 'completed', 'events_per_second': 9000.0}
+        }
+    }
+    signature = hmac.new(
+        signing_key.encode(),
+        json.dumps(data, sort_keys=True).encode(),
+        hashlib.sha256
+    ).hexdigest()
+    package = {'data': data, 'signature': signature, 'signature_algorithm': 'HMAC-SHA256'}
+    return base64.b64encode(json.dumps(package).encode())
+
+
+def track_write_locks(engine):
+    """
+    Record, per committed transaction, the seconds from when its first write got the
+    lock to the end of its commit - the window in which every other writer is locked out
+    """
+    holds = []
+    started = {}
+
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if 'at' not in started and statement.lstrip().upper().startswith(WRITE_PREFIXES):
+            started['at'] = time.perf_counter()
+
+    @event.listens_for(Session, 'after_commit')
+    def after_commit(session):
+        if 'at' in started:
+            holds.append(time.perf_counter() - started.pop('at'))
+
+    @event.listens_for(Session, 'after_rollback')
+    def after_rollback(session):
+        started.pop('at', None)
+
+    return holds
+
+
+def bench_worker(worker_number, user_id, uploads, barrier, results):
+    """One 'gunicorn worker': upload, wait for the others, then run jobs"""
+    from app import create_app
+    from models import db
+    from utils.jobs import run_pending_jobs
+    import utils.pipeline  # noqa: F401 - registers the pipeline job handlers
+
+    app = create_app()
+    app.logger.setLevel('ERROR')
+    client = app.test_client()
+
+    with app.app_context():
+        holds = track_write_locks(db.engine)
+
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+
+    fingerprint = hashlib.sha256(f"bench-{worker_number}".encode()).hexdigest()
+    files = [
+        make_pbr(app.config['BENCHMARK_SECURITY_KEY'], fingerprint, 50.0 + i)
+        for i in range(uploads)
+    ]
+
+    barrier.wait()
+    upload_started = time.time()
+    failed = 0
+    for i, body in enumerate(files):
+        response = client.post('/submit', data={
+            'pbr_file': (io.BytesIO(body), f'bench_{worker_number}_{i}.pbr')
+        }, content_type='multipart/form-data')
+        if not response.headers.get('Location', '').startswith('/submission/'):
+            failed += 1
+    upload_finished = time.time()
+    upload_holds = list(holds)
+    holds.clear()
+
+    barrier.wait()
+    jobs_started = time.time()
+    with app.app_context():
+        jobs = run_pending_jobs(worker_id=f"bench:{worker_number}")
+    jobs_finished = time.time()
+
+    results.put({
+        'failed': failed,
+        'upload_window': (upload_started, upload_finished),
+        'upload_holds': upload_holds,
+        'jobs': jobs,
+        'job_window': (jobs_started, jobs_finished),
+        'job_holds': list(holds)
+    })
+
+
+def summarize(label, count, holds, windows):
+    """Print one phase's throughput and lock-hold distribution"""
+    elapsed = max(end for _, end in windows) - min(start for start, _ in windows)
+    holds_ms = sorted(h * 1000 for h in holds)
+    p95 = holds_ms[int(len(holds_ms) * 0.95) - 1] if holds_ms else 0.0
+
+    print(f"\n{label}")
+    print(f"  {count} in {elapsed:.2f}s = {count / elapsed:.1f}/s")
+    print(f"  write transactions: {len(holds_ms)} ({len(holds_ms) / max(count, 1):.2f} per unit of work)")
+    if holds_ms:
+        print(f"  write-lock hold: median {statistics.median(holds_ms):.2f}ms, "
+              f"p95 {p95:.2f}ms, max {holds_ms[-1]:.2f}ms, "
+              f"total {sum(holds_ms):.0f}ms ({sum(holds_ms) / 10 / elapsed:.0f}% of wall time)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark concurrent submission ingest on SQLite')
+    parser.add_argument('--workers', type=int, default=4, help='Concurrent worker processes (default: 4)')
+    parser.add_argument('--uploads', type=int, default=50, help='Uploads per worker (default: 50)')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='piggybank-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{workdir}/bench.db"
+    os.environ['UPLOAD_FOLDER'] = f"{workdir}/uploads"
+    os.environ['FLASK_ENV'] = 'development'
+
+    from app import create_app
+    from models import db, User
+
+    app = create_app()
+    with app.app_context():
+        users = []
+        for n in range(args.workers):
+            user = User(username=f'bench{n}', email=f'bench{n}@example.com', email_verified=True)
+            user.password_hash = 'x'  # never logs in through the form
+            users.append(user)
+        db.session.add_all(users)
+        db.session.commit()
+        user_ids = [user.id for user in users]
+        db.engine.dispose()  # don't share the parent's connections with forked workers
+
+    barrier = multiprocessing.Barrier(args.workers)
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=bench_worker, args=(n, user_ids[n], args.uploads, barrier, results))
+        for n in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    reports = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    print(f"Database: {workdir}/bench.db - {args.workers} workers x {args.uploads} uploads")
+    failed = sum(r['failed'] for r in reports)
+    if failed:
+        print(f"  ⚠️  {failed} uploads failed")
+
+    summarize(
+        'Upload requests (verify, insert, rank, enqueue)',
+        args.workers * args.uploads - failed,
+        [h for r in reports for h in r['upload_holds']],
+        [r['upload_window'] for r in reports]
+    )
+    summarize(
+        'Pipeline jobs (diagnostics, improvements, achievements)',
+        sum(r['jobs'] for r in reports),
+        [h for r in reports for h in r['job_holds']],
+        [r['job_window'] for r in reports]
+    )
+
+
+if __name__ == '__main__':
+    main()
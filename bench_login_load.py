@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+PiggyBankPC Leaderboard - Login Load Test
+Processes standing in for gunicorn sync workers serve leaderboard pages while
+others log users in continuously, first hashing passwords inside the web
+worker and then in the niced hashing pool from utils/passwords.py. Reports
+leaderboard latency percentiles and login throughput for each:
+
+    python bench_login_load.py                       # 3 page + 1 login workers, 10s
+    python bench_login_load.py --page-workers 3 --login-workers 3 --seconds 20
+    python bench_login_load.py --profile pool
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+
+# Config overrides per profile (applied before create_app() reads them)
+PROFILES = {
+    'inline': {'PASSWORD_HASH_WORKERS': 0},
+    'pool': {},
+}
+
+
+def configure(profile):
+    from config import Config
+    for name, value in PROFILES[profile].items():
+        setattr(Config, name, value)
+
+
+def page_worker(profile, seconds, barrier, results):
+    """One 'gunicorn worker' serving the leaderboard, each request timed"""
+    configure(profile)
+    from app import create_app
+
+    app = create_app()
+    client = app.test_client()
+
+    latencies = []
+    barrier.wait()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        client.get('/leaderboard').get_data()
+        latencies.append(time.perf_counter() - started)
+
+    results.put(('page', latencies))
+
+
+def login_worker(profile, seconds, usernames, barrier, results):
+    """One 'gunicorn worker' handling nothing but logins"""
+    configure(profile)
+    from app import create_app
+
+    app = create_app()
+
+    latencies = []
+    failed = 0
+    barrier.wait()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        username = usernames[len(latencies) % len(usernames)]
+        started = time.perf_counter()
+        response = app.test_client().post('/login', data={'username': username, 'password': 'password123'})
+        latencies.append(time.perf_counter() - started)
+        if response.status_code != 302:
+            failed += 1
+
+    app.extensions['password_hasher'].shutdown()
+    results.put(('login', latencies, failed))
+
+
+def run_profile(profile, args):
+    """Run page and login workers together against a fresh database"""
+    workdir = tempfile.mkdtemp(prefix=f'piggybank-login-{profile}-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{workdir}/bench.db"
+    os.environ['UPLOAD_FOLDER'] = f"{workdir}/uploads"
+
+    configure(profile)
+    from app import create_app
+    from models import db, User
+
+    app = create_app()
+    with app.app_context():
+        usernames = [f'bench{n}' for n in range(20)]
+        for username in usernames:
+            user = User(username=username, email=f'{username}@example.com', email_verified=True)
+            user.set_password('password123')
+            db.session.add(user)
+        db.session.commit()
+        app.extensions['password_hasher'].shutdown()
+        db.engine.dispose()  # don't share the parent's connections with forked workers
+
+    barrier = multiprocessing.Barrier(args.page_workers + args.login_workers)
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=page_worker, args=(profile, args.seconds, barrier, results))
+        for _ in range(args.page_workers)
+    ] + [
+        multiprocessing.Process(target=login_worker, args=(profile, args.seconds, usernames, barrier, results))
+        for _ in range(args.login_workers)
+    ]
+    for process in processes:
+        process.start()
+    reports = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    pages = sorted(ms * 1000 for report in reports if report[0] == 'page' for ms in report[1])
+    logins = sorted(ms * 1000 for report in reports if report[0] == 'login' for ms in report[1])
+    failed = sum(report[2] for report in reports if report[0] == 'login')
+
+    print(f"\n{profile}: {args.page_workers} page + {args.login_workers} login workers for {args.seconds}s")
+    print(f"  leaderboard {len(pages):>5} requests ({len(pages) / args.seconds:6.1f}/s), "
+          f"p50 {statistics.median(pages):7.1f}ms, p99 {pages[int(len(pages) * 0.99)]:7.1f}ms")
+    if logins:
+        print(f"  login       {len(logins):>5} requests ({len(logins) / args.seconds:6.1f}/s), "
+              f"p50 {statistics.median(logins):7.1f}ms, p99 {logins[int(len(logins) * 0.99)]:7.1f}ms"
+              + (f", {failed} failed" if failed else ''))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure leaderboard latency under login load')
+    parser.add_argument('--page-workers', type=int, default=3, help='Processes serving pages (default: 3)')
+    parser.add_argument('--login-workers', type=int, default=1, help='Processes logging in (default: 1)')
+    parser.add_argument('--seconds', type=float, default=10, help='Duration per profile (default: 10)')
+    parser.add_argument('--profile', choices=('inline', 'pool', 'both'), default='both')
+    args = parser.parse_args()
+
+    os.environ['FLASK_ENV'] = 'development'
+
+    # Fresh interpreter per profile, so one profile's settings never leak into the other
+    profiles = ('inline', 'pool') if args.profile == 'both' else (args.profile,)
+    for profile in profiles:
+        process = multiprocessing.get_context('spawn').Process(target=run_profile, args=(profile, args))
+        process.start()
+        process.join()
+
+
+if __name__ == '__main__':
+    main()
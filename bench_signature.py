@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+PiggyBankPC Leaderboard - Signature Verification Microbenchmark
+Times upload validation for v1, v2 and v3 .pbr payloads of increasing size
+(synthetic telemetry samples) and reports file size, cost per MB of payload
+for valid and tampered files, and peak memory while decoding a valid one:
+
+    python bench_signature.py
+    python bench_signature.py --sizes 1 8 32 --repeat 5
+"""
+import argparse
+import io
+import json
+import logging
+import time
+import tracemalloc
+
+from security import BenchmarkSecurity
+
+
+def make_data_package(megabytes):
+    """A results package padded with telemetry samples to roughly `megabytes` of JSON"""
+    sample = {'t': 0.0, 'fps': 78.25, 'gpu_temp': 71.5, 'gpu_util': 97.0, 'cpu_temp': 64.0, 'cpu_util': 38.5}
+    per_sample = len(json.dumps(sample)) + 2
+    samples = [dict(sample, t=i * 0.5) for i in range(int(megabytes * 1024 * 1024 / per_sample))]
+
+    return {
+        'version': BenchmarkSecurity.VERSION,
+        'timestamp': '2025-10-25T20:45:00',
+        'hardware_fingerprint': 'f' * 64,
+        'results': {'fps': {'status': 'completed', 'average_fps': 78.25, 'samples': samples}}
+    }
+
+
+def encode_v1(security, data_package):
+    """The v1 encoding: HMAC over the sorted-key re-serialization, then base64 the whole package"""
+    signature = security._hmac(json.dumps(data_package, sort_keys=True).encode())
+    return security.encode_for_submission({
+        'data': data_package,
+        'signature': signature,
+        'signature_algorithm': 'HMAC-SHA256'
+    })
+
+
+def tamper(encoded):
+    """Flip one character in the middle of the payload"""
+    middle = len(encoded) // 2
+    return encoded[:middle] + (b'A' if encoded[middle:middle + 1] != b'A' else b'B') + encoded[middle + 1:]
+
+
+def validate(security, encoded):
+    """Validate an upload the way the submit route does - from a binary stream"""
+    return security.validate_submission_content(io.BytesIO(encoded))
+
+
+def time_validate(security, encoded, repeat):
+    """Best-of-`repeat` seconds for one validation"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        validate(security, encoded)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def peak_memory(security, encoded):
+    """Peak bytes allocated while validating (the upload itself excluded)"""
+    tracemalloc.start()
+    validate(security, encoded)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark .pbr signature verification')
+    parser.add_argument('--sizes', type=float, nargs='+', default=[1, 4, 16], help='Payload sizes in MB')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is kept)')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    security = BenchmarkSecurity(base_dir='.')
+
+    print(f"{'payload':>8} {'format':>6} {'file':>9} {'valid ms/MB':>12} {'tampered ms/MB':>15} {'peak mem':>9}")
+    for megabytes in args.sizes:
+        data_package = make_data_package(megabytes)
+        payload_mb = len(json.dumps(data_package)) / 1024 / 1024
+        encodings = {
+            'v1': encode_v1(security, data_package).encode(),
+            'v2': security.encode_for_submission(security.sign_data_package(data_package)).encode(),
+            'v3': security.pack_container(data_package)['container']
+        }
+
+        for name, encoded in encodings.items():
+            assert validate(security, encoded) is not None
+            file_mb = len(encoded) / 1024 / 1024
+            valid = time_validate(security, encoded, args.repeat)
+            tampered = time_validate(security, tamper(encoded), args.repeat)
+            peak_mb = peak_memory(security, encoded) / 1024 / 1024
+            print(f"{megabytes:>6.0f}MB {name:>6} {file_mb:>7.2f}MB "
+                  f"{valid * 1000 / payload_mb:>12.2f} {tampered * 1000 / payload_mb:>15.2f} {peak_mb:>7.1f}MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+PiggyBankPC Leaderboard - SQLite Contention Stress Test
+Several processes (standing in for gunicorn workers) hammer one SQLite file with
+a mix of page views, .pbr uploads and analytics events, first with SQLite's
+defaults (rollback journal, no busy_timeout, one pool, no write retries) and then
+with the engine profile from utils/sqlite.py. Reports failed requests, latency
+percentiles and throughput for each:
+
+    python bench_sqlite_contention.py                        # 4 workers x 150 requests
+    python bench_sqlite_contention.py --workers 8 --requests 300
+    python bench_sqlite_contention.py --profile tuned
+"""
+import argparse
+import hashlib
+import io
+import multiprocessing
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from bench_ingest import make_pbr
+
+# Settings that turn the engine profile off - SQLite as ProductionConfig used to get it
+BASELINE = {'SQLITE_PRAGMAS': {}, 'SQLITE_READ_POOL': False, 'SQLITE_WRITE_RETRIES': 0}
+
+# (kind, weight) - mostly reads, like real traffic
+MIX = (('page', 70), ('event', 25), ('upload', 5))
+
+PAGES = ('/', '/leaderboard', '/leaderboard?resolution=1920x1080&quality=High', '/official-builds',
+         '/best-all-rounder', '/leaderboard/most-improved')
+
+
+def configure(profile):
+    """Apply a profile to the config classes before create_app() reads them"""
+    if profile == 'baseline':
+        from config import Config
+        for name, value in BASELINE.items():
+            setattr(Config, name, value)
+
+
+def bench_worker(profile, worker_number, user_id, requests, seed, barrier, results):
+    """One 'gunicorn worker': a seeded random mix of requests, each timed"""
+    configure(profile)
+    from app import create_app
+
+    app = create_app()
+    app.logger.setLevel('CRITICAL')
+    client = app.test_client()
+
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+
+    rng = random.Random(seed)
+    kinds = rng.choices([kind for kind, _ in MIX], weights=[weight for _, weight in MIX], k=requests)
+    fingerprint = hashlib.sha256(f"contention-{worker_number}".encode()).hexdigest()
+
+    latencies = {kind: [] for kind, _ in MIX}
+    errors = {kind: 0 for kind, _ in MIX}
+
+    barrier.wait()
+    started = time.time()
+    for i, kind in enumerate(kinds):
+        request_started = time.perf_counter()
+        try:
+            if kind == 'page':
+                ok = client.get(rng.choice(PAGES)).status_code == 200
+            elif kind == 'event':
+                response = client.post('/api/analytics/event', json={
+                    'event_type': 'video_click', 'event_data': {'video_id': f'v{i}'}
+                })
+                ok = response.status_code == 202
+            else:
+                body = make_pbr(app.config['BENCHMARK_SECURITY_KEY'], fingerprint, 50.0 + i)
+                response = client.post('/submit', data={
+                    'pbr_file': (io.BytesIO(body), f'contention_{worker_number}_{i}.pbr')
+                }, content_type='multipart/form-data')
+                ok = response.headers.get('Location', '').startswith('/submission/')
+        except Exception:
+            # Debug configs let 'database is locked' escape the route
+            ok = False
+        latencies[kind].append(time.perf_counter() - request_started)
+        if not ok:
+            errors[kind] += 1
+    finished = time.time()
+
+    results.put({'latencies': latencies, 'errors': errors, 'window': (started, finished)})
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run_profile(profile, args):
+    """Run every worker against a fresh database file under one profile"""
+    workdir = tempfile.mkdtemp(prefix=f'piggybank-contention-{profile}-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{workdir}/bench.db"
+    os.environ['UPLOAD_FOLDER'] = f"{workdir}/uploads"
+
+    configure(profile)
+    from app import create_app
+    from models import db, User
+
+    app = create_app()
+    with app.app_context():
+        users = []
+        for n in range(args.workers):
+            user = User(username=f'bench{n}', email=f'bench{n}@example.com', email_verified=True)
+            user.password_hash = 'x'  # never logs in through the form
+            users.append(user)
+        db.session.add_all(users)
+        db.session.commit()
+        user_ids = [user.id for user in users]
+        db.engine.dispose()  # don't share the parent's connections with forked workers
+
+    barrier = multiprocessing.Barrier(args.workers)
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=bench_worker, args=(
+            profile, n, user_ids[n], args.requests, args.seed + n, barrier, results
+        ))
+        for n in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    reports = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    elapsed = max(end for _, end in (r['window'] for r in reports)) - \
+        min(start for start, _ in (r['window'] for r in reports))
+    total = args.workers * args.requests
+
+    print(f"\n{profile}: {workdir}/bench.db - {args.workers} workers x {args.requests} requests")
+    print(f"  {total} requests in {elapsed:.2f}s = {total / elapsed:.1f}/s")
+    for kind, _ in MIX:
+        latencies = sorted(ms * 1000 for r in reports for ms in r['latencies'][kind])
+        errors = sum(r['errors'][kind] for r in reports)
+        if not latencies:
+            continue
+        print(f"  {kind:<7} {len(latencies):>5} requests, {errors:>4} failed, "
+              f"p50 {statistics.median(latencies):7.1f}ms, p99 {percentile(latencies, 0.99):7.1f}ms, "
+              f"max {latencies[-1]:7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stress SQLite with concurrent reads and writes')
+    parser.add_argument('--workers', type=int, default=4, help='Concurrent worker processes (default: 4)')
+    parser.add_argument('--requests', type=int, default=150, help='Requests per worker (default: 150)')
+    parser.add_argument('--profile', choices=('baseline', 'tuned', 'both'), default='both')
+    parser.add_argument('--seed', type=int, default=1, help='Seed for the request mix')
+    args = parser.parse_args()
+
+    os.environ['FLASK_ENV'] = 'development'
+
+    # Fresh interpreter per profile, so one profile's settings never leak into the other
+    profiles = ('baseline', 'tuned') if args.profile == 'both' else (args.profile,)
+    for profile in profiles:
+        process = multiprocessing.get_context('spawn').Process(target=run_profile, args=(profile, args))
+        process.start()
+        process.join()
+
+
+if __name__ == '__main__':
+    main()
@@ -15,14 +15,43 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or f'sqlite:///{BASE_DIR}/instance/database.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # SQLite engine profile for several worker processes on one file (see utils/sqlite.py)
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',           # readers and the writer don't block each other
+        'synchronous': 'NORMAL',         # fsync at checkpoints only - durable enough with WAL
+        'busy_timeout': 5000,            # wait up to 5s for the write lock instead of failing
+        'mmap_size': 256 * 1024 * 1024,  # read pages straight from the OS page cache
+        'temp_store': 'MEMORY',
+    }
+    SQLITE_READ_POOL = True       # separate query_only connection pool for reads (file databases)
+    SQLITE_WRITE_RETRIES = 5      # extra BEGIN IMMEDIATE attempts, with backoff, after busy_timeout
+
     # Upload settings
     UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER') or str(BASE_DIR / 'uploads')
-    MAX_CONTENT_LENGTH = 5 * 1024 * 1024  # 5MB max file size
+    MAX_CONTENT_LENGTH = 5 * 1024 * 1024  # 5MB max upload, and max decoded .pbr payload
     ALLOWED_EXTENSIONS = {'pbr'}
 
+    # Password hashing (see utils/passwords.py) - older hashes are upgraded at login
+    PASSWORD_HASH_METHOD = 'scrypt:32768:8:1'
+    PASSWORD_HASH_WORKERS = 2   # hashing processes per web worker (0 = hash in the web worker)
+    PASSWORD_HASH_NICE = 5      # hashing runs below page views' CPU priority
+
+    # Seconds a worker reuses a logged-in user without querying (see utils/user_cache.py;
+    # 0 = no cache), and how often it re-reads the users version counter - also how long
+    # another worker may still see a user's old is_admin
+    USER_CACHE_TTL = 15
+    USER_CACHE_VERSION_TTL = 1
+
     # Pagination
     SUBMISSIONS_PER_PAGE = 20
 
+    # Analytics events are buffered per worker and written in batches (see utils/event_buffer.py)
+    ANALYTICS_BATCH_SIZE = 100      # flush as soon as this many are waiting...
+    ANALYTICS_FLUSH_INTERVAL = 2.0  # ...or after this many seconds (0 = write through)
+    # Raw events older than this move to monthly archives (prune_analytics.py); rollups are kept
+    ANALYTICS_RETENTION_DAYS = int(os.environ.get('ANALYTICS_RETENTION_DAYS') or 90)
+    ANALYTICS_ARCHIVE_FOLDER = os.environ.get('ANALYTICS_ARCHIVE_FOLDER') or str(BASE_DIR / 'instance' / 'analytics_archive')
+
     # Security module
     BENCHMARK_SECURITY_KEY = os.environ.get('BENCHMARK_SECURITY_KEY') or 'PIGGYBANK_PC_BENCHMARK_SECRET_2025'
 
@@ -91,8 +120,19 @@ class ProductionConfig(Config):
         logging.info(f"📊 Database: {app.config.get('SQLALCHEMY_DATABASE_URI', 'Not configured')[:50]}...")
 
 
+class TestingConfig(Config):
+    """Testing configuration (in-memory database)"""
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    ANALYTICS_FLUSH_INTERVAL = 0  # tests read events straight back
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'  # fast - tests create many users
+    PASSWORD_HASH_WORKERS = 0
+    USER_CACHE_VERSION_TTL = 60  # query counts mustn't depend on how fast the test ran
+
+
 config = {
     'development': DevelopmentConfig,
     'production': ProductionConfig,
+    'testing': TestingConfig,
     'default': DevelopmentConfig
 }
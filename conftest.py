@@ -0,0 +1,104 @@
+"""
+PiggyBankPC Leaderboard - Shared pytest fixtures
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app
+from models import db, User, Submission, ConfigurationResult
+from utils.rankings import sync_submission_rank
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Flask app backed by a fresh in-memory database and a temporary upload folder"""
+    app = create_app('testing')
+    app.config['UPLOAD_FOLDER'] = str(tmp_path / 'uploads')
+
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    """Test client for the app"""
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    """Factory for verified users"""
+    def _make_user(username='tester', is_admin=False):
+        user = User(username=username, email=f'{username}@example.com', is_admin=is_admin, email_verified=True)
+        user.set_password('password123')
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return _make_user
+
+
+@pytest.fixture
+def make_submission(app):
+    """Factory for ranked submissions with sensible defaults (and their category result, as uploads store it)"""
+    def _make_submission(user, **fields):
+        data = {
+            'hardware_fingerprint': 'f' * 64,
+            'cpu_model': 'AMD Ryzen 5 5600',
+            'gpu_model': 'NVIDIA GeForce RTX 3060',
+            'gpu_price': 150.0,
+            'ram_total': '16GB',
+            'fps_avg': 60.0,
+            'fps_min': 40.0,
+            'fps_max': 80.0,
+            'fps_resolution': '1920x1080',
+            'fps_quality': 'High',
+            'ai_tokens_per_sec': 25.0,
+            'submission_date': datetime.utcnow() - timedelta(days=1),
+        }
+        data.update(fields)
+
+        if 'configuration_results' not in data and data['fps_resolution'] and data['fps_quality'] and data['fps_avg'] is not None:
+            data['configuration_results'] = [ConfigurationResult(
+                resolution=data['fps_resolution'],
+                quality=data['fps_quality'],
+                fps_avg=data['fps_avg'],
+                fps_min=data['fps_min'],
+                fps_max=data['fps_max']
+            )]
+
+        submission = Submission(user_id=user.id, **data)
+        db.session.add(submission)
+        db.session.flush()
+        sync_submission_rank(submission)
+        db.session.commit()
+        return submission
+    return _make_submission
+
+
+@pytest.fixture
+def count_queries(app, client):
+    """
+    Request a URL and return (response, number of SQL statements it executed)
+    Use to pin per-request query counts so N+1 regressions fail loudly
+    """
+    def _count_queries(url):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            # Fresh app context = fresh session and g, as a real request would get
+            with app.app_context():
+                response = client.get(url)
+                response.get_data()  # run streamed responses to completion
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+        return response, len(statements)
+    return _count_queries
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+PiggyBankPC Leaderboard - Upload Blob Garbage Collection
+Deletes stored .pbr blobs that no submission points at any more (after
+submission, user or official build deletes). Run from cron, e.g. nightly:
+
+    python gc_blobs.py
+    python gc_blobs.py --dry-run
+    python gc_blobs.py --grace-hours 24
+"""
+import argparse
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Delete unreferenced upload blobs')
+    parser.add_argument('--dry-run', action='store_true', help='Only report what would be deleted')
+    parser.add_argument('--grace-hours', type=float, default=1.0,
+                        help='Keep unreferenced blobs younger than this (default: 1)')
+    args = parser.parse_args()
+
+    from app import create_app
+    from utils.blobstore import collect_garbage
+
+    app = create_app()
+    with app.app_context():
+        stats = collect_garbage(grace_seconds=args.grace_hours * 3600, dry_run=args.dry_run)
+
+    verb = 'Would delete' if args.dry_run else 'Deleted'
+    print(f"🧹 {verb} {stats['deleted']} blobs ({stats['bytes_freed'] / 1024:.0f} KB), kept {stats['kept']}")
+
+
+if __name__ == '__main__':
+    main()
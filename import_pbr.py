@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+PiggyBankPC Leaderboard - Bulk .pbr Import
+Re-ingests uploads (by default everything in UPLOAD_FOLDER), e.g. after a
+schema change, a new derived column or a BENCHMARK_SECURITY_KEY rotation.
+Both layouts are read: raw .pbr files anywhere under the directory, and the
+blob store (blobs/<ab>/<cd>/<sha256>.gz, see utils/blobstore.py) that
+migrate_uploads_to_blobs.py moves them into. Decoding and signature checks run
+in a process pool, which also copies valid raw files into the blob store; rows
+are inserted in batched transactions and the leaderboard ranks are rebuilt
+once at the end.
+
+    python import_pbr.py                          # import UPLOAD_FOLDER
+    python import_pbr.py /backups/uploads --workers 8 --batch-size 500
+    python import_pbr.py --signing-key OLD_KEY    # files signed before a key rotation
+    python import_pbr.py --restart                # ignore the saved position
+    python import_pbr.py --update --restart       # also re-extract rows already imported
+
+Files already in the database (same content hash, or a blob a submission
+already points at) are skipped - without verifying or storing them again -
+unless --update is given: then their results are re-extracted onto the
+existing row (columns and per-category results; owner, visibility and stored
+file are kept), which is what a new column or derived value needs. Blobs carry no owner in their name: a blob no
+submission points at is imported for --user, or skipped. Progress is saved
+after every committed batch, so a re-run after a crash carries on from the
+last committed file.
+"""
+import argparse
+import gzip
+import io
+import json
+import multiprocessing
+import os
+import re
+import time
+from pathlib import Path
+
+# Resume position, kept next to the imported files
+STATE_FILENAME = '.import_state.json'
+
+# Upload names are '<user id>_<fp8>_<name>' or 'official_<user id>_<fp8>_<name>'
+UPLOAD_NAME = re.compile(r'^(official_)?(\d+)_')
+
+# Set per pool process by _init_worker
+_security = None
+_max_decoded_length = None
+_blob_root = None
+_known = frozenset()
+_update = False
+
+
+def _init_worker(signing_key, max_decoded_length, blob_root, known, update):
+    """
+    Pool initializer - one BenchmarkSecurity per worker process, plus the content
+    hashes and blob keys already in the database when the import started
+    """
+    global _security, _max_decoded_length, _blob_root, _known, _update
+    from security import BenchmarkSecurity
+
+    _security = BenchmarkSecurity(base_dir=Path(__file__).parent, signing_key=signing_key)
+    _security.logger.disabled = True
+    _max_decoded_length = max_decoded_length
+    _blob_root = blob_root
+    _known = known
+    _update = update
+
+
+def stored_blob_key(path):
+    """Blob key of a file in the blob store ('<sha256>.gz'), or None for a raw .pbr file"""
+    from utils.blobstore import is_blob_key
+
+    key = path.name[:-len('.gz')] if path.name.endswith('.gz') else None
+    return key if is_blob_key(key) else None
+
+
+def find_uploads(directory):
+    """Raw .pbr files and blob store files under a directory, sorted"""
+    from utils.blobstore import BLOB_DIRNAME
+
+    blobs = directory / BLOB_DIRNAME
+    raw = (p for p in directory.rglob('*.pbr') if blobs not in p.parents)
+    stored = (p for p in blobs.glob('*/*/*.gz') if stored_blob_key(p))
+    # Sorted, so "everything up to the saved path" is well defined
+    return sorted([*raw, *stored], key=str)
+
+
+def decode_file(path):
+    """
+    Hash, verify and decode one file, and store valid raw files in the blob store
+    (runs in a pool process). Files already in the database are only hashed - or,
+    when updating, decoded but not stored again
+
+    Returns:
+        tuple: (path, content hash, validated results or None, blob key or None)
+    """
+    from utils.blobstore import put_blob
+
+    blob_key = stored_blob_key(path)
+    if blob_key:
+        with gzip.open(path, 'rb') as stored:
+            content = stored.read()
+    else:
+        content = path.read_bytes()
+
+    content_hash = _security.content_hash(io.BytesIO(content))
+    known = content_hash in _known or blob_key in _known
+    if known and not _update:
+        return path, content_hash, None, blob_key
+
+    results = _security.validate_submission_content(content, max_decoded_length=_max_decoded_length)
+    if results is not None and blob_key is None and not known:
+        blob_key = put_blob(content, root=_blob_root)
+    return path, content_hash, results, blob_key
+
+
+def load_state(state_path):
+    """Last committed file from a previous run, or None"""
+    if state_path.exists():
+        return json.loads(state_path.read_text()).get('last_path')
+    return None
+
+
+def save_state(state_path, last_path):
+    """Record the last committed file (written atomically)"""
+    tmp_path = state_path.with_suffix('.tmp')
+    tmp_path.write_text(json.dumps({'last_path': last_path}))
+    tmp_path.replace(state_path)
+
+
+def build_submission(path, content_hash, results, blob_key, default_user_id):
+    """
+    Turn verified results into a Submission the way the upload routes do
+
+    Returns:
+        tuple: (Submission or None, reason it was skipped)
+    """
+    from models import Submission
+    from routes.submit import is_intel_13_14_gen_cpu
+    from utils.categories import validate_submission_category
+    from utils.results import extract_submission_data, extract_configuration_results
+
+    match = UPLOAD_NAME.match(path.name)
+    user_id = int(match.group(2)) if match else default_user_id
+    if user_id is None:
+        return None, 'no owner'
+
+    record = extract_submission_data(results)
+    if not record:
+        return None, 'unreadable results'
+
+    if validate_submission_category(record.fps_resolution, record.fps_quality):
+        return None, 'invalid category'
+
+    submission = Submission(
+        user_id=user_id,
+        pbr_filename=blob_key,
+        content_hash=content_hash,
+        **record.as_dict()
+    )
+
+    # Per-category results, stored as the upload routes store them
+    submission.configuration_results = extract_configuration_results(results)
+
+    # Official builds come back hidden, as the admin upload does (anti-spoiler)
+    if match and match.group(1):
+        submission.is_official = True
+        submission.published = False
+
+    if is_intel_13_14_gen_cpu(submission.cpu_model):
+        submission.intel_13_14_gen_cpu = True
+
+    return submission, None
+
+
+def refresh_submission(submission, results):
+    """
+    Re-extract verified results onto an existing Submission (--update)
+    Owner, visibility, stored file and content hash are left as they are
+
+    Returns:
+        str: Reason it was skipped, or None if it was refreshed
+    """
+    from models import db
+    from routes.submit import is_intel_13_14_gen_cpu
+    from utils.categories import validate_submission_category
+    from utils.results import extract_submission_data, extract_configuration_results
+
+    record = extract_submission_data(results)
+    if not record:
+        return 'unreadable results'
+
+    if validate_submission_category(record.fps_resolution, record.fps_quality):
+        return 'invalid category'
+
+    for column, value in record.as_dict().items():
+        setattr(submission, column, value)
+
+    # Old category rows go first - the new ones reuse their (submission, category) key
+    submission.configuration_results = []
+    db.session.flush()
+    submission.configuration_results = extract_configuration_results(results)
+
+    submission.intel_13_14_gen_cpu = is_intel_13_14_gen_cpu(submission.cpu_model)
+    return None
+
+
+def import_directory(app, directory, workers, batch_size, signing_key, default_user_id=None,
+                     run_pipeline=False, restart=False, update=False):
+    """
+    Import every .pbr file and stored blob under `directory`
+    With `update`, files already in the database refresh their existing row
+
+    Returns:
+        dict: Counts per outcome
+    """
+    from models import db, Submission, User
+    from utils.pipeline import enqueue_submission_pipeline
+    from utils.rankings import rebuild_rankings
+    from utils.blobstore import blob_root
+
+    state_path = directory / STATE_FILENAME
+    last_path = None if restart else load_state(state_path)
+
+    paths = [p for p in find_uploads(directory) if last_path is None or str(p) > last_path]
+    if last_path:
+        print(f"↪️  Resuming after {last_path}")
+    print(f"📦 {len(paths)} files to import from {directory} with {workers} workers")
+
+    counts = {'imported': 0, 'duplicate': 0, 'invalid signature': 0}
+    if update:
+        counts['updated'] = 0
+    started = time.time()
+    processed = 0
+
+    with app.app_context():
+        known_users = {user_id for (user_id,) in db.session.query(User.id)}
+        # Rows already in the database, by content hash and by the blob they point at
+        # (the latter includes rows from before content hashes were stored)
+        existing = dict(db.session.query(Submission.content_hash, Submission.id).filter(Submission.content_hash.isnot(None)))
+        existing_blobs = dict(db.session.query(Submission.pbr_filename, Submission.id).filter(Submission.pbr_filename.isnot(None)))
+        # Content hashes and blob keys handled by this run
+        seen = set()
+
+        def commit_batch(batch, batch_last_path):
+            if batch:
+                db.session.add_all(batch)
+                db.session.flush()
+                if run_pipeline:
+                    for submission in batch:
+                        enqueue_submission_pipeline(submission)
+            db.session.commit()
+            save_state(state_path, batch_last_path)
+
+        batch = []
+        with multiprocessing.Pool(workers, initializer=_init_worker,
+                                  initargs=(signing_key, app.config['MAX_CONTENT_LENGTH'], blob_root(),
+                                            frozenset(existing) | frozenset(existing_blobs), update)) as pool:
+            # imap keeps file order, so the saved position is always a clean prefix
+            for path, content_hash, results, blob_key in pool.imap(decode_file, paths, chunksize=16):
+                processed += 1
+
+                stored = stored_blob_key(path)
+                existing_id = existing.get(content_hash) or (existing_blobs.get(blob_key) if stored else None)
+
+                if content_hash in seen or (stored and blob_key in seen) or (existing_id and not update):
+                    counts['duplicate'] += 1
+                elif results is None:
+                    counts['invalid signature'] += 1
+                elif existing_id:
+                    reason = refresh_submission(db.session.get(Submission, existing_id), results)
+                    if reason:
+                        counts[reason] = counts.get(reason, 0) + 1
+                    else:
+                        seen.update((content_hash, blob_key))
+                        counts['updated'] += 1
+                else:
+                    submission, reason = build_submission(path, content_hash, results, blob_key, default_user_id)
+                    if submission is not None and submission.user_id not in known_users:
+                        submission, reason = None, 'unknown user'
+
+                    if submission is None:
+                        counts[reason] = counts.get(reason, 0) + 1
+                    else:
+                        seen.update((content_hash, blob_key))
+                        batch.append(submission)
+                        counts['imported'] += 1
+
+                if processed % batch_size == 0:
+                    commit_batch(batch, str(path))
+                    batch = []
+
+                    elapsed = time.time() - started
+                    print(f"   ✓ {processed}/{len(paths)} files, {counts['imported']} imported "
+                          f"({processed / elapsed:.0f} files/s)")
+
+        if paths:
+            commit_batch(batch, str(paths[-1]))
+
+        # Also after a resumed run, in case the crash came before the previous rebuild
+        if paths:
+            print("🏆 Rebuilding leaderboard ranks...")
+            rebuild_rankings()
+            db.session.commit()
+
+    elapsed = time.time() - started
+    print(f"\n✅ Import finished: {processed} files in {elapsed:.1f}s "
+          f"({processed / elapsed if elapsed else 0:.0f} files/s)")
+    for outcome, count in sorted(counts.items()):
+        print(f"   • {outcome}: {count}")
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk import/re-verify .pbr files')
+    parser.add_argument('directory', nargs='?', help='Directory of .pbr files and/or blobs/ to import (default: UPLOAD_FOLDER)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='Decode processes (default: CPU count)')
+    parser.add_argument('--batch-size', type=int, default=200, help='Rows per transaction (default: 200)')
+    parser.add_argument('--signing-key', help='Key the files were signed with (default: BENCHMARK_SECURITY_KEY)')
+    parser.add_argument('--user', help='Owner for files whose name carries no user id (e.g. unreferenced blobs)')
+    parser.add_argument('--pipeline', action='store_true', help='Queue diagnostics/improvements/achievements for imported rows')
+    parser.add_argument('--restart', action='store_true', help='Ignore the saved position and scan every file')
+    parser.add_argument('--update', action='store_true', help='Re-extract files already imported onto their existing rows')
+    args = parser.parse_args()
+
+    from app import create_app
+    from models import User
+
+    app = create_app()
+    directory = Path(args.directory or app.config['UPLOAD_FOLDER'])
+
+    default_user_id = None
+    if args.user:
+        with app.app_context():
+            user = User.query.filter_by(username=args.user).first()
+        if not user:
+            print(f"❌ User '{args.user}' not found")
+            return
+        default_user_id = user.id
+
+    import_directory(
+        app,
+        directory,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        signing_key=args.signing_key or app.config['BENCHMARK_SECURITY_KEY'],
+        default_user_id=default_user_id,
+        run_pipeline=args.pipeline,
+        restart=args.restart,
+        update=args.update
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Database Migration Script: Add Analytics Rollups
+Creates the analytics_rollups table, stores existing events' event_data as
+native JSON (it used to be a JSON string inside the JSON column) and counts
+every existing event into the hourly/daily rollups
+"""
+from app import create_app
+from models import db
+from sqlalchemy import text
+from utils.analytics import rebuild_rollups
+
+
+def migrate():
+    """Run database migration"""
+    app = create_app()
+
+    with app.app_context():
+        print("Starting migration...")
+
+        try:
+            print("Unwrapping double-encoded event_data...")
+            result = db.session.execute(text("""
+                UPDATE analytics_events
+                SET event_data = json_extract(event_data, '$')
+                WHERE json_valid(event_data)
+                  AND json_type(event_data) = 'text'
+                  AND json_valid(json_extract(event_data, '$'))
+            """))
+            print(f"✓ {result.rowcount} events converted")
+
+            # create_app() already ran create_all(), so the table exists - just fill it
+            print("Counting events into the rollups...")
+            events = rebuild_rollups()
+            db.session.commit()
+            print(f"✓ {events} events counted")
+
+            db.session.execute(text("ANALYZE analytics_rollups"))
+            db.session.commit()
+
+            print("\n✅ Migration completed successfully!")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n❌ Migration failed: {str(e)}")
+            raise
+
+
+if __name__ == '__main__':
+    migrate()
@@ -0,0 +1,58 @@
+"""
+Database Migration Script: Add Per-Category Configuration Results
+Creates the configuration_results table, backfills one result per existing
+submission from its fps_resolution/fps_quality, drops the submission category
+indexes it replaces and rebuilds the leaderboard ranks from it
+"""
+from app import create_app
+from models import db
+from sqlalchemy import text
+from utils.rankings import rebuild_rankings
+
+# Category leaderboards now walk ix_configuration_results_category_fps instead
+OBSOLETE_INDEXES = ('ix_submissions_board_category_fps', 'ix_submissions_board_category_tokens')
+
+
+def migrate():
+    """Run database migration"""
+    app = create_app()
+
+    with app.app_context():
+        print("Starting migration...")
+
+        try:
+            # create_app() already ran create_all(), so the table exists - just fill it
+            print("Backfilling configuration results from submissions...")
+            result = db.session.execute(text("""
+                INSERT INTO configuration_results (submission_id, resolution, quality, fps_avg, fps_min, fps_max)
+                SELECT s.id, s.fps_resolution, s.fps_quality, s.fps_avg, s.fps_min, s.fps_max
+                FROM submissions s
+                WHERE s.fps_resolution IS NOT NULL AND s.fps_resolution != ''
+                  AND s.fps_quality IS NOT NULL AND s.fps_quality != ''
+                  AND s.fps_avg IS NOT NULL
+                  AND NOT EXISTS (SELECT 1 FROM configuration_results c WHERE c.submission_id = s.id)
+            """))
+            print(f"✓ {result.rowcount} configuration results written")
+
+            for name in OBSOLETE_INDEXES:
+                db.session.execute(text(f"DROP INDEX IF EXISTS {name}"))
+            print(f"✓ Dropped {', '.join(OBSOLETE_INDEXES)}")
+
+            print("Rebuilding leaderboard ranks...")
+            entries = rebuild_rankings()
+            db.session.commit()
+            print(f"✓ {entries} ranking entries written")
+
+            db.session.execute(text("ANALYZE configuration_results"))
+            db.session.commit()
+
+            print("\n✅ Migration completed successfully!")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n❌ Migration failed: {str(e)}")
+            raise
+
+
+if __name__ == '__main__':
+    migrate()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Database Migration: Add Upload Content Hash
+Adds a unique 'content_hash' column to submissions and backfills it from the
+stored .pbr files, so repeat uploads of the same file are caught by an index lookup
+"""
+import gzip
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from security import BenchmarkSecurity
+from utils.blobstore import BLOB_DIRNAME, blob_path, is_blob_key
+
+BATCH_SIZE = 1000
+
+def backfill(conn, upload_folder, batch_size=BATCH_SIZE):
+    """
+    Hash the stored upload of every submission that doesn't have a hash yet
+    Existing duplicates keep the hash on the oldest copy only (the column is unique)
+
+    Returns:
+        tuple: (hashed, duplicates, missing files)
+    """
+    security = BenchmarkSecurity(base_dir=Path(__file__).parent)
+    cursor = conn.cursor()
+    cursor.execute("SELECT content_hash FROM submissions WHERE content_hash IS NOT NULL")
+    seen = {row[0] for row in cursor.fetchall()}
+
+    last_id = 0
+    hashed = duplicates = missing = 0
+
+    while True:
+        cursor.execute(
+            "SELECT id, pbr_filename FROM submissions WHERE id > ? AND content_hash IS NULL ORDER BY id LIMIT ?",
+            (last_id, batch_size)
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            break
+
+        updates = []
+        for sub_id, pbr_filename in rows:
+            if is_blob_key(pbr_filename):
+                path = blob_path(pbr_filename, root=upload_folder / BLOB_DIRNAME)
+            else:
+                path = upload_folder / (pbr_filename or '')
+            if not pbr_filename or not path.is_file():
+                missing += 1
+                continue
+
+            with (gzip.open if is_blob_key(pbr_filename) else open)(path, 'rb') as f:
+                content_hash = security.content_hash(f)
+
+            if content_hash in seen:
+                duplicates += 1
+                continue
+            seen.add(content_hash)
+            updates.append((content_hash, sub_id))
+
+        cursor.executemany("UPDATE submissions SET content_hash = ? WHERE id = ?", updates)
+        conn.commit()
+
+        last_id = rows[-1][0]
+        hashed += len(updates)
+        print(f"   ✓ Hashed {hashed} uploads (up to id {last_id})")
+
+    return hashed, duplicates, missing
+
+def migrate():
+    """Add content_hash field to submissions table"""
+
+    base_dir = Path(__file__).parent
+    db_path = base_dir / 'instance' / 'database.db'
+    upload_folder = Path(os.environ.get('UPLOAD_FOLDER') or base_dir / 'uploads')
+
+    if not db_path.exists():
+        print(f"❌ Database not found at {db_path}")
+        print("   Please run the app first to create the database.")
+        return False
+
+    print(f"📊 Migrating database: {db_path}")
+
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        # Check what tables exist
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        tables = [row[0] for row in cursor.fetchall()]
+        print(f"   Tables found: {', '.join(tables)}")
+
+        # Find submissions table
+        if 'submissions' not in tables:
+            print("❌ No submissions table found in database!")
+            conn.close()
+            return False
+
+        # Check which columns already exist
+        cursor.execute("PRAGMA table_info(submissions)")
+        columns = [col[1] for col in cursor.fetchall()]
+
+        if 'content_hash' not in columns:
+            cursor.execute("ALTER TABLE submissions ADD COLUMN content_hash VARCHAR(64)")
+            print("   ✓ Added 'content_hash' column")
+        else:
+            print("✅ 'content_hash' field already exists!")
+
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS ix_submissions_content_hash ON submissions(content_hash)")
+        print("   ✓ Created unique content hash index")
+        conn.commit()
+
+        # Backfill from the stored uploads (safe to re-run)
+        print(f"📝 Hashing stored uploads in {upload_folder}...")
+        hashed, duplicates, missing = backfill(conn, upload_folder)
+
+        conn.close()
+
+        print("\n✅ Migration completed successfully!")
+        print(f"   • {hashed} submissions hashed")
+        print(f"   • {duplicates} existing duplicate uploads left unhashed (review them in the admin dashboard)")
+        print(f"   • {missing} submissions without a stored file")
+        print("\n🔁 Repeat uploads now go straight to the original submission's report")
+
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Migration failed: {str(e)}")
+        if 'conn' in locals():
+            conn.rollback()
+            conn.close()
+        return False
+
+if __name__ == '__main__':
+    print("🔄 PiggyBankPC Leaderboard - Content Hash Migration")
+    print("=" * 60)
+    migrate()
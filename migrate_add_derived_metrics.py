@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Database Migration: Add Stored Price-per-FPS and All-Rounder Score
+Adds 'price_per_fps' and 'all_rounder_score' columns to submissions, indexes
+them for ORDER BY ... LIMIT and backfills existing rows in batches
+"""
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from utils.metrics import calculate_price_per_fps, calculate_all_rounder_score
+
+BATCH_SIZE = 1000
+
+def backfill(conn, batch_size=BATCH_SIZE):
+    """
+    Recompute price_per_fps/all_rounder_score for every submission
+    Walks the table by primary key, one short transaction per batch
+
+    Returns:
+        int: Number of rows updated
+    """
+    cursor = conn.cursor()
+    last_id = 0
+    updated = 0
+
+    while True:
+        cursor.execute(
+            "SELECT id, fps_avg, gpu_price, ai_tokens_per_sec FROM submissions WHERE id > ? ORDER BY id LIMIT ?",
+            (last_id, batch_size)
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            break
+
+        cursor.executemany(
+            "UPDATE submissions SET price_per_fps = ?, all_rounder_score = ? WHERE id = ?",
+            [
+                (calculate_price_per_fps(fps_avg, gpu_price), calculate_all_rounder_score(fps_avg, tokens), sub_id)
+                for sub_id, fps_avg, gpu_price, tokens in rows
+            ]
+        )
+        conn.commit()
+
+        last_id = rows[-1][0]
+        updated += len(rows)
+        print(f"   ✓ Backfilled {updated} submissions (up to id {last_id})")
+
+    return updated
+
+def migrate():
+    """Add price_per_fps and all_rounder_score fields to submissions table"""
+
+    db_path = Path(__file__).parent / 'instance' / 'database.db'
+
+    if not db_path.exists():
+        print(f"❌ Database not found at {db_path}")
+        print("   Please run the app first to create the database.")
+        return False
+
+    print(f"📊 Migrating database: {db_path}")
+
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        # Check what tables exist
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        tables = [row[0] for row in cursor.fetchall()]
+        print(f"   Tables found: {', '.join(tables)}")
+
+        # Find submissions table
+        if 'submissions' not in tables:
+            print("❌ No submissions table found in database!")
+            conn.close()
+            return False
+
+        # Check which columns already exist
+        cursor.execute("PRAGMA table_info(submissions)")
+        columns = [col[1] for col in cursor.fetchall()]
+
+        for column in ('price_per_fps', 'all_rounder_score'):
+            if column not in columns:
+                cursor.execute(f"ALTER TABLE submissions ADD COLUMN {column} FLOAT")
+                print(f"   ✓ Added '{column}' column")
+            else:
+                print(f"✅ '{column}' field already exists!")
+
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS ix_submissions_board_value
+            ON submissions(verified, published, price_per_fps)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS ix_submissions_board_all_rounder
+            ON submissions(verified, published, all_rounder_score, submission_date)
+        """)
+        print("   ✓ Created derived metric indexes")
+        conn.commit()
+
+        # Backfill existing submissions (safe to re-run)
+        print(f"📝 Backfilling price-per-FPS and All-Rounder Score...")
+        backfill(conn)
+
+        cursor.execute("SELECT COUNT(price_per_fps), COUNT(all_rounder_score), COUNT(*) FROM submissions")
+        value_count, all_rounder_count, total_count = cursor.fetchone()
+
+        print(f"\n📊 Submissions: {value_count} with price-per-FPS, {all_rounder_count} all-rounders ({total_count} total)")
+
+        conn.close()
+
+        print("\n✅ Migration completed successfully!")
+        print("\n💰 Home page best value and Best All-Rounder now sort in SQL")
+
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Migration failed: {str(e)}")
+        if 'conn' in locals():
+            conn.rollback()
+            conn.close()
+        return False
+
+if __name__ == '__main__':
+    print("🔄 PiggyBankPC Leaderboard - Derived Metrics Migration")
+    print("=" * 60)
+    migrate()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Database Migration: Add Stored GPU Brand and Model Key
+Adds indexed 'gpu_brand' and 'gpu_model_key' columns to submissions and
+backfills them in batches, so the leaderboard brand filter is an equality lookup
+"""
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from utils.gpu import detect_gpu_brand, normalize_gpu_model
+
+BATCH_SIZE = 1000
+
+def backfill(conn, batch_size=BATCH_SIZE):
+    """
+    Recompute gpu_brand/gpu_model_key for every submission
+    Walks the table by primary key, one short transaction per batch
+
+    Returns:
+        int: Number of rows updated
+    """
+    cursor = conn.cursor()
+    last_id = 0
+    updated = 0
+
+    while True:
+        cursor.execute(
+            "SELECT id, gpu_model FROM submissions WHERE id > ? ORDER BY id LIMIT ?",
+            (last_id, batch_size)
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            break
+
+        cursor.executemany(
+            "UPDATE submissions SET gpu_brand = ?, gpu_model_key = ? WHERE id = ?",
+            [(detect_gpu_brand(gpu_model), normalize_gpu_model(gpu_model), sub_id) for sub_id, gpu_model in rows]
+        )
+        conn.commit()
+
+        last_id = rows[-1][0]
+        updated += len(rows)
+        print(f"   ✓ Backfilled {updated} submissions (up to id {last_id})")
+
+    return updated
+
+def migrate():
+    """Add gpu_brand and gpu_model_key fields to submissions table"""
+
+    db_path = Path(__file__).parent / 'instance' / 'database.db'
+
+    if not db_path.exists():
+        print(f"❌ Database not found at {db_path}")
+        print("   Please run the app first to create the database.")
+        return False
+
+    print(f"📊 Migrating database: {db_path}")
+
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        # Check what tables exist
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        tables = [row[0] for row in cursor.fetchall()]
+        print(f"   Tables found: {', '.join(tables)}")
+
+        # Find submissions table
+        if 'submissions' not in tables:
+            print("❌ No submissions table found in database!")
+            conn.close()
+            return False
+
+        # Check which columns already exist
+        cursor.execute("PRAGMA table_info(submissions)")
+        columns = [col[1] for col in cursor.fetchall()]
+
+        if 'gpu_brand' not in columns:
+            cursor.execute("ALTER TABLE submissions ADD COLUMN gpu_brand VARCHAR(20) DEFAULT 'Unknown'")
+            print("   ✓ Added 'gpu_brand' column")
+        else:
+            print("✅ 'gpu_brand' field already exists!")
+
+        if 'gpu_model_key' not in columns:
+            cursor.execute("ALTER TABLE submissions ADD COLUMN gpu_model_key VARCHAR(100)")
+            print("   ✓ Added 'gpu_model_key' column")
+        else:
+            print("✅ 'gpu_model_key' field already exists!")
+
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_submissions_gpu_brand ON submissions(gpu_brand)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_submissions_gpu_model_key ON submissions(gpu_model_key)")
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS ix_submissions_board_brand_fps
+            ON submissions(verified, published, gpu_brand, fps_avg, submission_date)
+        """)
+        print("   ✓ Created GPU brand indexes")
+        conn.commit()
+
+        # Backfill existing submissions (safe to re-run)
+        print(f"📝 Backfilling GPU brand and model key...")
+        backfill(conn)
+
+        # Show brand breakdown
+        cursor.execute("SELECT gpu_brand, COUNT(*) FROM submissions GROUP BY gpu_brand ORDER BY COUNT(*) DESC")
+        breakdown = cursor.fetchall()
+
+        print("\n📊 Submissions by GPU brand:")
+        for brand, count in breakdown:
+            print(f"   • {brand}: {count}")
+
+        conn.close()
+
+        print("\n✅ Migration completed successfully!")
+        print("\n🎮 GPU brand filter now uses the stored, indexed brand")
+
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Migration failed: {str(e)}")
+        if 'conn' in locals():
+            conn.rollback()
+            conn.close()
+        return False
+
+if __name__ == '__main__':
+    print("🔄 PiggyBankPC Leaderboard - GPU Brand Migration")
+    print("=" * 60)
+    migrate()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Database Migration: Keyset Pagination Indexes
+Rebuilds the leaderboard indexes so they end in (sort value, submission_date)
+- the implicit rowid then makes the (sort, submission_date, id) page cursor an
+index range - and adds the (gain, created_at) indexes for the most-improved pages
+"""
+import sqlite3
+from pathlib import Path
+
+# Must match __table_args__ in models.py
+INDEXES = {
+    'submissions': {
+        'ix_submissions_board_fps':
+            'verified, published, fps_avg, submission_date',
+        'ix_submissions_board_tokens':
+            'verified, published, ai_tokens_per_sec, submission_date',
+        'ix_submissions_board_brand_fps':
+            'verified, published, gpu_brand, fps_avg, submission_date',
+        'ix_submissions_official_fps':
+            'is_official, fps_avg, submission_date',
+    },
+    'improvements': {
+        'ix_improvements_gain_date':
+            'fps_gain, created_at',
+        'ix_improvements_gain_percent_date':
+            'fps_gain_percent, created_at',
+    },
+}
+
+def index_columns(cursor, name):
+    """Column list of an existing index, or None if it doesn't exist"""
+    cursor.execute(f"PRAGMA index_info({name})")
+    rows = cursor.fetchall()
+    if not rows:
+        return None
+    return ', '.join(row[2] for row in sorted(rows))
+
+def migrate():
+    """Rebuild leaderboard indexes for keyset pagination"""
+
+    db_path = Path(__file__).parent / 'instance' / 'database.db'
+
+    if not db_path.exists():
+        print(f"❌ Database not found at {db_path}")
+        print("   Please run the app first to create the database.")
+        return False
+
+    print(f"📊 Migrating database: {db_path}")
+
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        # Check what tables exist
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        tables = [row[0] for row in cursor.fetchall()]
+        print(f"   Tables found: {', '.join(tables)}")
+
+        for table, indexes in INDEXES.items():
+            if table not in tables:
+                print(f"❌ No {table} table found in database!")
+                conn.close()
+                return False
+
+            print(f"📝 Checking indexes on {table}...")
+
+            for name, columns in indexes.items():
+                existing = index_columns(cursor, name)
+
+                if existing == columns:
+                    print(f"   ✓ '{name}' already up to date")
+                    continue
+
+                if existing is not None:
+                    cursor.execute(f"DROP INDEX {name}")
+                    print(f"   ✓ Dropped old '{name}' ({existing})")
+
+                cursor.execute(f"CREATE INDEX {name} ON {table}({columns})")
+                print(f"   ✓ Created '{name}' ({columns})")
+
+            # Refresh planner statistics so SQLite picks the new indexes
+            cursor.execute(f"ANALYZE {table}")
+
+        print("   ✓ Updated query planner statistics")
+
+        # Commit changes
+        conn.commit()
+        conn.close()
+
+        print("\n✅ Migration completed successfully!")
+        print("\n⚡ Leaderboard, official builds, best all-rounder and most-improved")
+        print("   pages now page by cursor straight from their indexes")
+
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Migration failed: {str(e)}")
+        if 'conn' in locals():
+            conn.rollback()
+            conn.close()
+        return False
+
+if __name__ == '__main__':
+    print("🔄 PiggyBankPC Leaderboard - Keyset Pagination Index Migration")
+    print("=" * 60)
+    migrate()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Database Migration: Add Composite Leaderboard Indexes
+Adds composite indexes matching the leaderboard filter/sort access paths so
+SQLite can filter and order from one index instead of sorting in a temp B-tree
+"""
+import sqlite3
+from pathlib import Path
+
+# Must match the same-named indexes in Submission.__table_args__ (models.py). The
+# per-category indexes this script once added were dropped when category boards
+# moved to configuration_results (see migrate_add_configuration_results.py)
+INDEXES = {
+    'ix_submissions_board_fps':
+        'verified, published, fps_avg, submission_date',
+    'ix_submissions_board_tokens':
+        'verified, published, ai_tokens_per_sec, submission_date',
+    'ix_submissions_board_recent':
+        'verified, published, submission_date',
+    'ix_submissions_official_fps':
+        'is_official, fps_avg, submission_date',
+    'ix_submissions_user_date':
+        'user_id, submission_date',
+}
+
+def migrate():
+    """Add composite leaderboard indexes to submissions table"""
+
+    db_path = Path(__file__).parent / 'instance' / 'database.db'
+
+    if not db_path.exists():
+        print(f"❌ Database not found at {db_path}")
+        print("   Please run the app first to create the database.")
+        return False
+
+    print(f"📊 Migrating database: {db_path}")
+
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        # Check what tables exist
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        tables = [row[0] for row in cursor.fetchall()]
+        print(f"   Tables found: {', '.join(tables)}")
+
+        # Find submissions table
+        if 'submissions' not in tables:
+            print("❌ No submissions table found in database!")
+            conn.close()
+            return False
+
+        # Check which indexes already exist
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='index' AND tbl_name='submissions'")
+        existing = {row[0] for row in cursor.fetchall()}
+
+        print(f"📝 Adding composite indexes to submissions table...")
+
+        for name, columns in INDEXES.items():
+            if name in existing:
+                print(f"   ✓ '{name}' already exists")
+                continue
+
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON submissions({columns})")
+            print(f"   ✓ Added '{name}' ({columns})")
+
+        # Refresh planner statistics so SQLite picks the new indexes
+        cursor.execute("ANALYZE submissions")
+        print("   ✓ Updated query planner statistics")
+
+        # Commit changes
+        conn.commit()
+
+        cursor.execute("SELECT COUNT(*) FROM submissions")
+        total_count = cursor.fetchone()[0]
+
+        print(f"\n📊 Submissions indexed: {total_count}")
+
+        conn.close()
+
+        print("\n✅ Migration completed successfully!")
+        print("\n⚡ Leaderboard queries now filter and sort from composite indexes:")
+        print("   • Category + FPS / AI tokens rankings")
+        print("   • Recent submissions, official builds and profiles")
+
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Migration failed: {str(e)}")
+        if 'conn' in locals():
+            conn.rollback()
+            conn.close()
+        return False
+
+if __name__ == '__main__':
+    print("🔄 PiggyBankPC Leaderboard - Composite Index Migration")
+    print("=" * 60)
+    migrate()
@@ -0,0 +1,50 @@
+"""
+Database Migration Script: Add Materialized Leaderboard Ranks
+Creates the leaderboard_rank table and backfills it from existing submissions
+"""
+from app import create_app
+from models import db
+from sqlalchemy import text
+from utils.rankings import rebuild_rankings, ALL_CATEGORY, category_size
+
+def migrate():
+    """Run database migration"""
+    app = create_app()
+
+    with app.app_context():
+        print("Starting migration...")
+
+        try:
+            # Percentiles are now derived from rank when read; tables created before
+            # that still carry the old column (DROP COLUMN needs SQLite 3.35+)
+            columns = [row[1] for row in db.session.execute(text("PRAGMA table_info(leaderboard_rank)"))]
+            if 'percentile' in columns:
+                print("Dropping stored percentile column...")
+                db.session.execute(text("ALTER TABLE leaderboard_rank DROP COLUMN percentile"))
+
+            # create_app() already ran create_all(), so the table exists - just (re)fill it
+            print("Rebuilding leaderboard ranks from submissions...")
+            entries = rebuild_rankings()
+            db.session.commit()
+            print(f"✓ {entries} ranking entries written")
+
+            print("\n✅ Migration completed successfully!")
+
+            # Show summary
+            result = db.session.execute(text(
+                "SELECT category, COUNT(*) FROM leaderboard_rank GROUP BY category ORDER BY category"
+            ))
+            print(f"\nDatabase Status:")
+            print(f"- Ranked submissions: {category_size(ALL_CATEGORY)}")
+            for category, count in result:
+                if category != ALL_CATEGORY:
+                    print(f"  - {category}: {count}")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n❌ Migration failed: {str(e)}")
+            raise
+
+
+if __name__ == '__main__':
+    migrate()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Database Migration: Index users.created_at
+The admin user table pages newest-first by (created_at, id) cursor; this index
+makes each page a range seek instead of sorting every user
+"""
+import sqlite3
+from pathlib import Path
+
+def migrate():
+    """Add created_at index to users table"""
+
+    db_path = Path(__file__).parent / 'instance' / 'database.db'
+
+    if not db_path.exists():
+        print(f"❌ Database not found at {db_path}")
+        print("   Please run the app first to create the database.")
+        return False
+
+    print(f"📊 Migrating database: {db_path}")
+
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        # Check what tables exist
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        tables = [row[0] for row in cursor.fetchall()]
+        print(f"   Tables found: {', '.join(tables)}")
+
+        if 'users' not in tables:
+            print("❌ No users table found in database!")
+            conn.close()
+            return False
+
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_users_created_at ON users(created_at)")
+        print("   ✓ Created 'ix_users_created_at'")
+
+        # Refresh planner statistics so SQLite picks the new index
+        cursor.execute("ANALYZE users")
+        conn.commit()
+
+        cursor.execute("SELECT COUNT(*) FROM users")
+        total_count = cursor.fetchone()[0]
+        print(f"\n📊 Users indexed: {total_count}")
+
+        conn.close()
+
+        print("\n✅ Migration completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Migration failed: {str(e)}")
+        if 'conn' in locals():
+            conn.rollback()
+            conn.close()
+        return False
+
+if __name__ == '__main__':
+    print("🔄 PiggyBankPC Leaderboard - User Index Migration")
+    print("=" * 60)
+    migrate()
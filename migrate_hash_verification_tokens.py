@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Database Migration: Hash and Index Verification Tokens
+users.verification_token now holds the SHA-256 of the emailed token. Hashes
+the raw tokens still stored (links already sent keep working) and adds the
+unique index that makes /verify-email an index lookup instead of a scan
+"""
+import hashlib
+import sqlite3
+from pathlib import Path
+
+def migrate():
+    """Hash stored verification tokens and index them"""
+
+    db_path = Path(__file__).parent / 'instance' / 'database.db'
+
+    if not db_path.exists():
+        print(f"❌ Database not found at {db_path}")
+        print("   Please run the app first to create the database.")
+        return False
+
+    print(f"📊 Migrating database: {db_path}")
+
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        # Check what tables exist
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        tables = [row[0] for row in cursor.fetchall()]
+        print(f"   Tables found: {', '.join(tables)}")
+
+        if 'users' not in tables:
+            print("❌ No users table found in database!")
+            conn.close()
+            return False
+
+        # Raw tokens are 43 characters of urlsafe base64; hashes are 64 hex digits
+        cursor.execute("SELECT id, verification_token FROM users "
+                       "WHERE verification_token IS NOT NULL AND length(verification_token) != 64")
+        raw_tokens = cursor.fetchall()
+        cursor.executemany(
+            "UPDATE users SET verification_token = ? WHERE id = ?",
+            [(hashlib.sha256(token.encode()).hexdigest(), user_id) for user_id, token in raw_tokens]
+        )
+        print(f"   ✓ Hashed {len(raw_tokens)} stored tokens")
+
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS ix_users_verification_token ON users(verification_token)")
+        print("   ✓ Created 'ix_users_verification_token'")
+
+        # Refresh planner statistics so SQLite picks the new index
+        cursor.execute("ANALYZE users")
+        conn.commit()
+        conn.close()
+
+        print("\n✅ Migration completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Migration failed: {str(e)}")
+        if 'conn' in locals():
+            conn.rollback()
+            conn.close()
+        return False
+
+if __name__ == '__main__':
+    print("🔄 PiggyBankPC Leaderboard - Verification Token Migration")
+    print("=" * 60)
+    migrate()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Database Migration: Move Uploads into the Blob Store
+Copies every legacy upload (UPLOAD_FOLDER/<user>_<fp8>_<name>) into the
+content-addressed blob store, points Submission.pbr_filename at the blob key
+and removes the old file. Identical files end up as one blob
+"""
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from utils.blobstore import BLOB_DIRNAME, is_blob_key, put_blob
+
+BATCH_SIZE = 500
+
+def move_uploads(conn, upload_folder, batch_size=BATCH_SIZE):
+    """
+    Move legacy uploads into the blob store, one short transaction per batch
+    Old files are removed only after the batch pointing away from them commits
+
+    Returns:
+        tuple: (moved, missing files)
+    """
+    root = upload_folder / BLOB_DIRNAME
+    cursor = conn.cursor()
+    last_id = 0
+    moved = missing = 0
+
+    while True:
+        cursor.execute(
+            "SELECT id, pbr_filename FROM submissions WHERE id > ? AND pbr_filename IS NOT NULL ORDER BY id LIMIT ?",
+            (last_id, batch_size)
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            break
+
+        updates = []
+        old_files = []
+        for sub_id, pbr_filename in rows:
+            if is_blob_key(pbr_filename):
+                continue
+            path = upload_folder / pbr_filename
+            if not path.is_file():
+                missing += 1
+                continue
+
+            with open(path, 'rb') as f:
+                updates.append((put_blob(f, root=root), sub_id))
+            old_files.append(path)
+
+        cursor.executemany("UPDATE submissions SET pbr_filename = ? WHERE id = ?", updates)
+        conn.commit()
+
+        for path in old_files:
+            path.unlink(missing_ok=True)
+
+        last_id = rows[-1][0]
+        moved += len(updates)
+        print(f"   ✓ Moved {moved} uploads (up to id {last_id})")
+
+    return moved, missing
+
+def migrate():
+    """Move legacy upload files into the blob store"""
+
+    base_dir = Path(__file__).parent
+    db_path = base_dir / 'instance' / 'database.db'
+    upload_folder = Path(os.environ.get('UPLOAD_FOLDER') or base_dir / 'uploads')
+
+    if not db_path.exists():
+        print(f"❌ Database not found at {db_path}")
+        print("   Please run the app first to create the database.")
+        return False
+
+    print(f"📊 Migrating database: {db_path}")
+
+    try:
+        conn = sqlite3.connect(db_path)
+
+        # Move files (safe to re-run - rows already pointing at blobs are skipped)
+        print(f"📝 Moving uploads in {upload_folder} into {upload_folder / BLOB_DIRNAME}...")
+        moved, missing = move_uploads(conn, upload_folder)
+
+        conn.close()
+
+        print("\n✅ Migration completed successfully!")
+        print(f"   • {moved} uploads moved into the blob store")
+        print(f"   • {missing} submissions without a stored file")
+        print("\n🗄️  Uploads are now stored compressed and deduplicated")
+
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Migration failed: {str(e)}")
+        if 'conn' in locals():
+            conn.rollback()
+            conn.close()
+        return False
+
+if __name__ == '__main__':
+    print("🔄 PiggyBankPC Leaderboard - Upload Blob Store Migration")
+    print("=" * 60)
+    migrate()
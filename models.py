@@ -3,10 +3,15 @@ PiggyBankPC Leaderboard - Database Models
 """
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy.orm import validates
 from datetime import datetime
+from utils.gpu import detect_gpu_brand, normalize_gpu_model
+from utils.metrics import calculate_price_per_fps, calculate_all_rounder_score
+from utils.sqlite import RoutingSession
+from utils.passwords import get_hasher, hash_token
 
-db = SQLAlchemy()
+# Reads are routed to the SQLite read pool, see utils.sqlite
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 
 class User(UserMixin, db.Model):
@@ -17,12 +22,12 @@ class User(UserMixin, db.Model):
     username = db.Column(db.String(50), unique=True, nullable=False, index=True)
     email = db.Column(db.String(120), unique=True, nullable=False, index=True)
     password_hash = db.Column(db.String(255), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     is_admin = db.Column(db.Boolean, default=False)
 
     # Email verification
     email_verified = db.Column(db.Boolean, default=False)
-    verification_token = db.Column(db.String(100), nullable=True)  # Unique enforced in code
+    verification_token = db.Column(db.String(100), nullable=True, unique=True, index=True)  # SHA-256 of the emailed token
     verification_token_expires = db.Column(db.DateTime, nullable=True)
 
     # Relationships
@@ -31,24 +36,37 @@ class User(UserMixin, db.Model):
     achievements = db.relationship('Achievement', backref='user', lazy='dynamic', cascade='all, delete-orphan')
 
     def set_password(self, password):
-        """Hash and set password"""
-        self.password_hash = generate_password_hash(password)
+        """Hash and set password (in the hashing pool, see utils.passwords)"""
+        self.password_hash = get_hasher().hash(password)
 
     def check_password(self, password):
-        """Verify password"""
-        return check_password_hash(self.password_hash, password)
+        """
+        Verify password
+        A match against a hash from an older cost profile also upgrades the
+        stored hash (caller commits)
+        """
+        matches, new_hash = get_hasher().verify(self.password_hash, password)
+        if new_hash:
+            self.password_hash = new_hash
+        return matches
 
     def generate_verification_token(self):
-        """Generate email verification token"""
+        """Generate email verification token (only its hash is stored - email the return value)"""
         import secrets
         from datetime import timedelta
-        self.verification_token = secrets.token_urlsafe(32)
+        token = secrets.token_urlsafe(32)
+        self.verification_token = hash_token(token)
         self.verification_token_expires = datetime.utcnow() + timedelta(hours=24)
-        return self.verification_token
+        return token
+
+    @classmethod
+    def find_by_verification_token(cls, token):
+        """User an emailed verification token belongs to (indexed lookup), or None"""
+        return cls.query.filter_by(verification_token=hash_token(token)).first()
 
     def verify_email_token(self, token):
         """Verify email verification token"""
-        if self.verification_token != token:
+        if self.verification_token != hash_token(token):
             return False
         if datetime.utcnow() > self.verification_token_expires:
             return False
@@ -75,6 +93,8 @@ class Submission(db.Model):
     cpu_threads = db.Column(db.Integer)
     cpu_clock_speed = db.Column(db.String(50))
     gpu_model = db.Column(db.String(255), index=True)
+    gpu_brand = db.Column(db.String(20), default='Unknown', index=True)  # Derived from gpu_model at ingest
+    gpu_model_key = db.Column(db.String(100), index=True)  # Normalized model, e.g. 'rtx-3060-ti'
     gpu_price = db.Column(db.Float)
     ram_total = db.Column(db.String(50))
     ram_type = db.Column(db.String(20))
@@ -89,6 +109,10 @@ class Submission(db.Model):
     ai_tokens_per_sec = db.Column(db.Float)
     cpu_score = db.Column(db.Float)
 
+    # Derived metrics (see utils.metrics) - kept in sync by _update_derived_metrics
+    price_per_fps = db.Column(db.Float)
+    all_rounder_score = db.Column(db.Float)
+
     # GPU Metrics for Diagnostics (Phase 2)
     gpu_temp_max = db.Column(db.Float)
     gpu_temp_avg = db.Column(db.Float)
@@ -115,6 +139,7 @@ class Submission(db.Model):
     submission_date = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     verified = db.Column(db.Boolean, default=True)
     pbr_filename = db.Column(db.String(255))
+    content_hash = db.Column(db.String(64), unique=True)  # SHA-256 of the signed payload - catches repeat uploads
     benchmark_version = db.Column(db.String(20))
     benchmark_timestamp = db.Column(db.String(50))
 
@@ -135,60 +160,154 @@ class Submission(db.Model):
     # Intel 13th/14th Gen CPU Tracking (for degradation warnings)
     intel_13_14_gen_cpu = db.Column(db.Boolean, default=False, index=True)
 
-    @property
-    def price_per_fps(self):
-        """Calculate price-per-FPS performance metric"""
-        if self.fps_avg and self.gpu_price and self.fps_avg > 0:
-            return round(self.gpu_price / self.fps_avg, 2)
-        return None
-
-    @property
-    def all_rounder_score(self):
-        """
-        Calculate All-Rounder Score - balanced performance for gaming + AI
-        Combines FPS (gaming) and Tokens/sec (AI) into a single score
-
-        Formula: (FPS_normalized + Tokens_normalized) / 2
-        - Normalizes FPS to 0-100 scale (60 FPS = baseline, 120+ = max)
-        - Normalizes Tokens/sec to 0-100 scale (10 t/s = baseline, 50+ = max)
-        - Returns average of both for balanced score
-        """
-        if not self.fps_avg or not self.ai_tokens_per_sec:
-            return None
-
-        # Normalize FPS (60 = baseline, 120+ = excellent)
-        fps_normalized = min(100, (self.fps_avg / 120) * 100)
-
-        # Normalize Tokens/sec (10 = baseline, 50+ = excellent)
-        tokens_normalized = min(100, (self.ai_tokens_per_sec / 50) * 100)
-
-        # Average of both (0-100 scale)
-        score = (fps_normalized + tokens_normalized) / 2
-
-        return round(score, 1)
-
-    @property
-    def gpu_brand(self):
-        """Extract GPU brand from model"""
-        if not self.gpu_model:
-            return 'Unknown'
-        model_upper = self.gpu_model.upper()
-        if 'NVIDIA' in model_upper or 'GTX' in model_upper or 'RTX' in model_upper:
-            return 'NVIDIA'
-        elif 'AMD' in model_upper or 'RADEON' in model_upper or 'RX' in model_upper:
-            return 'AMD'
-        elif 'INTEL' in model_upper:
-            return 'Intel'
-        return 'Unknown'
+    # Composite indexes matching the leaderboard access paths
+    # (verified/published/category equality filters, then the sort key with submission_date as tiebreak;
+    # the rowid id is implicitly last, so the (sort, submission_date, id) page cursor is an index range)
+    __table_args__ = (
+        db.Index('ix_submissions_board_fps', 'verified', 'published', 'fps_avg', 'submission_date'),
+        db.Index('ix_submissions_board_tokens', 'verified', 'published', 'ai_tokens_per_sec', 'submission_date'),
+        db.Index('ix_submissions_board_brand_fps', 'verified', 'published', 'gpu_brand', 'fps_avg', 'submission_date'),
+        db.Index('ix_submissions_board_recent', 'verified', 'published', 'submission_date'),
+        db.Index('ix_submissions_board_value', 'verified', 'published', 'price_per_fps'),
+        db.Index('ix_submissions_board_all_rounder', 'verified', 'published', 'all_rounder_score', 'submission_date'),
+        db.Index('ix_submissions_official_fps', 'is_official', 'fps_avg', 'submission_date'),
+        db.Index('ix_submissions_user_date', 'user_id', 'submission_date'),
+    )
+
+    @validates('fps_avg', 'gpu_price', 'ai_tokens_per_sec')
+    def _update_derived_metrics(self, key, value):
+        """Keep stored price-per-FPS and All-Rounder Score in step with their inputs"""
+        metrics = {
+            'fps_avg': self.fps_avg,
+            'gpu_price': self.gpu_price,
+            'ai_tokens_per_sec': self.ai_tokens_per_sec
+        }
+        metrics[key] = value
+
+        self.price_per_fps = calculate_price_per_fps(metrics['fps_avg'], metrics['gpu_price'])
+        self.all_rounder_score = calculate_all_rounder_score(metrics['fps_avg'], metrics['ai_tokens_per_sec'])
+        return value
+
+    @validates('gpu_model')
+    def _classify_gpu(self, key, gpu_model):
+        """Derive stored GPU brand and model key whenever the GPU model is set"""
+        self.gpu_brand = detect_gpu_brand(gpu_model)
+        self.gpu_model_key = normalize_gpu_model(gpu_model)
+        return gpu_model
 
     # Relationships
     parent_submission = db.relationship('Submission', remote_side=[id], backref='child_submissions', foreign_keys=[parent_submission_id])
     issues = db.relationship('DiagnosticIssue', backref='submission', lazy='dynamic', cascade='all, delete-orphan')
+    configuration_results = db.relationship('ConfigurationResult', backref='submission', cascade='all, delete-orphan')
 
     def __repr__(self):
         return f'<Submission {self.id} by {self.user.username}>'
 
 
+class ConfigurationResult(db.Model):
+    """
+    FPS result for one resolution/quality category of a submission
+    A Heaven session can benchmark several categories - every valid one is kept,
+    and the per-category leaderboards read from here
+    """
+    __tablename__ = 'configuration_results'
+
+    id = db.Column(db.Integer, primary_key=True)
+    submission_id = db.Column(db.Integer, db.ForeignKey('submissions.id'), nullable=False)
+    resolution = db.Column(db.String(50), nullable=False)
+    quality = db.Column(db.String(50), nullable=False)
+
+    fps_avg = db.Column(db.Float, nullable=False)
+    fps_min = db.Column(db.Float)
+    fps_max = db.Column(db.Float)
+
+    __table_args__ = (
+        # One result per category per submission; also the lookup from a submission
+        db.UniqueConstraint('submission_id', 'resolution', 'quality', name='uq_configuration_results_submission_category'),
+        # Category leaderboard walk: equality on the category, then FPS (rowid id is implicitly last)
+        db.Index('ix_configuration_results_category_fps', 'resolution', 'quality', 'fps_avg'),
+    )
+
+    def __repr__(self):
+        return f'<ConfigurationResult {self.resolution} {self.quality}: Submission {self.submission_id}>'
+
+
+class LeaderboardRank(db.Model):
+    """Materialized leaderboard position of a submission within a category"""
+    __tablename__ = 'leaderboard_rank'
+
+    # Category key: 'all' or '<resolution>_<quality>' (e.g. '1920x1080_High')
+    category = db.Column(db.String(50), primary_key=True)
+    submission_id = db.Column(db.Integer, db.ForeignKey('submissions.id'), primary_key=True, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+
+    # Position (1 = best) - percentile is derived from it, see utils.rankings.rank_percentile
+    rank = db.Column(db.Integer, nullable=False)
+
+    # Precomputed sort keys (copied from the submission)
+    fps_avg = db.Column(db.Float, nullable=False)
+    ai_tokens_per_sec = db.Column(db.Float)
+    submission_date = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_leaderboard_rank_category_rank', 'category', 'rank'),
+        db.Index('ix_leaderboard_rank_category_sort', 'category', 'fps_avg', 'submission_date'),
+    )
+
+    # Relationships
+    submission = db.relationship('Submission', backref=db.backref('rank_entries', cascade='all, delete-orphan'))
+
+    def __repr__(self):
+        return f'<LeaderboardRank {self.category} #{self.rank}: Submission {self.submission_id}>'
+
+
+class CacheVersion(db.Model):
+    """Version counters for cached results - bumped when the underlying data changes"""
+    __tablename__ = 'cache_versions'
+
+    name = db.Column(db.String(50), primary_key=True)  # e.g. 'submission_stats'
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<CacheVersion {self.name} v{self.version}>'
+
+
+class Job(db.Model):
+    """Background job (post-upload pipeline), consumed by worker.py processes"""
+    __tablename__ = 'jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)  # handler name, e.g. 'process_submission'
+    payload = db.Column(db.JSON)
+
+    # Enqueueing the same key twice is a no-op (e.g. 'process_submission:42')
+    idempotency_key = db.Column(db.String(100), unique=True, nullable=False)
+
+    # Submission the job belongs to (diagnostics page shows "processing" until its jobs finish)
+    submission_id = db.Column(db.Integer, db.ForeignKey('submissions.id'), index=True)
+
+    # 'pending' -> 'running' -> 'done', or back to 'pending' (retry) / 'failed' (out of attempts)
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_after = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.Text)
+
+    # Worker holding the job, and since when (stale locks are released)
+    locked_by = db.Column(db.String(64))
+    locked_at = db.Column(db.DateTime)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_jobs_status_run_after', 'status', 'run_after'),
+    )
+
+    def __repr__(self):
+        return f'<Job {self.id} {self.kind} ({self.status})>'
+
+
 class DiagnosticIssue(db.Model):
     """Detected issues for each submission"""
     __tablename__ = 'diagnostic_issues'
@@ -245,6 +364,12 @@ class Improvement(db.Model):
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
 
+    # Most-improved pages walk these in (gain, created_at, id) cursor order
+    __table_args__ = (
+        db.Index('ix_improvements_gain_date', 'fps_gain', 'created_at'),
+        db.Index('ix_improvements_gain_percent_date', 'fps_gain_percent', 'created_at'),
+    )
+
     # Relationships
     before_submission = db.relationship('Submission', foreign_keys=[before_submission_id], backref='improvements_as_before')
     after_submission = db.relationship('Submission', foreign_keys=[after_submission_id], backref='improvements_as_after')
@@ -304,6 +429,25 @@ class AnalyticsEvent(db.Model):
         return f'<AnalyticsEvent {self.event_type} at {self.created_at}>'
 
 
+class AnalyticsRollup(db.Model):
+    """Event counts per hour and per day, kept up to date as events are written"""
+    __tablename__ = 'analytics_rollups'
+
+    # 'hour' or 'day', and the (UTC) start of that hour/day
+    period = db.Column(db.String(4), primary_key=True)
+    bucket = db.Column(db.DateTime, primary_key=True)
+
+    # Dimensions - issue_type/product come from event_data ('' when the event has none)
+    event_type = db.Column(db.String(50), primary_key=True)
+    issue_type = db.Column(db.String(100), primary_key=True, default='')
+    product = db.Column(db.String(200), primary_key=True, default='')
+
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<AnalyticsRollup {self.period} {self.bucket} {self.event_type}: {self.count}>'
+
+
 class DiagnosticConfig(db.Model):
     """Store diagnostic configuration (YouTube videos, affiliate links)"""
     __tablename__ = 'diagnostic_config'
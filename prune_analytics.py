@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+PiggyBankPC Leaderboard - Analytics Event Retention
+Moves raw analytics events older than the retention period (IP addresses, user
+agents and all) into monthly compressed archives and deletes them from the
+database, a small batch at a time. Hourly/daily rollups are kept. Run from
+cron, e.g. nightly:
+
+    python prune_analytics.py
+    python prune_analytics.py --dry-run
+    python prune_analytics.py --days 30
+"""
+import argparse
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Archive and delete old analytics events')
+    parser.add_argument('--dry-run', action='store_true', help='Only report what would be pruned')
+    parser.add_argument('--days', type=int, default=None,
+                        help='Days of raw events to keep (default: ANALYTICS_RETENTION_DAYS)')
+    parser.add_argument('--batch-size', type=int, default=None, help='Events per delete transaction')
+    args = parser.parse_args()
+
+    from app import create_app
+    from utils.retention import PRUNE_BATCH_SIZE, archive_root, prune_events
+
+    app = create_app()
+    with app.app_context():
+        stats = prune_events(
+            retention_days=args.days,
+            batch_size=args.batch_size or PRUNE_BATCH_SIZE,
+            dry_run=args.dry_run
+        )
+        root = archive_root()
+
+    if args.dry_run:
+        print(f"🗄️  Would archive {stats['archived']} events")
+    else:
+        months = ', '.join(sorted(stats['months'])) or 'none'
+        print(f"🗄️  Archived {stats['archived']} events in {stats['batches']} batches to {root} (months: {months})")
+
+
+if __name__ == '__main__':
+    main()
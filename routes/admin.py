@@ -2,9 +2,13 @@
 PiggyBankPC Leaderboard - Admin Dashboard Routes
 Admin-only routes for user management and analytics
 """
-from flask import Blueprint, render_template, redirect, url_for, flash, send_file, current_app
+from flask import Blueprint, render_template, redirect, url_for, flash, current_app, request, Response, stream_with_context
 from flask_login import login_required, current_user
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import joinedload
 from models import db, User, Submission, Improvement, Achievement
+from utils.rankings import remove_submission_rank
+from utils.pagination import KeysetPagination
 from functools import wraps
 from datetime import datetime
 import csv
@@ -25,27 +29,134 @@ def admin_required(f):
     return decorated_function
 
 
+# Users per page in the admin user table
+ADMIN_USERS_PER_PAGE = 50
+
+# Rows fetched per batch (and written per chunk) by the CSV exports
+EXPORT_BATCH_SIZE = 1000
+
+
+def stream_csv(header, rows, filename):
+    """
+    Stream rows as a CSV attachment
+
+    Rows are written to a small reusable buffer and sent a batch at a time, so
+    memory stays flat however many rows there are and the header goes out at once.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def drain():
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    def generate():
+        writer.writerow(header)
+        yield drain()
+
+        for count, row in enumerate(rows, 1):
+            writer.writerow(row)
+            if count % EXPORT_BATCH_SIZE == 0:
+                yield drain()
+
+        yield drain()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/csv',
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+
+def user_stats_query(user_ids=None):
+    """
+    Every user with their activity counts, from one outer-join aggregate query
+
+    Submissions, improvements and achievements are each grouped by user_id once
+    (optionally only for `user_ids`) and outer-joined to users, instead of running
+    five queries per user.
+
+    Returns:
+        Query of (User, submissions, official_builds, improvements, achievements, best_fps)
+        ordered newest user first
+    """
+    submission_query = db.session.query(
+        Submission.user_id.label('user_id'),
+        func.count(Submission.id).label('submissions'),
+        func.sum(case((Submission.is_official == True, 1), else_=0)).label('official_builds'),
+        func.max(Submission.fps_avg).label('best_fps')
+    )
+    improvement_query = db.session.query(
+        Improvement.user_id.label('user_id'),
+        func.count(Improvement.id).label('improvements')
+    )
+    achievement_query = db.session.query(
+        Achievement.user_id.label('user_id'),
+        func.count(Achievement.id).label('achievements')
+    )
+    users_query = User.query
+
+    if user_ids is not None:
+        submission_query = submission_query.filter(Submission.user_id.in_(user_ids))
+        improvement_query = improvement_query.filter(Improvement.user_id.in_(user_ids))
+        achievement_query = achievement_query.filter(Achievement.user_id.in_(user_ids))
+        users_query = users_query.filter(User.id.in_(user_ids))
+
+    submission_counts = submission_query.group_by(Submission.user_id).subquery()
+    improvement_counts = improvement_query.group_by(Improvement.user_id).subquery()
+    achievement_counts = achievement_query.group_by(Achievement.user_id).subquery()
+
+    return users_query.outerjoin(
+        submission_counts, submission_counts.c.user_id == User.id
+    ).outerjoin(
+        improvement_counts, improvement_counts.c.user_id == User.id
+    ).outerjoin(
+        achievement_counts, achievement_counts.c.user_id == User.id
+    ).add_columns(
+        func.coalesce(submission_counts.c.submissions, 0),
+        func.coalesce(submission_counts.c.official_builds, 0),
+        func.coalesce(improvement_counts.c.improvements, 0),
+        func.coalesce(achievement_counts.c.achievements, 0),
+        func.coalesce(submission_counts.c.best_fps, 0)
+    ).order_by(User.created_at.desc(), User.id.desc())
+
+
 @admin_bp.route('/admin')
 @admin_required
 def dashboard():
     """Admin dashboard with user management and analytics"""
 
-    # Get all users with their stats
-    users = User.query.order_by(User.created_at.desc()).all()
+    # Platform stats - one query of indexed counts
+    total_users, admin_users, total_submissions, total_official, total_improvements = db.session.query(
+        select(func.count(User.id)).scalar_subquery(),
+        select(func.count(User.id)).where(User.is_admin == True).scalar_subquery(),
+        select(func.count(Submission.id)).scalar_subquery(),
+        select(func.count(Submission.id)).where(Submission.is_official == True).scalar_subquery(),
+        select(func.count(Improvement.id)).scalar_subquery()
+    ).one()
 
-    user_data = []
-    for user in users:
-        submission_count = Submission.query.filter_by(user_id=user.id).count()
-        official_count = Submission.query.filter_by(user_id=user.id, is_official=True).count()
-        improvement_count = Improvement.query.filter_by(user_id=user.id).count()
-        achievement_count = Achievement.query.filter_by(user_id=user.id).count()
+    stats = {
+        'total_users': total_users,
+        'total_submissions': total_submissions,
+        'official_builds': total_official,
+        'community_submissions': total_submissions - total_official,
+        'total_improvements': total_improvements,
+        'admin_users': admin_users
+    }
 
-        # Get best FPS
-        best_submission = Submission.query.filter_by(user_id=user.id)\
-            .order_by(Submission.fps_avg.desc()).first()
-        best_fps = best_submission.fps_avg if best_submission else 0
+    # Page through users (newest first), then aggregate stats for just that page
+    pagination = KeysetPagination(
+        User.query.with_entities(User.id),
+        [User.created_at, User.id],
+        cursor=request.args.get('cursor'),
+        per_page=ADMIN_USERS_PER_PAGE,
+        total=total_users
+    )
 
-        user_data.append({
+    user_data = [
+        {
             'id': user.id,
             'username': user.username,
             'email': user.email,
@@ -56,27 +167,15 @@ def dashboard():
             'improvements': improvement_count,
             'achievements': achievement_count,
             'best_fps': best_fps
-        })
-
-    # Platform stats
-    total_users = len(users)
-    total_submissions = Submission.query.count()
-    total_official = Submission.query.filter_by(is_official=True).count()
-    total_community = total_submissions - total_official
-    total_improvements = Improvement.query.count()
-
-    stats = {
-        'total_users': total_users,
-        'total_submissions': total_submissions,
-        'official_builds': total_official,
-        'community_submissions': total_community,
-        'total_improvements': total_improvements,
-        'admin_users': len([u for u in users if u.is_admin])
-    }
+        }
+        for user, submission_count, official_count, improvement_count, achievement_count, best_fps
+        in user_stats_query(pagination.items)
+    ]
 
     return render_template(
         'admin_dashboard.html',
         users=user_data,
+        pagination=pagination,
         stats=stats
     )
 
@@ -84,16 +183,9 @@ def dashboard():
 @admin_bp.route('/admin/users/export')
 @admin_required
 def export_users():
-    """Export all user data to CSV"""
-
-    users = User.query.order_by(User.created_at.desc()).all()
+    """Export all user data to CSV (streamed)"""
 
-    # Create CSV in memory
-    output = io.StringIO()
-    writer = csv.writer(output)
-
-    # Write header
-    writer.writerow([
+    header = [
         'ID',
         'Username',
         'Email',
@@ -104,20 +196,11 @@ def export_users():
         'Improvements',
         'Achievements',
         'Best FPS'
-    ])
-
-    # Write user data
-    for user in users:
-        submission_count = Submission.query.filter_by(user_id=user.id).count()
-        official_count = Submission.query.filter_by(user_id=user.id, is_official=True).count()
-        improvement_count = Improvement.query.filter_by(user_id=user.id).count()
-        achievement_count = Achievement.query.filter_by(user_id=user.id).count()
-
-        best_submission = Submission.query.filter_by(user_id=user.id)\
-            .order_by(Submission.fps_avg.desc()).first()
-        best_fps = best_submission.fps_avg if best_submission else 0
+    ]
 
-        writer.writerow([
+    # One aggregate query for all users, fetched in batches
+    rows = (
+        [
             user.id,
             user.username,
             user.email,
@@ -128,34 +211,21 @@ def export_users():
             improvement_count,
             achievement_count,
             round(best_fps, 1) if best_fps else 'N/A'
-        ])
+        ]
+        for user, submission_count, official_count, improvement_count, achievement_count, best_fps
+        in user_stats_query().yield_per(EXPORT_BATCH_SIZE)
+    )
 
-    # Prepare file for download
-    output.seek(0)
     timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-    filename = f'piggybankpc_users_{timestamp}.csv'
-
-    return send_file(
-        io.BytesIO(output.getvalue().encode('utf-8')),
-        mimetype='text/csv',
-        as_attachment=True,
-        download_name=filename
-    )
+    return stream_csv(header, rows, f'piggybankpc_users_{timestamp}.csv')
 
 
 @admin_bp.route('/admin/submissions/export')
 @admin_required
 def export_submissions():
-    """Export all submission data to CSV"""
-
-    submissions = Submission.query.order_by(Submission.submission_date.desc()).all()
-
-    # Create CSV in memory
-    output = io.StringIO()
-    writer = csv.writer(output)
+    """Export all submission data to CSV (streamed)"""
 
-    # Write header
-    writer.writerow([
+    header = [
         'ID',
         'Username',
         'Email',
@@ -173,11 +243,17 @@ def export_submissions():
         'CPU Score',
         'GPU Temp Max',
         'Submission Date'
-    ])
+    ]
 
-    # Write submission data
-    for sub in submissions:
-        writer.writerow([
+    # Newest first (walks the submission_date index), users joined in, fetched in batches
+    submissions = Submission.query.options(
+        joinedload(Submission.user)
+    ).order_by(
+        Submission.submission_date.desc()
+    ).yield_per(EXPORT_BATCH_SIZE)
+
+    rows = (
+        [
             sub.id,
             sub.user.username,
             sub.user.email,
@@ -195,19 +271,12 @@ def export_submissions():
             round(sub.cpu_score, 0) if sub.cpu_score else 'N/A',
             round(sub.gpu_temp_max, 1) if sub.gpu_temp_max else 'N/A',
             sub.submission_date.strftime('%Y-%m-%d %H:%M:%S')
-        ])
+        ]
+        for sub in submissions
+    )
 
-    # Prepare file for download
-    output.seek(0)
     timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-    filename = f'piggybankpc_submissions_{timestamp}.csv'
-
-    return send_file(
-        io.BytesIO(output.getvalue().encode('utf-8')),
-        mimetype='text/csv',
-        as_attachment=True,
-        download_name=filename
-    )
+    return stream_csv(header, rows, f'piggybankpc_submissions_{timestamp}.csv')
 
 
 @admin_bp.route('/admin/users/<int:user_id>/toggle-admin', methods=['POST'])
@@ -246,6 +315,10 @@ def delete_user(user_id):
     username = user.username
 
     try:
+        # Close the gaps their submissions leave in the leaderboard ranks
+        for submission in user.submissions:
+            remove_submission_rank(submission)
+
         # User deletion will cascade to submissions, improvements, achievements
         db.session.delete(user)
         db.session.commit()
@@ -2,14 +2,22 @@
 PiggyBankPC Leaderboard - Analytics & Revenue Tracking Routes
 """
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from flask_login import current_user
-from models import db, AnalyticsEvent
+from models import AnalyticsEvent
+from utils.analytics import DIMENSIONS, PERIODS, event_counts, event_series
+from utils.event_buffer import EVENT_BUFFER
 from datetime import datetime
-import json
 
 analytics_bp = Blueprint('analytics', __name__)
 
+# Largest batch the browser may send in one request
+MAX_EVENTS_PER_REQUEST = 50
+
+# Series length: default and maximum number of buckets
+DEFAULT_POINTS = {'hour': 48, 'day': 30}
+MAX_POINTS = 1000
+
 
 @analytics_bp.route('/api/analytics/event', methods=['POST'])
 def track_event():
@@ -17,7 +25,11 @@ def track_event():
     Track user interaction events (video clicks, affiliate clicks)
     This is the MONEY-MAKER - tracks every potential revenue action!
 
-    Expected JSON:
+    Events are buffered and written in batches (see utils.event_buffer), so
+    this responds 202 before they reach the database
+
+    Expected JSON - one event, or {"events": [...]} with up to
+    MAX_EVENTS_PER_REQUEST of them (the browser coalesces clicks):
     {
         "event_type": "video_click" | "affiliate_click",
         "event_data": {
@@ -26,34 +38,41 @@ def track_event():
         }
     }
     """
-    try:
-        data = request.get_json()
-
-        if not data or 'event_type' not in data:
-            return jsonify({'status': 'error', 'message': 'Missing event_type'}), 400
-
-        event = AnalyticsEvent(
-            user_id=current_user.id if current_user.is_authenticated else None,
-            event_type=data.get('event_type'),
-            event_data=json.dumps(data.get('event_data', {})),
-            ip_address=request.remote_addr,
-            user_agent=request.headers.get('User-Agent', '')
-        )
-
-        db.session.add(event)
-        db.session.commit()
-
-        return jsonify({
-            'status': 'success',
-            'event_id': event.id
-        })
+    # force: sendBeacon() posts the batch flushed on page exit without a JSON content type
+    data = request.get_json(force=True, silent=True)
+    events = data.get('events') if isinstance(data, dict) and 'events' in data else [data]
+
+    if not isinstance(events, list) or not events:
+        return jsonify({'status': 'error', 'message': 'Missing events'}), 400
+    if len(events) > MAX_EVENTS_PER_REQUEST:
+        return jsonify({'status': 'error', 'message': f'At most {MAX_EVENTS_PER_REQUEST} events per request'}), 400
+    if not all(isinstance(event, dict) and event.get('event_type') for event in events):
+        return jsonify({'status': 'error', 'message': 'Missing event_type'}), 400
+    if not all(isinstance(event.get('event_data', {}), dict) for event in events):
+        return jsonify({'status': 'error', 'message': 'event_data must be an object'}), 400
+
+    user_id = current_user.id if current_user.is_authenticated else None
+    ip_address = request.remote_addr
+    user_agent = request.headers.get('User-Agent', '')[:500]
+    now = datetime.utcnow()
+
+    accepted = current_app.extensions[EVENT_BUFFER].add([
+        {
+            'user_id': user_id,
+            'submission_id': None,
+            'event_type': str(event['event_type'])[:50],
+            'event_data': event.get('event_data', {}),
+            'ip_address': ip_address,
+            'user_agent': user_agent,
+            'created_at': now
+        }
+        for event in events
+    ])
 
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({
-            'status': 'error',
-            'message': str(e)
-        }), 500
+    return jsonify({
+        'status': 'success',
+        'accepted': accepted
+    }), 202
 
 
 @analytics_bp.route('/api/analytics/stats', methods=['GET'])
@@ -69,9 +88,10 @@ def analytics_stats():
     if not current_user.is_authenticated or not current_user.is_admin:
         return jsonify({'status': 'error', 'message': 'Admin access required'}), 403
 
-    # Count events by type
-    video_clicks = AnalyticsEvent.query.filter_by(event_type='video_click').count()
-    affiliate_clicks = AnalyticsEvent.query.filter_by(event_type='affiliate_click').count()
+    # Count events by type (summed from the daily rollups)
+    counts = event_counts(('video_click', 'affiliate_click'))
+    video_clicks = counts['video_click']
+    affiliate_clicks = counts['affiliate_click']
 
     # Estimated revenue (conservative)
     # Video clicks: £0.003 per view (£3 CPM)
@@ -110,7 +130,7 @@ def recent_events():
             {
                 'id': event.id,
                 'event_type': event.event_type,
-                'event_data': json.loads(event.event_data) if event.event_data else {},
+                'event_data': event.event_data or {},
                 'user_id': event.user_id,
                 'created_at': event.created_at.isoformat(),
                 'ip_address': event.ip_address
@@ -118,3 +138,38 @@ def recent_events():
             for event in events
         ]
     })
+
+
+@analytics_bp.route('/api/analytics/series', methods=['GET'])
+def analytics_series():
+    """
+    Time-bucketed event counts (for admin dashboard charts), from the rollups
+
+    Query params:
+        period: 'hour' or 'day' (default 'day')
+        points: Number of buckets, ending with the current one
+        by: Split by 'event_type' (default), 'issue_type' or 'product'
+        event_type: Only count this event type
+    """
+    if not current_user.is_authenticated or not current_user.is_admin:
+        return jsonify({'status': 'error', 'message': 'Admin access required'}), 403
+
+    period = request.args.get('period', 'day')
+    by = request.args.get('by', 'event_type')
+    if period not in PERIODS:
+        return jsonify({'status': 'error', 'message': f"period must be one of {', '.join(PERIODS)}"}), 400
+    if by not in DIMENSIONS:
+        return jsonify({'status': 'error', 'message': f"by must be one of {', '.join(DIMENSIONS)}"}), 400
+
+    points = request.args.get('points', DEFAULT_POINTS[period], type=int)
+    points = max(1, min(points, MAX_POINTS))
+
+    buckets, series = event_series(period, points, by=by, event_type=request.args.get('event_type'))
+
+    return jsonify({
+        'status': 'success',
+        'period': period,
+        'by': by,
+        'buckets': [bucket.isoformat() for bucket in buckets],
+        'series': series
+    })
@@ -52,14 +52,14 @@ def register():
         user.set_password(password)
 
         # Generate verification token
-        user.generate_verification_token()
+        token = user.generate_verification_token()
 
         db.session.add(user)
         db.session.commit()
 
         # Send verification email
         try:
-            send_verification_email(user)
+            send_verification_email(user, token)
             flash(f'Registration successful! Please check {email} for verification link.', 'success')
         except Exception as e:
             current_app.logger.error(f"Failed to send verification email: {str(e)}")
@@ -96,6 +96,10 @@ def login():
             flash('Please verify your email address before logging in. Check your inbox for the verification link.', 'warning')
             return render_template('login.html')
 
+        # Save the hash if check_password just upgraded it
+        if db.session.is_modified(user):
+            db.session.commit()
+
         login_user(user, remember=remember)
 
         # Redirect to next page or index
@@ -123,7 +127,7 @@ def verify_email(token):
     """Verify user email with token"""
 
     # Find user with this token
-    user = User.query.filter_by(verification_token=token).first()
+    user = User.find_by_verification_token(token)
 
     if not user:
         flash('Invalid or expired verification link.', 'danger')
@@ -158,12 +162,12 @@ def resend_verification():
             return redirect(url_for('auth.login'))
 
         # Generate new token
-        user.generate_verification_token()
+        token = user.generate_verification_token()
         db.session.commit()
 
         # Send verification email
         try:
-            send_verification_email(user)
+            send_verification_email(user, token)
             flash('Verification email sent! Please check your inbox.', 'success')
         except Exception as e:
             current_app.logger.error(f"Failed to send verification email: {str(e)}")
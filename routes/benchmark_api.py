@@ -3,6 +3,7 @@ Benchmark API Routes
 Provides web-based benchmark control and real-time progress updates
 """
 from flask import Blueprint, jsonify, request, render_template, send_file, session
+import copy
 import subprocess
 import json
 import os
@@ -17,12 +18,30 @@ benchmark_api_bp = Blueprint('benchmark_api', __name__)
 # Store active benchmark processes
 active_benchmarks = {}
 
+# Host hardware doesn't change while the app runs - a complete probe is kept for
+# the life of the process, one where a tool failed is retried after HARDWARE_RETRY_SECONDS
+HARDWARE_RETRY_SECONDS = 60
+_hardware_cache = {}
+_hardware_lock = threading.Lock()
+
 
 def _detect_system_hardware():
     """
-    Detect hardware on host system
+    Detect hardware on host system (probed once, then served from memory)
     This runs BEFORE launching AppImage to ensure accurate detection
     """
+    with _hardware_lock:
+        expires, info = _hardware_cache.get('info', (0, None))
+        if info is None or (expires is not None and time.monotonic() >= expires):
+            info = _probe_system_hardware()
+            complete = all(section.get('detected') for section in info.values())
+            expires = None if complete else time.monotonic() + HARDWARE_RETRY_SECONDS
+            _hardware_cache['info'] = (expires, info)
+        return copy.deepcopy(info)
+
+
+def _probe_system_hardware():
+    """Run lscpu, nvidia-smi and free on the host"""
     hardware_info = {
         'cpu': {},
         'gpu': {},
@@ -410,28 +429,8 @@ def save_gpu_price():
 
         # Get GPU model if not provided
         if not gpu_model:
-            try:
-                # Try to find nvidia-smi
-                import shutil
-                nvidia_smi = shutil.which('nvidia-smi')
-                if not nvidia_smi:
-                    nvidia_smi = '/usr/bin/nvidia-smi'
-
-                result = subprocess.run(
-                    [nvidia_smi, '--query-gpu=name', '--format=csv,noheader'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-
-                if result.returncode == 0:
-                    gpu_model = result.stdout.strip()
-                else:
-                    # Fallback: use generic name
-                    gpu_model = 'Unknown GPU'
-            except Exception as e:
-                # If nvidia-smi fails, use generic name
-                gpu_model = 'Unknown GPU'
+            gpu = _detect_system_hardware()['gpu']
+            gpu_model = gpu['model'] if gpu.get('detected') else 'Unknown GPU'
 
         # Save to config file
         home_dir = Path.home()
@@ -2,9 +2,11 @@
 PiggyBankPC Leaderboard - Best All-Rounder Routes
 Shows systems with best balanced performance for gaming + AI
 """
-from flask import Blueprint, render_template
-from sqlalchemy import desc
-from models import Submission
+from flask import Blueprint, render_template, request, current_app
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+from models import db, Submission
+from utils.pagination import KeysetPagination
 
 best_all_rounder_bp = Blueprint('best_all_rounder', __name__)
 
@@ -13,44 +15,53 @@ best_all_rounder_bp = Blueprint('best_all_rounder', __name__)
 def index():
     """Best All-Rounder leaderboard - balanced gaming + AI performance"""
 
-    # Get all submissions with both FPS and AI scores - exclude unpublished (anti-spoiler)
-    submissions = Submission.query.filter(
+    cursor = request.args.get('cursor')
+
+    # Submissions with both FPS and AI scores have a stored score - exclude unpublished (anti-spoiler)
+    scored_query = Submission.query.options(
+        joinedload(Submission.user)
+    ).filter(
+        Submission.verified == True,
+        Submission.published == True,
+        Submission.all_rounder_score.isnot(None)
+    )
+
+    # Calculate stats in one aggregate query
+    total_all_rounders, avg_score, best_fps, best_tokens = db.session.query(
+        func.count(Submission.id),
+        func.avg(Submission.all_rounder_score),
+        func.max(Submission.fps_avg),
+        func.max(Submission.ai_tokens_per_sec)
+    ).filter(
         Submission.verified == True,
         Submission.published == True,
-        Submission.fps_avg.isnot(None),
-        Submission.ai_tokens_per_sec.isnot(None)
-    ).all()
-
-    # Calculate all-rounder scores and sort
-    scored_submissions = []
-    for sub in submissions:
-        score = sub.all_rounder_score
-        if score:
-            scored_submissions.append({
-                'submission': sub,
-                'score': score
-            })
-
-    # Sort by score (highest first)
-    scored_submissions.sort(key=lambda x: x['score'], reverse=True)
-
-    # Calculate stats
-    total_all_rounders = len(scored_submissions)
-    avg_score = sum(s['score'] for s in scored_submissions) / total_all_rounders if total_all_rounders > 0 else 0
-
-    # Get best in each category
-    best_fps = max((s['submission'].fps_avg for s in scored_submissions), default=0)
-    best_tokens = max((s['submission'].ai_tokens_per_sec for s in scored_submissions), default=0)
+        Submission.all_rounder_score.isnot(None)
+    ).one()
+
+    # Sort by score (highest first), paged by cursor on (score, submission_date, id)
+    pagination = KeysetPagination(
+        scored_query,
+        [Submission.all_rounder_score, Submission.submission_date, Submission.id],
+        cursor=cursor,
+        per_page=current_app.config['SUBMISSIONS_PER_PAGE'],
+        total=total_all_rounders
+    )
+
+    scored_submissions = [
+        {'submission': sub, 'score': sub.all_rounder_score}
+        for sub in pagination.items
+    ]
 
     stats = {
         'total_all_rounders': total_all_rounders,
-        'avg_score': round(avg_score, 1),
-        'best_fps': round(best_fps, 1),
-        'best_tokens': round(best_tokens, 1)
+        'avg_score': round(avg_score or 0, 1),
+        'best_fps': round(best_fps or 0, 1),
+        'best_tokens': round(best_tokens or 0, 1)
     }
 
     return render_template(
         'best_all_rounder.html',
         submissions=scored_submissions,
+        pagination=pagination,
         stats=stats
     )
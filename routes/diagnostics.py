@@ -6,6 +6,9 @@ from flask import Blueprint, render_template, abort
 from flask_login import current_user
 from models import db, Submission, DiagnosticIssue, Improvement
 from sqlalchemy import func
+from utils.diagnostics import get_submission_rank
+from utils.rankings import category_size, ALL_CATEGORY
+from utils.jobs import has_active_jobs, has_failed_jobs
 
 diagnostics_bp = Blueprint('diagnostics', __name__)
 
@@ -30,13 +33,9 @@ def view_diagnostics(submission_id):
         )
     ).all()
 
-    # Get leaderboard rank for this submission
-    rank = Submission.query.filter(
-        Submission.verified == True,
-        Submission.fps_avg > submission.fps_avg
-    ).count() + 1
-
-    total_submissions = Submission.query.filter_by(verified=True).count()
+    # Get leaderboard rank for this submission (indexed read from materialized ranks)
+    rank = get_submission_rank(submission)
+    total_submissions = category_size(ALL_CATEGORY)
 
     # Check if this submission is an improvement over a previous one
     improvement = None
@@ -45,13 +44,21 @@ def view_diagnostics(submission_id):
             after_submission_id=submission.id
         ).first()
 
+    # Diagnostics/improvement jobs still queued or running for this submission
+    processing = has_active_jobs(submission.id)
+
+    # ...or given up on - don't present a report that never ran as "no issues"
+    failed = not processing and has_failed_jobs(submission.id)
+
     return render_template(
         'diagnostics.html',
         submission=submission,
         issues=issues,
         rank=rank,
         total_submissions=total_submissions,
-        improvement=improvement
+        improvement=improvement,
+        processing=processing,
+        failed=failed
     )
 
 
@@ -88,5 +95,7 @@ def view_diagnostics_raw(submission_id):
             for issue in issues
         ],
         'is_improvement': submission.is_improvement,
-        'improvement_percent': submission.improvement_percent
+        'improvement_percent': submission.improvement_percent,
+        'processing': has_active_jobs(submission.id),
+        'failed': has_failed_jobs(submission.id)
     })
@@ -2,13 +2,27 @@
 PiggyBankPC Leaderboard - Leaderboard Routes
 """
 from flask import Blueprint, render_template, request
-from sqlalchemy import desc, asc
-from models import db, Submission, User
-from utils.categories import get_all_categories, OFFICIAL_CATEGORY
+from sqlalchemy.orm import joinedload
+from models import Submission, LeaderboardRank, ConfigurationResult
+from utils.categories import get_all_categories
+from utils.rankings import ranked_submissions, category_size, ALL_CATEGORY
+from utils.pagination import KeysetPagination
+from utils.stats import get_submission_stats
+from utils.query_hints import likely
+from utils.gpu import GPU_BRAND_FILTERS
 from datetime import datetime, timedelta
 
 leaderboard_bp = Blueprint('leaderboard', __name__)
 
+# Sortable columns - only columns backed by the composite leaderboard indexes
+# (see Submission.__table_args__); anything else falls back to FPS
+SORT_COLUMNS = {
+    'fps': Submission.fps_avg,
+    'fps_avg': Submission.fps_avg,
+    'tokens': Submission.ai_tokens_per_sec,
+    'ai_tokens_per_sec': Submission.ai_tokens_per_sec,
+}
+
 
 @leaderboard_bp.route('/leaderboard')
 def index():
@@ -20,7 +34,7 @@ def index():
     price_filter = request.args.get('price', 'all')
     gpu_brand = request.args.get('gpu_brand', 'all')
     time_period = request.args.get('time', 'all')
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
 
     # Get category filter (defaults to 1080p High - official category)
     category = request.args.get('category', 'all')
@@ -40,13 +54,18 @@ def index():
         quality = None
 
     # Start with base query - exclude unpublished official builds (anti-spoiler)
-    query = Submission.query.filter_by(verified=True, published=True)
-
-    # Apply category filter (resolution + quality)
-    if category != 'all' and resolution and quality:
-        query = query.filter(
-            Submission.fps_resolution == resolution,
-            Submission.fps_quality == quality
+    # Users are joined in for the username column (no lazy load per row)
+    query = Submission.query.options(joinedload(Submission.user)).filter_by(verified=True, published=True)
+
+    # Apply category filter (resolution + quality) through the per-category results,
+    # so every configuration benchmarked in one upload competes in its own category
+    in_category = bool(category != 'all' and resolution and quality)
+    if in_category:
+        query = query.join(
+            ConfigurationResult, ConfigurationResult.submission_id == Submission.id
+        ).filter(
+            ConfigurationResult.resolution == resolution,
+            ConfigurationResult.quality == quality
         )
 
     # Apply price filter
@@ -57,101 +76,85 @@ def index():
     elif price_filter == 'over200':
         query = query.filter(Submission.gpu_price > 200)
 
-    # Apply GPU brand filter
-    if gpu_brand != 'all':
-        if gpu_brand == 'nvidia':
-            query = query.filter(
-                (Submission.gpu_model.ilike('%nvidia%')) |
-                (Submission.gpu_model.ilike('%gtx%')) |
-                (Submission.gpu_model.ilike('%rtx%'))
-            )
-        elif gpu_brand == 'amd':
-            query = query.filter(
-                (Submission.gpu_model.ilike('%amd%')) |
-                (Submission.gpu_model.ilike('%radeon%')) |
-                (Submission.gpu_model.ilike('%rx%'))
-            )
-        elif gpu_brand == 'intel':
-            query = query.filter(Submission.gpu_model.ilike('%intel%'))
+    # Apply GPU brand filter (equality on the stored, indexed brand)
+    if gpu_brand in GPU_BRAND_FILTERS:
+        query = query.filter(Submission.gpu_brand == GPU_BRAND_FILTERS[gpu_brand])
 
-    # Apply time period filter
+    # Apply time period filter (checked while walking the sort index, see utils.query_hints)
     if time_period == 'week':
         week_ago = datetime.utcnow() - timedelta(days=7)
-        query = query.filter(Submission.submission_date >= week_ago)
+        query = query.filter(likely(Submission.submission_date >= week_ago))
     elif time_period == 'month':
         month_ago = datetime.utcnow() - timedelta(days=30)
-        query = query.filter(Submission.submission_date >= month_ago)
-
-    # Apply sorting
-    if sort_by == 'tokens':
-        sort_column = Submission.ai_tokens_per_sec
-    elif sort_by == 'fps':
-        sort_column = Submission.fps_avg
-    else:
-        sort_column = getattr(Submission, sort_by, Submission.fps_avg)
-
-    if order == 'desc':
-        query = query.order_by(desc(sort_column))
-    else:
-        query = query.order_by(asc(sort_column))
+        query = query.filter(likely(Submission.submission_date >= month_ago))
 
-    # Add secondary sort by submission date
-    query = query.order_by(desc(Submission.submission_date))
+    # Apply sorting (whitelisted, indexed columns only) - submissions without an
+    # FPS result have no place in an FPS ranking; those without an AI result sort
+    # as the lowest value (last best-first, first worst-first), straight off the index
+    sort_column = SORT_COLUMNS.get(sort_by, Submission.fps_avg)
+    if sort_column is Submission.fps_avg:
+        query = query.filter(sort_column.isnot(None))
 
     # Paginate results
     per_page = 20
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
-    submissions = pagination.items
 
-    # Get statistics - exclude unpublished submissions, filter by category if selected
-    stats_query = Submission.query.filter_by(verified=True, published=True)
-    if category != 'all' and resolution and quality:
-        stats_query = stats_query.filter(
-            Submission.fps_resolution == resolution,
-            Submission.fps_quality == quality
-        )
-
-    total_submissions = stats_query.count()
-    unique_users = db.session.query(Submission.user_id).filter(
-        Submission.verified == True,
-        Submission.published == True
+    # FPS rankings with no extra filters cover exactly the materialized ranks, so the
+    # total is the category size; the default (best first) order is paged by rank
+    rank_category = category if category != 'all' else ALL_CATEGORY
+    is_full_fps_ranking = (
+        sort_column is Submission.fps_avg and
+        price_filter == 'all' and gpu_brand not in GPU_BRAND_FILTERS and time_period == 'all'
     )
-    if category != 'all' and resolution and quality:
-        unique_users = unique_users.filter(
-            Submission.fps_resolution == resolution,
-            Submission.fps_quality == quality
+    total = category_size(rank_category) if is_full_fps_ranking else None
+
+    if is_full_fps_ranking and order == 'desc':
+        pagination = KeysetPagination(
+            ranked_submissions(rank_category).options(joinedload(Submission.user)),
+            [LeaderboardRank.rank],
+            descending=False,
+            cursor=cursor,
+            per_page=per_page,
+            total=total
         )
-    unique_users = unique_users.distinct().count()
-
-    avg_fps_query = db.session.query(db.func.avg(Submission.fps_avg)).filter(
-        Submission.verified == True,
-        Submission.published == True
-    )
-    if category != 'all' and resolution and quality:
-        avg_fps_query = avg_fps_query.filter(
-            Submission.fps_resolution == resolution,
-            Submission.fps_quality == quality
+    elif in_category and sort_column is Submission.fps_avg:
+        # Category FPS: walk the (resolution, quality, fps_avg) index of the results,
+        # with the result id (implicitly last in the index) as tiebreak
+        pagination = KeysetPagination(
+            query,
+            [ConfigurationResult.fps_avg, ConfigurationResult.id],
+            descending=(order == 'desc'),
+            cursor=cursor,
+            per_page=per_page,
+            total=total
         )
-    avg_fps = avg_fps_query.scalar() or 0
-
-    avg_tokens_query = db.session.query(db.func.avg(Submission.ai_tokens_per_sec)).filter(
-        Submission.ai_tokens_per_sec.isnot(None),
-        Submission.verified == True,
-        Submission.published == True
-    )
-    if category != 'all' and resolution and quality:
-        avg_tokens_query = avg_tokens_query.filter(
-            Submission.fps_resolution == resolution,
-            Submission.fps_quality == quality
+    else:
+        # Keyset on (sort value, submission_date, id), all in the same direction, so
+        # the composite index is walked forwards or backwards from the cursor
+        pagination = KeysetPagination(
+            query,
+            [sort_column, Submission.submission_date, Submission.id],
+            descending=(order == 'desc'),
+            cursor=cursor,
+            per_page=per_page,
+            total=total,
+            nullable=sort_column is not Submission.fps_avg
         )
-    avg_tokens = avg_tokens_query.scalar() or 0
+    submissions = pagination.items
+
+    # In a category, show each submission's result for that category
+    category_results = {}
+    if in_category and submissions:
+        category_results = {
+            result.submission_id: result
+            for result in ConfigurationResult.query.filter(
+                ConfigurationResult.submission_id.in_([sub.id for sub in submissions]),
+                ConfigurationResult.resolution == resolution,
+                ConfigurationResult.quality == quality
+            )
+        }
 
-    stats = {
-        'total_submissions': total_submissions,
-        'unique_users': unique_users,
-        'avg_fps': round(avg_fps, 1),
-        'avg_tokens': round(avg_tokens, 1)
-    }
+    # Get statistics for the category and time window - one cached aggregate query
+    stats = get_submission_stats(resolution, quality, time_period)
 
     # Get all available categories for dropdown
     all_categories = get_all_categories()
@@ -159,6 +162,7 @@ def index():
     return render_template(
         'leaderboard.html',
         submissions=submissions,
+        category_results=category_results,
         pagination=pagination,
         stats=stats,
         sort_by=sort_by,
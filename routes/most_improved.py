@@ -2,13 +2,41 @@
 PiggyBankPC Leaderboard - Most Improved Routes
 """
 
-from flask import Blueprint, render_template
+from flask import Blueprint, render_template, request, current_app
+from sqlalchemy.orm import contains_eager, joinedload
 from models import db, Improvement, User, Submission
-from sqlalchemy import desc
+from utils.pagination import KeysetPagination
 
 most_improved_bp = Blueprint('most_improved', __name__)
 
 
+def paginate_improvements(gain_column):
+    """
+    Page verified improvements by a gain column (highest first)
+    Cursor is (gain, created_at, id), served by the composite Improvement indexes
+    The after submission and its user come from the filter joins; the improvement's
+    own user is joined too, so rendering a page issues no per-row queries
+    """
+    query = db.session.query(Improvement).join(
+        Improvement.after_submission
+    ).join(
+        Submission.user
+    ).options(
+        contains_eager(Improvement.after_submission).contains_eager(Submission.user),
+        joinedload(Improvement.user)
+    ).filter(
+        Submission.verified == True,
+        gain_column.isnot(None)
+    )
+
+    return KeysetPagination(
+        query,
+        [gain_column, Improvement.created_at, Improvement.id],
+        cursor=request.args.get('cursor'),
+        per_page=current_app.config['SUBMISSIONS_PER_PAGE']
+    )
+
+
 @most_improved_bp.route('/leaderboard/most-improved')
 def most_improved():
     """
@@ -16,19 +44,13 @@ def most_improved():
     Celebrates improvements and motivates users to optimize their builds
     """
     # Get top improvements ordered by absolute FPS gain
-    improvements = db.session.query(Improvement).join(
-        Improvement.after_submission
-    ).join(
-        Submission.user
-    ).filter(
-        Submission.verified == True
-    ).order_by(
-        desc(Improvement.fps_gain)
-    ).limit(50).all()
+    pagination = paginate_improvements(Improvement.fps_gain)
 
     return render_template(
         'most_improved.html',
-        improvements=improvements
+        improvements=pagination.items,
+        pagination=pagination,
+        pagination_endpoint='most_improved.most_improved'
     )
 
 
@@ -38,17 +60,11 @@ def most_improved_percent():
     Most Improved by percentage - shows users who gained the most %
     Good for showcasing low-end builds that doubled performance
     """
-    improvements = db.session.query(Improvement).join(
-        Improvement.after_submission
-    ).join(
-        Submission.user
-    ).filter(
-        Submission.verified == True
-    ).order_by(
-        desc(Improvement.fps_gain_percent)
-    ).limit(50).all()
+    pagination = paginate_improvements(Improvement.fps_gain_percent)
 
     return render_template(
         'most_improved.html',
-        improvements=improvements
+        improvements=pagination.items,
+        pagination=pagination,
+        pagination_endpoint='most_improved.most_improved_percent'
     )
@@ -4,10 +4,15 @@ Admin-only routes for managing official PiggyBankPC builds
 """
 from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app
 from flask_login import login_required, current_user
-from werkzeug.utils import secure_filename
+from sqlalchemy.exc import IntegrityError
 from models import db, Submission, DiagnosticIssue
 from security import BenchmarkSecurity
-from utils.diagnostics import analyze_submission
+from utils.pipeline import enqueue_submission_pipeline
+from utils.results import extract_submission_data, extract_configuration_results
+from utils.blobstore import is_blob_key, put_blob
+from utils.rankings import sync_submission_rank, remove_submission_rank
+from utils.pagination import KeysetPagination
+from sqlalchemy import func
 from pathlib import Path
 from functools import wraps
 
@@ -32,63 +37,6 @@ def allowed_file(filename):
            filename.rsplit('.', 1)[1].lower() in current_app.config['ALLOWED_EXTENSIONS']
 
 
-def extract_submission_data(validated_results):
-    """
-    Extract submission data from validated results
-    (Shared with submit.py - could be refactored to utils)
-    """
-    try:
-        results = validated_results.get('results', {})
-        system_info = results.get('system_info', {})
-        fps_data = results.get('fps', {})
-        ai_data = results.get('ai', {})
-        cpu_data = results.get('cpu', {})
-
-        cpu = system_info.get('cpu', {})
-        gpu = system_info.get('gpu', {})
-        ram = system_info.get('ram', {})
-
-        data = {
-            'hardware_fingerprint': validated_results.get('hardware_fingerprint', ''),
-            'cpu_model': cpu.get('model', 'Unknown'),
-            'gpu_model': gpu.get('model', 'Unknown'),
-            'gpu_price': system_info.get('gpu_price', 0.0),
-            'ram_total': ram.get('total', 'Unknown'),
-            'benchmark_version': validated_results.get('version', '1.0.0'),
-            'benchmark_timestamp': validated_results.get('timestamp', '')
-        }
-
-        # Extract FPS benchmark results
-        if fps_data.get('status') == 'completed':
-            data['fps_avg'] = fps_data.get('average_fps', 0.0)
-            data['fps_min'] = fps_data.get('min_fps', 0.0)
-            data['fps_max'] = fps_data.get('max_fps', 0.0)
-
-        # Extract GPU metrics
-        gpu_metrics = fps_data.get('gpu_metrics', {})
-        if gpu_metrics:
-            data['gpu_temp_max'] = gpu_metrics.get('temp_max', 0.0)
-            data['gpu_temp_avg'] = gpu_metrics.get('temp_avg', 0.0)
-            data['gpu_load_avg'] = gpu_metrics.get('load_avg', 0.0)
-
-        # Extract AI benchmark results
-        if ai_data.get('status') == 'completed':
-            data['ai_tokens_per_sec'] = ai_data.get('tokens_per_second', 0.0)
-
-        # Extract CPU benchmark results
-        if cpu_data.get('status') == 'completed':
-            if cpu_data.get('benchmark_type') == 'geekbench':
-                data['cpu_score'] = cpu_data.get('multi_core_score', 0.0)
-            else:
-                data['cpu_score'] = cpu_data.get('events_per_second', 0.0)
-
-        return data
-
-    except Exception as e:
-        current_app.logger.error(f"Failed to extract submission data: {str(e)}")
-        return None
-
-
 @official_builds_bp.route('/official-builds')
 def index():
     """Display official PiggyBankPC builds leaderboard"""
@@ -102,25 +50,33 @@ def index():
         # Public view: only show published official builds (anti-spoiler)
         query = Submission.query.filter_by(is_official=True, verified=True, published=True)
 
-    # Sort by FPS (highest first)
-    query = query.order_by(Submission.fps_avg.desc())
-
-    submissions = query.all()
-
-    # Calculate stats for official builds
-    total_builds = len(submissions)
-    avg_fps = sum(s.fps_avg for s in submissions if s.fps_avg) / total_builds if total_builds > 0 else 0
-    avg_tokens = sum(s.ai_tokens_per_sec for s in submissions if s.ai_tokens_per_sec) / len([s for s in submissions if s.ai_tokens_per_sec]) if any(s.ai_tokens_per_sec for s in submissions) else 0
+    # Calculate stats for official builds in one aggregate query
+    total_builds, ranked_builds, avg_fps, avg_tokens = query.with_entities(
+        func.count(Submission.id),
+        func.count(Submission.fps_avg),
+        func.avg(Submission.fps_avg),
+        func.avg(Submission.ai_tokens_per_sec)
+    ).one()
 
     stats = {
         'total_builds': total_builds,
-        'avg_fps': round(avg_fps, 1),
-        'avg_tokens': round(avg_tokens, 1)
+        'avg_fps': round(avg_fps or 0, 1),
+        'avg_tokens': round(avg_tokens or 0, 1)
     }
 
+    # Sort by FPS (highest first), paged by cursor on (fps_avg, submission_date, id)
+    pagination = KeysetPagination(
+        query.filter(Submission.fps_avg.isnot(None)),
+        [Submission.fps_avg, Submission.submission_date, Submission.id],
+        cursor=request.args.get('cursor'),
+        per_page=current_app.config['SUBMISSIONS_PER_PAGE'],
+        total=ranked_builds
+    )
+
     return render_template(
         'official_builds.html',
-        submissions=submissions,
+        submissions=pagination.items,
+        pagination=pagination,
         stats=stats
     )
 
@@ -151,52 +107,73 @@ def submit():
         build_name = request.form.get('build_name', '').strip()
 
         try:
-            # Read file content
-            file_content = file.read().decode('utf-8')
-
             # Initialize security module
             security = BenchmarkSecurity(
                 base_dir=current_app.config['BASE_DIR'],
                 signing_key=current_app.config['BENCHMARK_SECURITY_KEY']
             )
 
-            # Validate submission
-            validated_results = security.validate_submission_content(file_content)
+            # Repeat upload of a file we already have - go straight to its report
+            content_hash = security.content_hash(file.stream)
+            duplicate_id = db.session.query(Submission.id).filter_by(content_hash=content_hash).scalar()
+            if duplicate_id:
+                flash('This benchmark file has already been submitted - here is its diagnostic report.', 'info')
+                return redirect(url_for('diagnostics.view_diagnostics', submission_id=duplicate_id))
+
+            # Validate submission - decoded straight from the upload stream, capped at
+            # MAX_CONTENT_LENGTH decoded bytes
+            validated_results = security.validate_submission_content(
+                file.stream,
+                max_decoded_length=current_app.config['MAX_CONTENT_LENGTH']
+            )
 
             if not validated_results:
                 flash('Invalid submission file. The signature verification failed.', 'danger')
                 return redirect(request.url)
 
             # Extract data
-            submission_data = extract_submission_data(validated_results)
+            record = extract_submission_data(validated_results)
 
-            if not submission_data:
+            if not record:
                 flash('Failed to extract benchmark data from submission.', 'danger')
                 return redirect(request.url)
 
-            # Save file
-            filename = secure_filename(file.filename)
-            upload_path = Path(current_app.config['UPLOAD_FOLDER'])
-            upload_path.mkdir(exist_ok=True, parents=True)
-
-            unique_filename = f"official_{current_user.id}_{submission_data['hardware_fingerprint'][:8]}_{filename}"
-            filepath = upload_path / unique_filename
-
-            with open(filepath, 'w') as f:
-                f.write(file_content)
+            # Store the original bytes in the content-addressed blob store
+            file.stream.seek(0)
+            blob_key = put_blob(file.stream)
 
             # Create official submission record
             submission = Submission(
                 user_id=current_user.id,
-                pbr_filename=unique_filename,
+                pbr_filename=blob_key,
+                content_hash=content_hash,
                 is_official=True,  # Mark as official build
                 youtube_video_url=youtube_url if youtube_url else None,
                 build_name=build_name if build_name else None,
                 published=(youtube_url != ''),  # Auto-publish if YouTube URL provided, otherwise keep hidden
-                **submission_data
+                **record.as_dict()
             )
 
+            # One result per valid category, for the category leaderboards
+            submission.configuration_results = extract_configuration_results(validated_results)
+
             db.session.add(submission)
+            try:
+                db.session.flush()
+            except IntegrityError:
+                # The same file was uploaded concurrently and the other request won
+                db.session.rollback()
+                duplicate_id = db.session.query(Submission.id).filter_by(content_hash=content_hash).scalar()
+                if not duplicate_id:
+                    raise
+                flash('This benchmark file has already been submitted - here is its diagnostic report.', 'info')
+                return redirect(url_for('diagnostics.view_diagnostics', submission_id=duplicate_id))
+
+            # Published builds go straight onto the materialized leaderboard ranks
+            sync_submission_rank(submission)
+
+            # Diagnostic analysis runs in the background workers
+            enqueue_submission_pipeline(submission, stages=('analyze_submission',))
             db.session.commit()
 
             # Log publish status
@@ -205,9 +182,7 @@ def submit():
             else:
                 current_app.logger.info(f"Official build created as UNPUBLISHED (no YouTube link) - anti-spoiler active")
 
-            # Run diagnostic analysis
-            issues = analyze_submission(submission)
-            current_app.logger.info(f"Official build submitted: {len(issues)} issues detected")
+            current_app.logger.info(f"Official build submitted: submission {submission.id}")
 
             flash(f'Official build "{build_name or "Untitled"}" submitted successfully!', 'success')
             return redirect(url_for('official_builds.index'))
@@ -237,10 +212,14 @@ def edit(submission_id):
         published = request.form.get('published') == 'on'
 
         try:
+            was_published = submission.published
             submission.youtube_video_url = youtube_url if youtube_url else None
             submission.build_name = build_name if build_name else None
             submission.published = published
 
+            # Publishing/unpublishing adds or removes the build from the leaderboard ranks
+            if published != was_published:
+                sync_submission_rank(submission)
             db.session.commit()
 
             status = "published" if published else "unpublished"
@@ -269,12 +248,13 @@ def delete(submission_id):
         return redirect(url_for('official_builds.index'))
 
     try:
-        # Delete associated file if it exists
-        if submission.pbr_filename:
+        # Delete a legacy upload file - blobs may be shared and are left to collect_garbage()
+        if submission.pbr_filename and not is_blob_key(submission.pbr_filename):
             filepath = Path(current_app.config['UPLOAD_FOLDER']) / submission.pbr_filename
             if filepath.exists():
                 filepath.unlink()
 
+        remove_submission_rank(submission)
         db.session.delete(submission)
         db.session.commit()
 
@@ -5,6 +5,7 @@ from flask import Blueprint, render_template, abort, flash, redirect, url_for
 from flask_login import login_required, current_user
 from sqlalchemy import desc, func
 from models import db, User, Submission
+from utils.rankings import remove_submission_rank
 
 profile_bp = Blueprint('profile', __name__)
 
@@ -96,7 +97,8 @@ def delete_submission(username, submission_id):
     if submission.user_id != current_user.id and not current_user.is_admin:
         abort(403)
 
-    # Delete the submission
+    # Delete the submission (and close the gap it leaves in the leaderboard ranks)
+    remove_submission_rank(submission)
     db.session.delete(submission)
     db.session.commit()
 
@@ -3,15 +3,15 @@ PiggyBankPC Leaderboard - Submission Routes
 """
 from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app
 from flask_login import login_required, current_user
-from werkzeug.utils import secure_filename
-from models import db, Submission, DiagnosticIssue, Improvement
+from sqlalchemy.exc import IntegrityError
+from models import db, Submission
 from security import BenchmarkSecurity
-from utils.diagnostics import analyze_submission, get_submission_rank
-from utils.improvements import track_improvement, detect_fixes_from_diagnostics, detect_improvement_opportunity
-from utils.achievements import check_and_award_achievements
 from utils.categories import validate_submission_category
+from utils.results import extract_submission_data, extract_configuration_results
+from utils.rankings import sync_submission_rank
+from utils.pipeline import enqueue_submission_pipeline
+from utils.blobstore import put_blob
 import os
-from pathlib import Path
 
 submit_bp = Blueprint('submit', __name__)
 
@@ -52,160 +52,6 @@ def is_intel_13_14_gen_cpu(cpu_model):
     return any(pattern in cpu_lower for pattern in intel_patterns)
 
 
-def extract_submission_data(validated_results):
-    """
-    Extract submission data from validated results
-
-    Args:
-        validated_results: Validated benchmark results from security module
-
-    Returns:
-        dict: Extracted data ready for database
-    """
-    try:
-        results = validated_results.get('results', {})
-        system_info = results.get('system_info', {})
-        fps_data = results.get('fps', {})
-        ai_data = results.get('ai', {})
-        cpu_data = results.get('cpu', {})
-
-        # Extract system information
-        cpu = system_info.get('cpu', {})
-        gpu = system_info.get('gpu', {})
-        ram = system_info.get('ram', {})
-
-        # Extract CPU details
-        cpu_cores = cpu.get('cores')
-        cpu_threads = cpu.get('threads')
-        cpu_max_mhz = cpu.get('max_mhz', '')
-
-        # Format CPU clock speed nicely
-        cpu_clock_speed = None
-        if cpu_max_mhz:
-            try:
-                # Convert MHz to GHz if available
-                mhz_value = float(cpu_max_mhz)
-                if mhz_value >= 1000:
-                    cpu_clock_speed = f"{mhz_value / 1000:.2f} GHz"
-                else:
-                    cpu_clock_speed = f"{mhz_value} MHz"
-            except (ValueError, TypeError):
-                cpu_clock_speed = str(cpu_max_mhz)
-
-        # Extract RAM details
-        ram_type = ram.get('type')
-        ram_speed = ram.get('speed', '')
-
-        # Parse RAM speed from "2666 MT/s" format
-        ram_speed_mhz = None
-        if ram_speed and isinstance(ram_speed, str):
-            try:
-                # Extract numeric value from "2666 MT/s" format
-                speed_parts = ram_speed.split()
-                if speed_parts:
-                    ram_speed_mhz = int(speed_parts[0])
-            except (ValueError, IndexError):
-                pass
-
-        data = {
-            'hardware_fingerprint': validated_results.get('hardware_fingerprint', ''),
-            'cpu_model': cpu.get('model', 'Unknown'),
-            'cpu_cores': cpu_cores,
-            'cpu_threads': cpu_threads,
-            'cpu_clock_speed': cpu_clock_speed,
-            'gpu_model': gpu.get('model', 'Unknown'),
-            'gpu_price': system_info.get('gpu_price', 0.0),
-            'ram_total': ram.get('total', 'Unknown'),
-            'ram_type': ram_type,
-            'ram_speed_mhz': ram_speed_mhz,
-            'benchmark_version': validated_results.get('version', '1.0.0'),
-            'benchmark_timestamp': validated_results.get('timestamp', '')
-        }
-
-        # Extract FPS benchmark results
-        if fps_data.get('status') == 'completed':
-            # Handle new Heaven interactive format with configurations
-            if 'configurations' in fps_data and fps_data['configurations']:
-                # Get first configuration (or highest FPS if multiple)
-                configs = fps_data['configurations']
-                best_config = None
-                best_fps = 0
-
-                for config_name, config_data in configs.items():
-                    if config_data.get('average_fps', 0) > best_fps:
-                        best_fps = config_data.get('average_fps', 0)
-                        best_config = config_data
-
-                if best_config:
-                    data['fps_avg'] = best_config.get('average_fps', 0.0)
-                    data['fps_min'] = best_config.get('min_fps', 0.0)
-                    data['fps_max'] = best_config.get('max_fps', 0.0)
-                    data['fps_resolution'] = best_config.get('resolution', '')
-                    data['fps_quality'] = best_config.get('quality', '')
-
-                    # Extract thermal metrics from this configuration
-                    thermal_metrics = best_config.get('thermal_metrics', {})
-                    if thermal_metrics:
-                        data['gpu_temp_min'] = thermal_metrics.get('gpu_temp_min')
-                        data['gpu_temp_avg'] = thermal_metrics.get('gpu_temp_avg')
-                        data['gpu_temp_max'] = thermal_metrics.get('gpu_temp_max')
-                        data['gpu_util_min'] = thermal_metrics.get('gpu_util_min')
-                        data['gpu_util_avg'] = thermal_metrics.get('gpu_util_avg')
-                        data['gpu_util_max'] = thermal_metrics.get('gpu_util_max')
-                        data['cpu_temp_min'] = thermal_metrics.get('cpu_temp_min')
-                        data['cpu_temp_avg'] = thermal_metrics.get('cpu_temp_avg')
-                        data['cpu_temp_max'] = thermal_metrics.get('cpu_temp_max')
-                        data['cpu_util_min'] = thermal_metrics.get('cpu_util_min')
-                        data['cpu_util_avg'] = thermal_metrics.get('cpu_util_avg')
-                        data['cpu_util_max'] = thermal_metrics.get('cpu_util_max')
-            else:
-                # Fallback to old format
-                data['fps_avg'] = fps_data.get('average_fps', 0.0)
-                data['fps_min'] = fps_data.get('min_fps', 0.0)
-                data['fps_max'] = fps_data.get('max_fps', 0.0)
-
-                # Extract thermal metrics from old format
-                thermal_metrics = fps_data.get('thermal_metrics', {})
-                if thermal_metrics:
-                    data['gpu_temp_min'] = thermal_metrics.get('gpu_temp_min')
-                    data['gpu_temp_avg'] = thermal_metrics.get('gpu_temp_avg')
-                    data['gpu_temp_max'] = thermal_metrics.get('gpu_temp_max')
-                    data['gpu_util_min'] = thermal_metrics.get('gpu_util_min')
-                    data['gpu_util_avg'] = thermal_metrics.get('gpu_util_avg')
-                    data['gpu_util_max'] = thermal_metrics.get('gpu_util_max')
-                    data['cpu_temp_min'] = thermal_metrics.get('cpu_temp_min')
-                    data['cpu_temp_avg'] = thermal_metrics.get('cpu_temp_avg')
-                    data['cpu_temp_max'] = thermal_metrics.get('cpu_temp_max')
-                    data['cpu_util_min'] = thermal_metrics.get('cpu_util_min')
-                    data['cpu_util_avg'] = thermal_metrics.get('cpu_util_avg')
-                    data['cpu_util_max'] = thermal_metrics.get('cpu_util_max')
-
-        # Phase 2: Extract GPU metrics for diagnostic analysis
-        gpu_metrics = fps_data.get('gpu_metrics', {})
-        if gpu_metrics:
-            data['gpu_temp_max'] = gpu_metrics.get('temp_max', 0.0)
-            data['gpu_temp_avg'] = gpu_metrics.get('temp_avg', 0.0)
-            data['gpu_load_avg'] = gpu_metrics.get('load_avg', 0.0)
-
-        # Extract AI benchmark results
-        if ai_data.get('status') == 'completed':
-            data['ai_tokens_per_sec'] = ai_data.get('tokens_per_second', 0.0)
-
-        # Extract CPU benchmark results
-        if cpu_data.get('status') == 'completed':
-            # Support different CPU benchmark types
-            if cpu_data.get('benchmark_type') == 'geekbench':
-                data['cpu_score'] = cpu_data.get('multi_core_score', 0.0)
-            else:
-                data['cpu_score'] = cpu_data.get('events_per_second', 0.0)
-
-        return data
-
-    except Exception as e:
-        current_app.logger.error(f"Failed to extract submission data: {str(e)}")
-        return None
-
-
 @submit_bp.route('/submit', methods=['GET', 'POST'])
 @login_required
 def submit():
@@ -228,17 +74,25 @@ def submit():
             return redirect(request.url)
 
         try:
-            # Read file content
-            file_content = file.read().decode('utf-8')
-
             # Initialize security module
             security = BenchmarkSecurity(
                 base_dir=current_app.config['BASE_DIR'],
                 signing_key=current_app.config['BENCHMARK_SECURITY_KEY']
             )
 
-            # Validate submission
-            validated_results = security.validate_submission_content(file_content)
+            # Repeat upload of a file we already have - go straight to its report
+            content_hash = security.content_hash(file.stream)
+            duplicate_id = db.session.query(Submission.id).filter_by(content_hash=content_hash).scalar()
+            if duplicate_id:
+                flash('This benchmark file has already been submitted - here is its diagnostic report.', 'info')
+                return redirect(url_for('diagnostics.view_diagnostics', submission_id=duplicate_id))
+
+            # Validate submission - decoded straight from the upload stream, capped at
+            # MAX_CONTENT_LENGTH decoded bytes
+            validated_results = security.validate_submission_content(
+                file.stream,
+                max_decoded_length=current_app.config['MAX_CONTENT_LENGTH']
+            )
 
             if not validated_results:
                 flash('Invalid submission file. The signature verification failed. '
@@ -246,42 +100,37 @@ def submit():
                 return redirect(request.url)
 
             # Extract data
-            submission_data = extract_submission_data(validated_results)
+            record = extract_submission_data(validated_results)
 
-            if not submission_data:
+            if not record:
                 flash('Failed to extract benchmark data from submission.', 'danger')
                 return redirect(request.url)
 
             # Validate category (resolution/quality combination)
             category_error = validate_submission_category(
-                submission_data.get('fps_resolution'),
-                submission_data.get('fps_quality')
+                record.fps_resolution,
+                record.fps_quality
             )
             if category_error:
                 flash(f'Invalid benchmark settings. {category_error}', 'danger')
                 current_app.logger.warning(f"Category validation failed: {category_error}")
                 return redirect(request.url)
 
-            # Save file to uploads directory
-            filename = secure_filename(file.filename)
-            upload_path = Path(current_app.config['UPLOAD_FOLDER'])
-            upload_path.mkdir(exist_ok=True, parents=True)
-
-            # Add user ID and timestamp to filename to ensure uniqueness
-            unique_filename = f"{current_user.id}_{submission_data['hardware_fingerprint'][:8]}_{filename}"
-            filepath = upload_path / unique_filename
-
-            # Write the file
-            with open(filepath, 'w') as f:
-                f.write(file_content)
+            # Store the original bytes in the content-addressed blob store
+            file.stream.seek(0)
+            blob_key = put_blob(file.stream)
 
             # Create submission record
             submission = Submission(
                 user_id=current_user.id,
-                pbr_filename=unique_filename,
-                **submission_data
+                pbr_filename=blob_key,
+                content_hash=content_hash,
+                **record.as_dict()
             )
 
+            # Every valid category benchmarked in the session, stored with the submission
+            submission.configuration_results = extract_configuration_results(validated_results)
+
             # Anti-Spoiler: If user is admin uploading official build, mark as unpublished
             # This prevents spoilers until YouTube video is released
             if current_user.is_admin:
@@ -295,56 +144,27 @@ def submit():
                 current_app.logger.warning(f"Intel 13th/14th gen CPU detected: {submission.cpu_model}")
 
             db.session.add(submission)
+            try:
+                db.session.flush()
+            except IntegrityError:
+                # The same file was uploaded concurrently and the other request won
+                db.session.rollback()
+                duplicate_id = db.session.query(Submission.id).filter_by(content_hash=content_hash).scalar()
+                if not duplicate_id:
+                    raise
+                flash('This benchmark file has already been submitted - here is its diagnostic report.', 'info')
+                return redirect(url_for('diagnostics.view_diagnostics', submission_id=duplicate_id))
+
+            # Slot into the materialized leaderboard ranks in the same transaction
+            sync_submission_rank(submission)
+
+            # Phase 2 (diagnostics, improvement tracking, achievements) runs in the
+            # background workers - queued in the same transaction as the submission
+            enqueue_submission_pipeline(submission)
             db.session.commit()
 
-            # ========== PHASE 2: DIAGNOSTIC ANALYSIS & IMPROVEMENT TRACKING ==========
-
-            # Check for previous submissions (improvement tracking)
-            previous = detect_improvement_opportunity(
-                current_user.id,
-                submission_data['hardware_fingerprint']
-            )
-
-            improvement_obj = None
-            if previous:
-                # This is a re-submission - track improvement!
-                current_app.logger.info(f"Detected re-submission for user {current_user.id}")
-
-                # Get diagnostic issues from previous submission
-                before_issues = DiagnosticIssue.query.filter_by(
-                    submission_id=previous['id']
-                ).all()
-
-                # Auto-detect which fixes were applied
-                fixes = detect_fixes_from_diagnostics(before_issues, submission)
-
-                # Track the improvement
-                improvement_obj = track_improvement(
-                    before_submission_id=previous['id'],
-                    after_submission=submission,
-                    fixes_applied=fixes
-                )
-
-                current_app.logger.info(f"Improvement tracked: +{improvement_obj.fps_gain:.1f} FPS")
-
-            # Run diagnostic analysis on this submission
-            issues = analyze_submission(submission)
-            current_app.logger.info(f"Diagnostic analysis complete: {len(issues)} issues detected")
-
-            # Award "First Submission" achievement if this is their first
-            check_and_award_achievements(user_id=current_user.id)
-
-            # If there was an improvement, check for improvement-based achievements
-            if improvement_obj:
-                check_and_award_achievements(
-                    user_id=current_user.id,
-                    improvement=improvement_obj
-                )
-
-            # ========== END PHASE 2 ==========
-
             # Redirect to diagnostic results page (the money-maker!)
-            flash('Submission successful! View your diagnostic report below.', 'success')
+            flash('Submission successful! Your diagnostic report will appear below in a few moments.', 'success')
             return redirect(url_for('diagnostics.view_diagnostics', submission_id=submission.id))
 
         except Exception as e:
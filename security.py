@@ -6,9 +6,12 @@ Handles result signing, hardware fingerprinting, and tamper protection
 
 import hashlib
 import hmac
+import io
 import json
+import struct
+import zlib
+import os
 import uuid
-import subprocess
 import logging
 from datetime import datetime
 from pathlib import Path
@@ -21,6 +24,24 @@ class BenchmarkSecurity:
 
     VERSION = "1.0.0"
 
+    # Fingerprint sources - plain files, so fingerprinting never spawns a process
+    DMI_DIR = Path('/sys/class/dmi/id')
+    NVIDIA_GPUS_DIR = Path('/proc/driver/nvidia/gpus')
+    MACHINE_ID_FILE = Path('/etc/machine-id')
+    BOOT_ID_FILE = Path('/proc/sys/kernel/random/boot_id')
+
+    # .pbr format v1: base64 JSON of {data, signature}, HMAC over json.dumps(data, sort_keys=True)
+    # .pbr format v2: 'PBR2.<base64 payload>.<signature>', HMAC over the text before the last '.'
+    FORMAT_V2_PREFIX = "PBR2."
+
+    # .pbr format v3: binary container - header, zlib-compressed JSON, raw HMAC over everything before it
+    #   magic 'PBR3' | codec (1 byte, 1 = zlib) | decoded length (uint64 BE) | payload | HMAC-SHA256 (32 bytes)
+    CONTAINER_MAGIC = b"PBR3"
+    CONTAINER_HEADER = struct.Struct('>4sBQ')
+    CODEC_ZLIB = 1
+    DIGEST_SIZE = hashlib.sha256().digest_size
+    CHUNK_SIZE = 64 * 1024
+
     def __init__(self, base_dir, signing_key=None):
         self.base_dir = Path(base_dir)
         self.logger = logging.getLogger("BenchmarkSecurity")
@@ -34,9 +55,18 @@ class BenchmarkSecurity:
         Generate unique hardware fingerprint for this system
         Makes it harder to fake results from different hardware
 
+        Read from files only (no subprocesses) and cached per boot, so signing
+        results at the end of a run is instant.
+
         Returns:
             str: Unique hardware fingerprint hash
         """
+        boot_key = self._boot_key()
+
+        cached = self._read_fingerprint_cache()
+        if boot_key and cached.get('boot_key') == boot_key and cached.get('fingerprint'):
+            return cached['fingerprint']
+
         fingerprint_data = []
 
         try:
@@ -46,38 +76,25 @@ class BenchmarkSecurity:
                     if 'model name' in line or 'vendor_id' in line:
                         fingerprint_data.append(line.strip())
 
-            # Motherboard info
-            try:
-                result = subprocess.run(
-                    ['sudo', 'dmidecode', '-t', 'baseboard'],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                if result.returncode == 0:
-                    for line in result.stdout.split('\n'):
-                        if 'Serial Number' in line or 'UUID' in line:
-                            fingerprint_data.append(line.strip())
-            except:
-                pass
+            # Motherboard serial - the line `dmidecode -t baseboard` used to give
+            # (/sys/class/dmi/id/board_serial is root-only on most systems)
+            board_serial = self._read_text(self.DMI_DIR / 'board_serial')
+            if board_serial:
+                fingerprint_data.append(f"Serial Number: {board_serial}")
 
             # Machine ID
-            machine_id_file = Path('/etc/machine-id')
-            if machine_id_file.exists():
-                fingerprint_data.append(machine_id_file.read_text().strip())
-
-            # GPU UUID
-            try:
-                result = subprocess.run(
-                    ['nvidia-smi', '--query-gpu=uuid', '--format=csv,noheader'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                if result.returncode == 0:
-                    fingerprint_data.append(result.stdout.strip())
-            except:
-                pass
+            machine_id = self._read_text(self.MACHINE_ID_FILE)
+            if machine_id:
+                fingerprint_data.append(machine_id)
+
+            # GPU UUIDs, in PCI bus order as nvidia-smi lists them
+            gpu_uuids = []
+            for info in sorted(self.NVIDIA_GPUS_DIR.glob('*/information')):
+                for line in (self._read_text(info) or '').splitlines():
+                    if line.startswith('GPU UUID:'):
+                        gpu_uuids.append(line.split(':', 1)[1].strip())
+            if gpu_uuids:
+                fingerprint_data.append('\n'.join(gpu_uuids))
 
             # Combine all fingerprint data
             combined = "|".join(fingerprint_data)
@@ -86,6 +103,9 @@ class BenchmarkSecurity:
             fingerprint_hash = hashlib.sha256(combined.encode()).hexdigest()
 
             self.logger.info(f"Generated hardware fingerprint: {fingerprint_hash[:16]}...")
+
+            if boot_key:
+                self._write_fingerprint_cache({'boot_key': boot_key, 'fingerprint': fingerprint_hash})
             return fingerprint_hash
 
         except Exception as e:
@@ -93,6 +113,43 @@ class BenchmarkSecurity:
             # Fallback to random UUID if fingerprinting fails
             return str(uuid.uuid4())
 
+    @staticmethod
+    def _read_text(path: Path) -> Optional[str]:
+        """Stripped contents of a small system file, or None if missing/unreadable"""
+        try:
+            return Path(path).read_text().strip() or None
+        except OSError:
+            return None
+
+    def _boot_key(self) -> Optional[str]:
+        """Identifies this boot of this machine - hardware can only change across reboots"""
+        boot_id = self._read_text(self.BOOT_ID_FILE)
+        machine_id = self._read_text(self.MACHINE_ID_FILE)
+        if not boot_id or not machine_id:
+            return None
+        return f"{machine_id}:{boot_id}"
+
+    def _fingerprint_cache_path(self) -> Path:
+        """Per-user cache file (the AppImage's own directory is read-only)"""
+        cache_home = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+        return Path(cache_home) / 'piggybankpc' / 'hardware_fingerprint.json'
+
+    def _read_fingerprint_cache(self) -> Dict:
+        try:
+            return json.loads(self._fingerprint_cache_path().read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _write_fingerprint_cache(self, entry: Dict):
+        try:
+            path = self._fingerprint_cache_path()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix('.tmp')
+            tmp_path.write_text(json.dumps(entry))
+            tmp_path.replace(path)
+        except OSError as e:
+            self.logger.warning(f"Could not cache hardware fingerprint: {str(e)}")
+
     def sign_results(self, results: Dict) -> Dict:
         """
         Sign benchmark results with HMAC to prevent tampering
@@ -116,22 +173,7 @@ class BenchmarkSecurity:
                 'results': results
             }
 
-            # Convert to canonical JSON (sorted keys for consistent hashing)
-            canonical_json = json.dumps(data_package, sort_keys=True)
-
-            # Generate HMAC signature
-            signature = hmac.new(
-                self.signing_key.encode(),
-                canonical_json.encode(),
-                hashlib.sha256
-            ).hexdigest()
-
-            # Create final signed package
-            signed_package = {
-                'data': data_package,
-                'signature': signature,
-                'signature_algorithm': 'HMAC-SHA256'
-            }
+            signed_package = self.pack_container(data_package)
 
             self.logger.info("Results signed successfully")
             return signed_package
@@ -140,9 +182,33 @@ class BenchmarkSecurity:
             self.logger.error(f"Failed to sign results: {str(e)}")
             raise
 
+    def sign_data_package(self, data_package: Dict) -> Dict:
+        """
+        Serialize a data package once and sign the bytes as written (format v2)
+
+        Args:
+            data_package: Version, timestamp, fingerprint and results
+
+        Returns:
+            dict: Signed package - 'token' is the exact text that goes into the .pbr file
+        """
+        payload = base64.b64encode(json.dumps(data_package).encode()).decode()
+        signed_part = f"{self.FORMAT_V2_PREFIX}{payload}"
+
+        return {
+            'data': data_package,
+            'format': 2,
+            'token': f"{signed_part}.{self._hmac(signed_part.encode())}",
+            'signature_algorithm': 'HMAC-SHA256'
+        }
+
+    def _hmac(self, message: bytes) -> str:
+        """HMAC-SHA256 hex digest of message with the signing key"""
+        return hmac.new(self.signing_key.encode(), message, hashlib.sha256).hexdigest()
+
     def verify_signature(self, signed_package: Dict) -> bool:
         """
-        Verify that signed results haven't been tampered with
+        Verify that signed results haven't been tampered with (format v1)
 
         Args:
             signed_package: Signed results package
@@ -194,6 +260,10 @@ class BenchmarkSecurity:
             str: Base64 encoded submission string
         """
         try:
+            # v2 packages were encoded when they were signed
+            if signed_package.get('format') == 2:
+                return signed_package['token']
+
             json_string = json.dumps(signed_package)
             encoded = base64.b64encode(json_string.encode()).decode()
 
@@ -209,11 +279,14 @@ class BenchmarkSecurity:
         Decode and verify submitted results
 
         Args:
-            encoded_string: Base64 encoded submission
+            encoded_string: Base64 encoded submission (v1) or signed v2 token
 
         Returns:
             dict: Decoded and verified results, or None if invalid
         """
+        if encoded_string.startswith(self.FORMAT_V2_PREFIX):
+            return self.decode_submission_v2(encoded_string)
+
         try:
             # Decode from base64
             json_string = base64.b64decode(encoded_string.encode()).decode()
@@ -231,6 +304,128 @@ class BenchmarkSecurity:
             self.logger.error(f"Failed to decode submission: {str(e)}")
             return None
 
+    def decode_submission_v2(self, token: str) -> Optional[Dict]:
+        """
+        Verify a v2 token, then decode it
+
+        The HMAC covers the token text itself, so a tampered or forged file is
+        rejected before any base64 decoding or JSON parsing happens.
+
+        Args:
+            token: 'PBR2.<base64 payload>.<hex signature>'
+
+        Returns:
+            dict: Verified results, or None if invalid
+        """
+        try:
+            signed_part, _, provided_signature = token.rpartition('.')
+            if not signed_part.startswith(self.FORMAT_V2_PREFIX) or not provided_signature:
+                self.logger.error("Malformed v2 submission")
+                return None
+
+            # Constant-time comparison to prevent timing attacks
+            if not hmac.compare_digest(self._hmac(signed_part.encode()), provided_signature):
+                self.logger.warning("Signature verification FAILED")
+                return None
+
+            payload = signed_part[len(self.FORMAT_V2_PREFIX):]
+            data = json.loads(base64.b64decode(payload, validate=True))
+
+            self.logger.info("Submission decoded and verified successfully")
+            return data
+
+        except Exception as e:
+            self.logger.error(f"Failed to decode submission: {str(e)}")
+            return None
+
+    def pack_container(self, data_package: Dict) -> Dict:
+        """
+        Compress and sign a data package into a binary .pbr container (format v3)
+
+        Args:
+            data_package: Version, timestamp, fingerprint and results
+
+        Returns:
+            dict: Signed package - 'container' is the exact bytes of the .pbr file
+        """
+        payload = json.dumps(data_package, separators=(',', ':')).encode()
+        body = self.CONTAINER_HEADER.pack(self.CONTAINER_MAGIC, self.CODEC_ZLIB, len(payload)) + zlib.compress(payload, 9)
+
+        return {
+            'data': data_package,
+            'format': 3,
+            'container': body + hmac.new(self.signing_key.encode(), body, hashlib.sha256).digest(),
+            'signature_algorithm': 'HMAC-SHA256'
+        }
+
+    def decode_container(self, stream, max_decoded_length: Optional[int] = None, header: bytes = b'') -> Optional[Dict]:
+        """
+        Verify and decode a binary .pbr container, reading the stream in chunks
+
+        The declared length is checked against max_decoded_length before anything
+        is decompressed, and decompression stops as soon as the output outgrows it,
+        so a small upload can't expand into an unbounded payload. JSON is parsed
+        only after the trailing signature matches.
+
+        Args:
+            stream: Binary file-like object positioned at the start of the container
+            max_decoded_length: Largest acceptable decompressed payload in bytes
+            header: Bytes already read from the stream (e.g. while sniffing the magic)
+
+        Returns:
+            dict: Verified results, or None if invalid
+        """
+        try:
+            header += stream.read(self.CONTAINER_HEADER.size - len(header))
+            if len(header) < self.CONTAINER_HEADER.size:
+                self.logger.error("Truncated submission container")
+                return None
+
+            magic, codec, length = self.CONTAINER_HEADER.unpack(header)
+            if magic != self.CONTAINER_MAGIC or codec != self.CODEC_ZLIB:
+                self.logger.error(f"Unsupported submission container (codec {codec})")
+                return None
+            if max_decoded_length is not None and length > max_decoded_length:
+                self.logger.error(f"Submission too large: {length} bytes decoded")
+                return None
+
+            mac = hmac.new(self.signing_key.encode(), header, hashlib.sha256)
+            decompressor = zlib.decompressobj()
+            payload = bytearray()
+            tail = b''
+
+            # The last DIGEST_SIZE bytes are the signature - hold them back from the payload
+            while True:
+                chunk = stream.read(self.CHUNK_SIZE)
+                if not chunk:
+                    break
+                data = tail + chunk
+                body, tail = data[:-self.DIGEST_SIZE], data[-self.DIGEST_SIZE:]
+
+                mac.update(body)
+                payload += decompressor.decompress(body, length - len(payload) + 1)
+                if len(payload) > length or decompressor.unconsumed_tail:
+                    self.logger.error("Submission payload is larger than declared")
+                    return None
+
+            # Constant-time comparison to prevent timing attacks
+            if len(tail) != self.DIGEST_SIZE or not hmac.compare_digest(mac.digest(), tail):
+                self.logger.warning("Signature verification FAILED")
+                return None
+
+            if not decompressor.eof or len(payload) != length:
+                self.logger.error("Submission payload is truncated")
+                return None
+
+            data = json.loads(payload)
+
+            self.logger.info("Submission decoded and verified successfully")
+            return data
+
+        except Exception as e:
+            self.logger.error(f"Failed to decode submission: {str(e)}")
+            return None
+
     def create_submission_file(self, signed_package: Dict, output_dir: Path) -> Path:
         """
         Create encrypted submission file for user to upload
@@ -246,9 +441,6 @@ class BenchmarkSecurity:
             output_dir = Path(output_dir)
             output_dir.mkdir(exist_ok=True, parents=True)
 
-            # Encode the package
-            encoded = self.encode_for_submission(signed_package)
-
             # Create filename with timestamp and hardware fingerprint
             hardware_fp = signed_package['data']['hardware_fingerprint']
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -256,15 +448,21 @@ class BenchmarkSecurity:
 
             filepath = output_dir / filename
 
-            # Write submission file
-            with open(filepath, 'w') as f:
-                f.write("# PiggyBankPC Benchmark Results\n")
-                f.write("# DO NOT EDIT THIS FILE\n")
-                f.write("# Upload this file to: https://piggybankpc.com/submit\n")
-                f.write(f"# Version: {self.VERSION}\n")
-                f.write(f"# Timestamp: {timestamp}\n")
-                f.write("#\n")
-                f.write(encoded)
+            # Write submission file - v3 containers are binary, older formats are text
+            if signed_package.get('format') == 3:
+                filepath.write_bytes(signed_package['container'])
+            else:
+                encoded = self.encode_for_submission(signed_package)
+
+                with open(filepath, 'w') as f:
+                    f.write("# PiggyBankPC Benchmark Results\n")
+                    f.write("# DO NOT EDIT THIS FILE\n")
+                    f.write("# Upload this file to: https://piggybankpc.com/submit\n")
+                    f.write(f"# Version: {self.VERSION}\n")
+                    f.write(f"# Format: {signed_package.get('format', 1)}\n")
+                    f.write(f"# Timestamp: {timestamp}\n")
+                    f.write("#\n")
+                    f.write(encoded)
 
             self.logger.info(f"Submission file created: {filepath}")
             print(f"\n{'='*70}")
@@ -281,6 +479,37 @@ class BenchmarkSecurity:
             self.logger.error(f"Failed to create submission file: {str(e)}")
             raise
 
+    def content_hash(self, stream) -> str:
+        """
+        SHA-256 of the signed part of an upload, computed without decoding it
+
+        The signed part carries the results, hardware fingerprint and benchmark
+        timestamp, so two uploads with the same hash are the same benchmark run.
+        Text files hash only their encoded line, so an edited comment header
+        doesn't make a copy look new. The stream is rewound afterwards.
+
+        Args:
+            stream: Binary file-like object positioned at the start of the upload
+
+        Returns:
+            str: Hex digest
+        """
+        digest = hashlib.sha256()
+        magic = stream.read(len(self.CONTAINER_MAGIC))
+
+        if magic == self.CONTAINER_MAGIC:
+            digest.update(magic)
+            for chunk in iter(lambda: stream.read(self.CHUNK_SIZE), b''):
+                digest.update(chunk)
+        else:
+            for line in io.BytesIO(magic + stream.read()):
+                if not line.startswith(b'#') and line.strip():
+                    digest.update(line.strip())
+                    break
+
+        stream.seek(0)
+        return digest.hexdigest()
+
     def validate_submission_file(self, filepath: Path) -> Optional[Dict]:
         """
         Validate a submission file
@@ -292,22 +521,8 @@ class BenchmarkSecurity:
             dict: Validated results or None if invalid
         """
         try:
-            with open(filepath, 'r') as f:
-                lines = f.readlines()
-
-            # Find the encoded data (skip comment lines)
-            encoded_data = None
-            for line in lines:
-                if not line.startswith('#') and line.strip():
-                    encoded_data = line.strip()
-                    break
-
-            if not encoded_data:
-                self.logger.error("No data found in submission file")
-                return None
-
-            # Decode and verify
-            results = self.decode_submission(encoded_data)
+            with open(filepath, 'rb') as f:
+                results = self.validate_submission_content(f)
 
             if results:
                 print(f"\n✓ Submission file is VALID")
@@ -323,32 +538,35 @@ class BenchmarkSecurity:
             self.logger.error(f"Failed to validate submission file: {str(e)}")
             return None
 
-    def validate_submission_content(self, file_content: str) -> Optional[Dict]:
+    def validate_submission_content(self, file_content, max_decoded_length: Optional[int] = None) -> Optional[Dict]:
         """
         Validate submission file content (for web uploads)
 
+        Binary v3 containers are decoded incrementally from the stream; text
+        formats (v1/v2) are read up to max_decoded_length and decoded as before.
+
         Args:
-            file_content: Content of the .pbr file as string
+            file_content: Upload stream (binary file-like), bytes, or the .pbr text as string
+            max_decoded_length: Largest acceptable decoded payload in bytes
 
         Returns:
             dict: Validated results or None if invalid
         """
         try:
-            lines = file_content.strip().split('\n')
-
-            # Find the encoded data (skip comment lines)
-            encoded_data = None
-            for line in lines:
-                if not line.startswith('#') and line.strip():
-                    encoded_data = line.strip()
-                    break
-
-            if not encoded_data:
-                self.logger.error("No data found in submission file")
-                return None
-
-            # Decode and verify
-            results = self.decode_submission(encoded_data)
+            if not isinstance(file_content, str):
+                stream = io.BytesIO(file_content) if isinstance(file_content, bytes) else file_content
+                magic = stream.read(len(self.CONTAINER_MAGIC))
+
+                if magic == self.CONTAINER_MAGIC:
+                    results = self.decode_container(stream, max_decoded_length, header=magic)
+                else:
+                    text = magic + stream.read(-1 if max_decoded_length is None else max_decoded_length + 1)
+                    if max_decoded_length is not None and len(text) > max_decoded_length:
+                        self.logger.error(f"Submission too large: over {max_decoded_length} bytes")
+                        return None
+                    results = self._decode_text_submission(text.decode('utf-8'))
+            else:
+                results = self._decode_text_submission(file_content)
 
             if results:
                 self.logger.info("Submission file is VALID")
@@ -360,3 +578,21 @@ class BenchmarkSecurity:
         except Exception as e:
             self.logger.error(f"Failed to validate submission content: {str(e)}")
             return None
+
+    def _decode_text_submission(self, file_content: str) -> Optional[Dict]:
+        """Decode a v1/v2 text .pbr - the first non-comment line is the encoded data"""
+        lines = file_content.strip().split('\n')
+
+        # Find the encoded data (skip comment lines)
+        encoded_data = None
+        for line in lines:
+            if not line.startswith('#') and line.strip():
+                encoded_data = line.strip()
+                break
+
+        if not encoded_data:
+            self.logger.error("No data found in submission file")
+            return None
+
+        # Decode and verify
+        return self.decode_submission(encoded_data)
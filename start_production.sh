@@ -37,11 +37,16 @@ gunicorn --bind 0.0.0.0:5555 \
          --pid gunicorn.pid \
          app:app
 
+# Start background job workers (diagnostics, improvements, achievements after upload)
+nohup python worker.py --workers 2 >> logs/worker.log 2>&1 &
+echo $! > worker.pid
+
 sleep 1
 
 if [ -f gunicorn.pid ]; then
     echo "🚀 Production server started on port 5555!"
     echo "PID: $(cat gunicorn.pid)"
+    echo "Job workers PID: $(cat worker.pid)"
 else
     echo "❌ Server failed to start. Check logs/error.log"
 fi
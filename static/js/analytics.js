@@ -1,7 +1,70 @@
 /**
  * PiggyBankPC Analytics Tracking
  * Tracks video clicks and affiliate clicks for revenue monitoring
+ *
+ * Events are queued and sent together - after a short delay, or straight
+ * away when the page is hidden (e.g. an affiliate link opening)
+ */
+
+const ANALYTICS_ENDPOINT = '/api/analytics/event';
+const ANALYTICS_FLUSH_DELAY = 1000;  // ms to wait for more clicks before sending
+const ANALYTICS_MAX_BATCH = 50;      // matches MAX_EVENTS_PER_REQUEST on the server
+
+let analyticsQueue = [];
+let analyticsTimer = null;
+
+/**
+ * Queue an event for the next batch
+ *
+ * @param {string} eventType - video_click, affiliate_click, page_view
+ * @param {object} eventData - Event context
+ */
+function queueEvent(eventType, eventData) {
+    analyticsQueue.push({event_type: eventType, event_data: eventData});
+
+    if (analyticsQueue.length >= ANALYTICS_MAX_BATCH) {
+        flushEvents();
+    } else if (analyticsTimer === null) {
+        analyticsTimer = setTimeout(flushEvents, ANALYTICS_FLUSH_DELAY);
+    }
+}
+
+/**
+ * Send every queued event
+ *
+ * @param {boolean} unloading - Page is going away: use sendBeacon, which outlives it
  */
+function flushEvents(unloading = false) {
+    clearTimeout(analyticsTimer);
+    analyticsTimer = null;
+
+    while (analyticsQueue.length > 0) {
+        const body = JSON.stringify({events: analyticsQueue.splice(0, ANALYTICS_MAX_BATCH)});
+
+        if (unloading && navigator.sendBeacon && navigator.sendBeacon(ANALYTICS_ENDPOINT, body)) {
+            continue;
+        }
+        fetch(ANALYTICS_ENDPOINT, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: body,
+            keepalive: true
+        }).catch(error => {
+            console.error('Analytics tracking error:', error);
+        });
+    }
+}
+
+document.addEventListener('visibilitychange', function() {
+    if (document.visibilityState === 'hidden') {
+        flushEvents(true);
+    }
+});
+window.addEventListener('pagehide', function() {
+    flushEvents(true);
+});
 
 /**
  * Track YouTube video clicks
@@ -11,21 +74,10 @@
  * @param {string} videoId - YouTube video ID
  */
 function trackVideoClick(issueType, videoId) {
-    fetch('/api/analytics/event', {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({
-            event_type: 'video_click',
-            event_data: {
-                issue_type: issueType,
-                video_id: videoId,
-                timestamp: new Date().toISOString()
-            }
-        })
-    }).catch(error => {
-        console.error('Analytics tracking error:', error);
+    queueEvent('video_click', {
+        issue_type: issueType,
+        video_id: videoId,
+        timestamp: new Date().toISOString()
     });
 }
 
@@ -37,21 +89,10 @@ function trackVideoClick(issueType, videoId) {
  * @param {string} issueType - Type of issue this product solves
  */
 function trackAffiliateClick(productName, issueType) {
-    fetch('/api/analytics/event', {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({
-            event_type: 'affiliate_click',
-            event_data: {
-                product: productName,
-                issue_type: issueType,
-                timestamp: new Date().toISOString()
-            }
-        })
-    }).catch(error => {
-        console.error('Analytics tracking error:', error);
+    queueEvent('affiliate_click', {
+        product: productName,
+        issue_type: issueType,
+        timestamp: new Date().toISOString()
     });
 }
 
@@ -60,21 +101,10 @@ function trackAffiliateClick(productName, issueType) {
  * Call this on diagnostic page load
  */
 function trackPageView(pageType, submissionId) {
-    fetch('/api/analytics/event', {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({
-            event_type: 'page_view',
-            event_data: {
-                page_type: pageType,
-                submission_id: submissionId,
-                timestamp: new Date().toISOString()
-            }
-        })
-    }).catch(error => {
-        console.error('Analytics tracking error:', error);
+    queueEvent('page_view', {
+        page_type: pageType,
+        submission_id: submissionId,
+        timestamp: new Date().toISOString()
     });
 }
 
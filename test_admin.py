@@ -0,0 +1,109 @@
+"""
+Admin dashboard and user export - one aggregate query, paginated user table
+"""
+import csv
+import io
+
+import pytest
+from sqlalchemy import event
+
+from models import db, Achievement, Improvement, LeaderboardRank, Submission
+from routes.admin import ADMIN_USERS_PER_PAGE, user_stats_query
+from utils.rankings import get_rank_entry
+
+
+@pytest.fixture
+def admin_client(client, make_user):
+    admin = make_user('admin', is_admin=True)
+    with client.session_transaction() as session:
+        session['_user_id'] = str(admin.id)
+        session['_fresh'] = True
+    client.get('/')  # load the admin into the session user cache, as any earlier page view would
+    return client
+
+
+def seed(make_user, make_submission, count, prefix='user'):
+    for i in range(count):
+        user = make_user(f'{prefix}{i}')
+        first = make_submission(user, fps_avg=50.0 + i)
+        make_submission(user, fps_avg=70.0 + i, is_official=True)
+        db.session.add(Improvement(user_id=user.id, after_submission_id=first.id, fps_gain=5.0))
+        db.session.add(Achievement(user_id=user.id, achievement_type='thermal_hero'))
+    db.session.commit()
+
+
+def test_user_stats_aggregate(app, make_user, make_submission):
+    seed(make_user, make_submission, 2)
+    idle = make_user('idle')
+
+    rows = {user.username: counts for user, *counts in user_stats_query()}
+
+    assert rows['user0'] == [2, 1, 1, 1, 70.0]
+    assert rows['user1'] == [2, 1, 1, 1, 71.0]
+    assert rows['idle'] == [0, 0, 0, 0, 0]
+    assert [user.id for user, *_ in user_stats_query([idle.id])] == [idle.id]
+
+
+def test_dashboard_query_count_does_not_grow_with_users(admin_client, make_user, make_submission, count_queries):
+    seed(make_user, make_submission, 2)
+    response, few = count_queries('/admin')
+    assert response.status_code == 200
+
+    seed(make_user, make_submission, ADMIN_USERS_PER_PAGE + 5, prefix='more')
+    response, many = count_queries('/admin')
+    assert response.status_code == 200
+    assert b'cursor=' in response.data
+
+    assert many == few
+
+
+def test_export_users_csv(admin_client, make_user, make_submission):
+    seed(make_user, make_submission, 3)
+
+    response = admin_client.get('/admin/users/export')
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+
+    assert response.status_code == 200
+    assert len(rows) == 1 + 4  # header, admin + 3 users
+    assert {row[1]: row[5:] for row in rows[1:]}['user2'] == ['2', '1', '1', '1', '72.0']
+
+
+def test_exports_stream_without_per_row_queries(admin_client, make_user, make_submission, count_queries):
+    seed(make_user, make_submission, 2)
+    _, few = count_queries('/admin/submissions/export')
+
+    seed(make_user, make_submission, 10, prefix='more')
+    assert admin_client.get('/admin/submissions/export').is_streamed
+
+    response, many = count_queries('/admin/submissions/export')
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+
+    assert response.headers['Content-Disposition'].startswith('attachment; filename=piggybankpc_submissions_')
+    assert len(rows) == 1 + 24
+    assert rows[1][1].startswith('more')
+    assert many == few
+
+
+def test_official_build_edit_reranks_only_on_publish_change(admin_client, make_user, make_submission, app):
+    user = make_user('builder')
+    make_submission(user, fps_avg=80.0)
+    build = make_submission(user, fps_avg=90.0, is_official=True, published=False)
+    assert LeaderboardRank.query.filter_by(submission_id=build.id).count() == 0
+
+    statements = []
+    listen = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', listen)
+    try:
+        edit = f'/official-builds/{build.id}/edit'
+        admin_client.post(edit, data={'build_name': 'Rig', 'published': 'on'})
+        assert any('INSERT INTO leaderboard_rank' in s for s in statements)
+
+        statements.clear()
+        admin_client.post(edit, data={'build_name': 'Renamed', 'published': 'on'})
+        assert not any('leaderboard_rank' in s for s in statements if not s.startswith('SELECT'))
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listen)
+
+    db.session.expire_all()
+    assert db.session.get(Submission, build.id).build_name == 'Renamed'
+    assert get_rank_entry(build.id).rank == 1
@@ -0,0 +1,219 @@
+"""
+Analytics ingestion - batched endpoint, the per-process event buffer and rollups
+"""
+import json
+import logging
+import time
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, create_mock_engine, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from models import db, AnalyticsEvent, AnalyticsRollup
+from utils.analytics import _upsert_insert, rebuild_rollups
+from utils.event_buffer import EventBuffer
+
+
+def test_single_event_is_stored(client):
+    response = client.post('/api/analytics/event', json={
+        'event_type': 'video_click', 'event_data': {'video_id': 'ABC123'}
+    })
+
+    assert response.status_code == 202
+    assert response.get_json()['accepted'] == 1
+    event = AnalyticsEvent.query.one()
+    assert event.event_type == 'video_click'
+    assert event.event_data == {'video_id': 'ABC123'}
+
+
+def test_batch_of_events_is_stored(client):
+    events = [{'event_type': 'affiliate_click', 'event_data': {'product': f'p{i}'}} for i in range(5)]
+
+    # sendBeacon posts without a JSON content type
+    response = client.post('/api/analytics/event', data=json.dumps({'events': events}), content_type='text/plain')
+
+    assert response.get_json()['accepted'] == 5
+    assert AnalyticsEvent.query.count() == 5
+
+
+def test_bad_batches_are_rejected_whole(client):
+    assert client.post('/api/analytics/event', json={'events': [{'event_type': 'x'}] * 51}).status_code == 400
+    assert client.post('/api/analytics/event', json={'events': [{'event_type': 'x'}, {}]}).status_code == 400
+    assert client.post('/api/analytics/event', json={'events': []}).status_code == 400
+    assert client.post('/api/analytics/event', data='not json').status_code == 400
+    assert AnalyticsEvent.query.count() == 0
+
+
+def make_buffer(tmp_path, **kwargs):
+    engine = create_engine(f"sqlite:///{tmp_path / 'events.db'}")
+    AnalyticsEvent.__table__.create(engine)
+    AnalyticsRollup.__table__.create(engine)
+    return EventBuffer(engine, logging.getLogger(__name__), **kwargs), engine
+
+
+def stored(engine):
+    with engine.connect() as connection:
+        return connection.execute(select(func.count()).select_from(AnalyticsEvent)).scalar()
+
+
+def row():
+    return {'user_id': None, 'submission_id': None, 'event_type': 'video_click', 'event_data': {},
+            'ip_address': '127.0.0.1', 'user_agent': '', 'created_at': datetime.utcnow()}
+
+
+def test_buffer_flushes_by_size_and_on_close(tmp_path):
+    buffer, engine = make_buffer(tmp_path, batch_size=10, flush_interval=60)
+
+    buffer.add([row() for _ in range(3)])
+    time.sleep(0.2)
+    assert stored(engine) == 0  # below the batch size, well inside the interval
+
+    buffer.add([row() for _ in range(7)])
+    deadline = time.monotonic() + 5
+    while stored(engine) < 10 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert stored(engine) == 10
+
+    buffer.add([row() for _ in range(2)])
+    buffer.close()  # graceful shutdown writes the remainder
+    assert stored(engine) == 12
+
+
+def test_buffer_keeps_rows_when_a_flush_fails(tmp_path):
+    buffer, engine = make_buffer(tmp_path, flush_interval=0)
+    buffer.engine = create_engine(f"sqlite:///{tmp_path / 'missing-table.db'}")
+
+    buffer.add([row() for _ in range(4)])
+    assert stored(engine) == 0
+
+    buffer.engine = engine
+    assert buffer.flush() == 4
+    assert stored(engine) == 4
+
+
+def test_failing_flush_backs_off(tmp_path):
+    buffer, engine = make_buffer(tmp_path, batch_size=2, flush_interval=0.05)
+    attempts = []
+
+    class Down:
+        def begin(self):
+            attempts.append(time.monotonic())
+            raise RuntimeError('database is locked')
+
+    buffer.engine = Down()
+    buffer.add([row() for _ in range(10)])  # a full batch, still full after every failure
+    time.sleep(0.5)
+
+    # 0.05 + 0.1 + 0.2 s of backoff fit in the window, not a busy loop
+    assert 2 <= len(attempts) <= 5
+    gaps = [later - earlier for earlier, later in zip(attempts, attempts[1:])]
+    assert all(gap >= 0.04 for gap in gaps)
+
+    buffer.engine = engine
+    buffer.close()
+    assert stored(engine) == 10
+
+
+def login_admin(client, make_user):
+    admin = make_user('admin', is_admin=True)
+    with client.session_transaction() as session:
+        session['_user_id'] = str(admin.id)
+
+
+def post_events(client, *events):
+    client.post('/api/analytics/event', json={'events': [
+        {'event_type': event_type, 'event_data': event_data} for event_type, event_data in events
+    ]})
+
+
+def test_rollups_counted_on_ingest(client):
+    post_events(client, ('affiliate_click', {'product': 'Arctic MX-4 4g', 'issue_type': 'cpu_thermal_throttling'}))
+    post_events(client, ('affiliate_click', {'product': 'Arctic MX-4 4g', 'issue_type': 'cpu_thermal_throttling'}),
+                ('video_click', {'video_id': 'v1'}))
+
+    day = AnalyticsRollup.query.filter_by(period='day', event_type='affiliate_click').one()
+    assert (day.product, day.issue_type, day.count) == ('Arctic MX-4 4g', 'cpu_thermal_throttling', 2)
+    hour = AnalyticsRollup.query.filter_by(period='hour', event_type='video_click').one()
+    assert (hour.product, hour.issue_type, hour.count) == ('', '', 1)
+
+
+def test_stats_and_series_read_rollups(client, make_user):
+    login_admin(client, make_user)
+    post_events(client, ('video_click', {'issue_type': 'low_ram'}), ('video_click', {'issue_type': 'low_ram'}),
+                ('affiliate_click', {'product': 'ram_ddr4_16gb', 'issue_type': 'low_ram'}))
+
+    stats = client.get('/api/analytics/stats').get_json()['stats']
+    assert (stats['video_clicks'], stats['affiliate_clicks']) == (2, 1)
+
+    series = client.get('/api/analytics/series?period=hour&points=3').get_json()
+    assert len(series['buckets']) == 3
+    assert series['series'] == {'video_click': [0, 0, 2], 'affiliate_click': [0, 0, 1]}
+
+    by_product = client.get('/api/analytics/series?by=product&event_type=affiliate_click&points=7').get_json()
+    assert by_product['series'] == {'ram_ddr4_16gb': [0] * 6 + [1]}
+
+    assert client.get('/api/analytics/series?period=week').status_code == 400
+
+
+def test_rebuild_matches_incremental_rollups(client):
+    post_events(client, ('video_click', {'issue_type': 'low_ram'}), ('affiliate_click', {'product': 'p'}))
+    post_events(client, ('video_click', {'issue_type': 'low_ram'}))
+    incremental = sorted((r.period, r.bucket, r.event_type, r.issue_type, r.product, r.count)
+                         for r in AnalyticsRollup.query)
+
+    assert rebuild_rollups() == 3
+    db.session.commit()
+    assert sorted((r.period, r.bucket, r.event_type, r.issue_type, r.product, r.count)
+                  for r in AnalyticsRollup.query) == incremental
+
+
+def test_rollup_upsert_follows_the_database_dialect(app):
+    assert _upsert_insert(db.session) is sqlite.insert
+
+    assert _upsert_insert(create_mock_engine('postgresql://', executor=None)) is postgresql.insert
+    with pytest.raises(NotImplementedError):
+        _upsert_insert(create_mock_engine('mysql://', executor=None))
+
+
+def test_prune_archives_old_events_in_batches(client, tmp_path):
+    from datetime import timedelta
+    from utils.retention import prune_events, read_archive
+
+    post_events(client, *[('video_click', {'video_id': f'v{i}'}) for i in range(5)])
+    events = AnalyticsEvent.query.order_by(AnalyticsEvent.id).all()
+    for event, days_old in zip(events, (200, 100, 95, 10, 0)):
+        event.created_at = datetime(2026, 6, 30, 12) - timedelta(days=days_old)
+    db.session.commit()
+    rollups = AnalyticsRollup.query.count()
+
+    assert prune_events(90, root=tmp_path, now=datetime(2026, 6, 30, 12), dry_run=True)['archived'] == 3
+    stats = prune_events(90, root=tmp_path, batch_size=2, pause=0, now=datetime(2026, 6, 30, 12))
+
+    assert (stats['archived'], stats['batches'], stats['months']) == (3, 2, {'2025-12', '2026-03'})
+    assert AnalyticsEvent.query.count() == 2
+    assert AnalyticsRollup.query.count() == rollups  # chart history stays
+    archived = list(read_archive('2026-03', root=tmp_path))
+    assert [e['event_data']['video_id'] for e in archived] == ['v1', 'v2']
+    assert archived[0]['ip_address'] and archived[0]['created_at'].startswith('2026-03-22')
+
+
+def test_rebuild_after_prune_keeps_pruned_history(client, tmp_path):
+    from datetime import timedelta
+    from utils.retention import prune_events
+
+    now = datetime(2026, 6, 30, 12)
+    post_events(client, *[('video_click', {'video_id': f'v{i}'}) for i in range(4)])
+    for event, days_old in zip(AnalyticsEvent.query.order_by(AnalyticsEvent.id), (120, 90.2, 89.9, 1)):
+        event.created_at = now - timedelta(days=days_old)
+    db.session.commit()
+    rebuild_rollups()
+    db.session.commit()
+    before = sorted((r.period, r.bucket, r.count) for r in AnalyticsRollup.query)
+
+    # The cutoff (90 days back, 00:00) keeps both events from that day
+    assert prune_events(90, root=tmp_path, pause=0, now=now)['archived'] == 1
+
+    assert rebuild_rollups() == 3
+    db.session.commit()
+    assert sorted((r.period, r.bucket, r.count) for r in AnalyticsRollup.query) == before
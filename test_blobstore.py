@@ -0,0 +1,58 @@
+"""
+Content-addressed upload storage and its garbage collection
+"""
+import gzip
+import hashlib
+import io
+import os
+import time
+
+from models import db
+from utils.blobstore import blob_path, blob_root, collect_garbage, is_blob_key, open_upload, put_blob
+
+
+CONTENT = b'PBR3' + b'telemetry ' * 1000
+
+
+def test_identical_uploads_share_one_compressed_blob(app):
+    key = put_blob(io.BytesIO(CONTENT))
+
+    assert key == hashlib.sha256(CONTENT).hexdigest() and is_blob_key(key)
+    assert put_blob(CONTENT) == key
+    assert list(blob_root().glob('*/*/*.gz')) == [blob_path(key)]
+    assert blob_path(key).parent.parent.name == key[:2]
+    assert blob_path(key).stat().st_size < len(CONTENT) / 10
+    assert gzip.decompress(blob_path(key).read_bytes()) == CONTENT
+    assert not any((blob_root() / 'tmp').iterdir())  # temp file renamed or removed
+
+    with open_upload(key) as stored:
+        assert stored.read() == CONTENT
+
+
+def test_garbage_collection_keeps_referenced_and_recent_blobs(app, make_user, make_submission):
+    referenced = put_blob(b'referenced')
+    orphaned = put_blob(b'orphaned')
+    recent = put_blob(b'recent orphan')
+    make_submission(make_user('tester'), pbr_filename=referenced)
+
+    old = time.time() - 7200
+    for key in (referenced, orphaned):
+        os.utime(blob_path(key), (old, old))
+
+    assert collect_garbage(dry_run=True)['deleted'] == 1
+    assert blob_path(orphaned).exists()
+
+    stats = collect_garbage()
+    assert (stats['deleted'], stats['kept']) == (1, 2)
+    assert not blob_path(orphaned).exists()
+    assert blob_path(referenced).exists() and blob_path(recent).exists()
+
+
+def test_deleted_submission_blob_is_collected(app, make_user, make_submission):
+    key = put_blob(b'to be deleted')
+    submission = make_submission(make_user('tester'), pbr_filename=key)
+    db.session.delete(submission)
+    db.session.commit()
+
+    assert collect_garbage(grace_seconds=0)['deleted'] == 1
+    assert not blob_path(key).exists()
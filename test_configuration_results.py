@@ -0,0 +1,94 @@
+"""
+Per-category results from multi-configuration Heaven uploads
+"""
+import io
+
+from models import db, ConfigurationResult, LeaderboardRank, Submission
+from security import BenchmarkSecurity
+from utils.rankings import rebuild_rankings
+from utils.stats import compute_submission_stats
+
+
+def login(client, user):
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user.id)
+
+
+def upload_configurations(client, app, configurations):
+    security = BenchmarkSecurity(base_dir='.', signing_key=app.config['BENCHMARK_SECURITY_KEY'])
+    container = security.pack_container({
+        'version': '1.0.0',
+        'timestamp': '2025-10-25T20:45:00',
+        'hardware_fingerprint': 'f' * 64,
+        'results': {
+            'system_info': {'cpu': {'model': 'AMD Ryzen 5 5600'}, 'gpu': {'model': 'NVIDIA GeForce RTX 3060'}},
+            'fps': {'status': 'completed', 'configurations': {
+                f'{resolution}_{quality}': {'average_fps': fps, 'min_fps': fps / 2, 'max_fps': fps * 2,
+                                            'resolution': resolution, 'quality': quality}
+                for resolution, quality, fps in configurations
+            }}
+        }
+    })['container']
+    return client.post('/submit', data={'pbr_file': (io.BytesIO(container), 'results.pbr')},
+                       content_type='multipart/form-data')
+
+
+def test_every_valid_configuration_is_stored_and_ranked(client, app, make_user, make_submission):
+    other = make_user('other')
+    make_submission(other, fps_avg=100.0, fps_resolution='2560x1440', fps_quality='Ultra')
+    login(client, make_user('tester'))
+
+    upload_configurations(client, app, [
+        ('1920x1080', 'Low', 150.0),
+        ('2560x1440', 'Ultra', 60.0),
+        ('3840x2160', 'Ultra', 30.0),  # not a leaderboard category
+    ])
+
+    submission = Submission.query.filter(Submission.content_hash.isnot(None)).one()
+    assert (submission.fps_avg, submission.fps_resolution, submission.fps_quality) == (150.0, '1920x1080', 'Low')
+    assert {(r.resolution, r.quality, r.fps_avg) for r in submission.configuration_results} == {
+        ('1920x1080', 'Low', 150.0), ('2560x1440', 'Ultra', 60.0)
+    }
+
+    ranks = {entry.category: (entry.rank, entry.fps_avg) for entry in
+             LeaderboardRank.query.filter_by(submission_id=submission.id)}
+    assert ranks == {'all': (1, 150.0), '1920x1080_Low': (1, 150.0), '2560x1440_Ultra': (2, 60.0)}
+
+    # A rebuild from scratch agrees with the incremental ranks
+    rebuild_rankings()
+    db.session.commit()
+    assert {entry.category: (entry.rank, entry.fps_avg) for entry in
+            LeaderboardRank.query.filter_by(submission_id=submission.id)} == ranks
+
+    # Category boards and stats read the category's result, not the headline FPS
+    page = client.get('/leaderboard?category=2560x1440_Ultra&price=all&order=asc').get_data(as_text=True)
+    assert 'bg-primary">60.0<' in page and 'bg-primary">150.0<' not in page
+    assert compute_submission_stats('2560x1440', 'Ultra')['avg_fps'] == 80.0
+
+
+def test_best_valid_configuration_is_the_headline(client, app, make_user):
+    login(client, make_user('tester'))
+
+    upload_configurations(client, app, [('3840x2160', 'Ultra', 200.0), ('1920x1080', 'High', 90.0)])
+
+    submission = Submission.query.one()
+    assert (submission.fps_avg, submission.fps_resolution) == (90.0, '1920x1080')
+
+
+def test_upload_without_a_valid_category_is_rejected(client, app, make_user):
+    login(client, make_user('tester'))
+
+    upload_configurations(client, app, [('3840x2160', 'Ultra', 200.0)])
+
+    assert Submission.query.count() == 0
+    assert ConfigurationResult.query.count() == 0
+
+
+def test_results_are_deleted_with_their_submission(app, make_user, make_submission):
+    submission = make_submission(make_user('tester'))
+    assert ConfigurationResult.query.count() == 1
+
+    db.session.delete(submission)
+    db.session.commit()
+
+    assert ConfigurationResult.query.count() == 0
@@ -0,0 +1,65 @@
+"""
+GPU brand detection and model keys - stored on submissions for the brand filter
+"""
+import pytest
+
+from models import db, Submission
+from utils.gpu import detect_gpu_brand, normalize_gpu_model
+
+
+@pytest.mark.parametrize('gpu_model, brand', [
+    ('NVIDIA GeForce RTX 4090', 'NVIDIA'),
+    ('RTX 4090', 'NVIDIA'),
+    ('GeForce GTX1660 SUPER', 'NVIDIA'),
+    ('Quadro P2000', 'NVIDIA'),
+    ('AMD Radeon RX 7900 XTX', 'AMD'),
+    ('Radeon RX 7900', 'AMD'),
+    ('RX6600', 'AMD'),
+    ('Intel(R) Arc(TM) A770 Graphics', 'Intel'),
+    ('Intel Arc A770', 'Intel'),
+    ('Iris Xe', 'Intel'),
+    # 'rx' / 'arc' inside other words is not a brand
+    ('Matrox MGA PRX3000', 'Unknown'),
+    ('Marx Virtual Display 2', 'Unknown'),
+    ('Searchlight Display Adapter', 'Unknown'),
+    ('Microsoft Basic Render Driver', 'Unknown'),
+    ('', 'Unknown'),
+    (None, 'Unknown'),
+])
+def test_detect_gpu_brand(gpu_model, brand):
+    assert detect_gpu_brand(gpu_model) == brand
+
+
+@pytest.mark.parametrize('gpu_model, key', [
+    ('NVIDIA GeForce RTX 3060 Ti', 'rtx-3060-ti'),
+    ('AMD Radeon RX 580 Series', 'rx-580'),
+    ('Radeon RX6600', 'rx-6600'),
+    ('Intel(R) Arc(TM) A770', 'arc-a770'),
+    ('Unknown', None),
+    ('NVIDIA Corporation', None),
+    (None, None),
+])
+def test_normalize_gpu_model(gpu_model, key):
+    assert normalize_gpu_model(gpu_model) == key
+
+
+def test_brand_and_key_stored_on_insert_and_change(app, make_user, make_submission):
+    submission = make_submission(make_user('tester'), gpu_model='AMD Radeon RX 7900 XTX')
+    db.session.expire_all()
+
+    stored = db.session.get(Submission, submission.id)
+    assert (stored.gpu_brand, stored.gpu_model_key) == ('AMD', 'rx-7900-xtx')
+
+    stored.gpu_model = 'NVIDIA GeForce RTX 4090'
+    db.session.commit()
+    db.session.expire_all()
+    assert Submission.query.filter_by(gpu_brand='NVIDIA', gpu_model_key='rtx-4090').count() == 1
+
+
+def test_brand_filter(client, make_user, make_submission):
+    user = make_user('tester')
+    make_submission(user, gpu_model='AMD Radeon RX 7900 XTX')
+    make_submission(user, gpu_model='NVIDIA GeForce RTX 4090')
+
+    page = client.get('/leaderboard?gpu_brand=amd').get_data(as_text=True)
+    assert 'RX 7900' in page and 'RTX 4090' not in page
@@ -0,0 +1,156 @@
+"""
+Bulk .pbr import CLI
+"""
+from import_pbr import STATE_FILENAME, import_directory
+from models import LeaderboardRank, Submission
+from security import BenchmarkSecurity
+
+
+def write_upload(directory, name, security, average_fps):
+    container = security.pack_container({
+        'version': '1.0.0',
+        'timestamp': f'2025-10-25T20:45:{int(average_fps):02d}',
+        'hardware_fingerprint': 'f' * 64,
+        'results': {
+            'system_info': {'cpu': {'model': 'Intel Core i7-13700K'}, 'gpu': {'model': 'NVIDIA GeForce RTX 3060'}},
+            'fps': {'status': 'completed', 'configurations': {'1080p_high': {
+                'average_fps': average_fps, 'resolution': '1920x1080', 'quality': 'High'
+            }}}
+        }
+    })['container']
+    (directory / name).write_bytes(container)
+    return container
+
+
+def run_import(app, directory, **kwargs):
+    return import_directory(app, directory, workers=2, batch_size=2,
+                            signing_key=app.config['BENCHMARK_SECURITY_KEY'], **kwargs)
+
+
+def test_import_directory(app, make_user, tmp_path):
+    user = make_user('tester')
+    security = BenchmarkSecurity(base_dir=tmp_path, signing_key=app.config['BENCHMARK_SECURITY_KEY'])
+
+    container = write_upload(tmp_path, f'{user.id}_ffffffff_a.pbr', security, 50.0)
+    write_upload(tmp_path, f'{user.id}_ffffffff_b.pbr', security, 60.0)
+    write_upload(tmp_path, f'official_{user.id}_ffffffff_c.pbr', security, 70.0)
+    (tmp_path / f'{user.id}_ffffffff_copy.pbr').write_bytes(container)
+    write_upload(tmp_path, '999_ffffffff_orphan.pbr', security, 40.0)
+    write_upload(tmp_path, f'{user.id}_ffffffff_rotated.pbr', BenchmarkSecurity(base_dir=tmp_path, signing_key='old'), 45.0)
+
+    counts = run_import(app, tmp_path)
+
+    assert counts == {'imported': 3, 'duplicate': 1, 'invalid signature': 1, 'unknown user': 1}
+    assert sorted(s.fps_avg for s in Submission.query) == [50.0, 60.0, 70.0]
+    assert Submission.query.filter_by(is_official=True, published=False).count() == 1
+    assert Submission.query.filter_by(intel_13_14_gen_cpu=True).count() == 3
+    # Ranks rebuilt for the published rows: overall + 1080p High
+    assert LeaderboardRank.query.count() == 4
+
+
+def test_import_resumes_after_last_committed_file(app, make_user, tmp_path):
+    user = make_user('tester')
+    security = BenchmarkSecurity(base_dir=tmp_path, signing_key=app.config['BENCHMARK_SECURITY_KEY'])
+    for n in range(5):
+        write_upload(tmp_path, f'{user.id}_ffffffff_{n}.pbr', security, 50.0 + n)
+
+    run_import(app, tmp_path)
+    assert Submission.query.count() == 5
+    assert (tmp_path / STATE_FILENAME).exists()
+
+    # A re-run only scans files after the saved position
+    write_upload(tmp_path, f'{user.id}_ffffffff_9.pbr', security, 59.0)
+    assert run_import(app, tmp_path)['imported'] == 1
+
+    # --restart rescans everything, and the content hash keeps it idempotent
+    assert run_import(app, tmp_path, restart=True) == {'imported': 0, 'duplicate': 6, 'invalid signature': 0}
+    assert Submission.query.count() == 6
+
+
+def test_import_reads_the_blob_store_after_migration(app, make_user, tmp_path):
+    from pathlib import Path
+    from migrate_uploads_to_blobs import move_uploads
+    from models import db
+    from utils.blobstore import blob_root
+
+    user = make_user('tester')
+    uploads = Path(app.config['UPLOAD_FOLDER'])
+    uploads.mkdir(parents=True)
+    security = BenchmarkSecurity(base_dir=tmp_path, signing_key=app.config['BENCHMARK_SECURITY_KEY'])
+    write_upload(uploads, f'{user.id}_ffffffff_a.pbr', security, 50.0)
+    write_upload(uploads, f'{user.id}_ffffffff_b.pbr', security, 60.0)
+
+    # Rows pointing at the legacy files, as uploads did before the blob store
+    run_import(app, uploads)
+    names = {50.0: f'{user.id}_ffffffff_a.pbr', 60.0: f'{user.id}_ffffffff_b.pbr'}
+    for submission in Submission.query:
+        submission.pbr_filename = names[submission.fps_avg]
+    db.session.commit()
+    for blob in blob_root().glob('*/*/*.gz'):
+        blob.unlink()
+
+    connection = db.engine.raw_connection()
+    assert move_uploads(connection, uploads) == (2, 0)
+    assert list(uploads.glob('*.pbr')) == []
+
+    # Re-ingesting UPLOAD_FOLDER now reads the blobs - already referenced, so duplicates
+    assert run_import(app, uploads, restart=True) == {'imported': 0, 'duplicate': 2, 'invalid signature': 0}
+
+    # A blob whose row is gone carries no owner - imported only for a default user
+    db.session.delete(Submission.query.filter_by(fps_avg=60.0).one())
+    db.session.commit()
+    assert run_import(app, uploads, restart=True)['no owner'] == 1
+    counts = run_import(app, uploads, restart=True, default_user_id=user.id)
+    assert (counts['imported'], counts['duplicate']) == (1, 1)
+    assert sorted(s.fps_avg for s in Submission.query) == [50.0, 60.0]
+
+
+def test_update_refreshes_existing_rows(app, make_user, tmp_path):
+    from models import db, ConfigurationResult
+
+    user = make_user('tester')
+    security = BenchmarkSecurity(base_dir=tmp_path, signing_key=app.config['BENCHMARK_SECURITY_KEY'])
+    write_upload(tmp_path, f'{user.id}_ffffffff_a.pbr', security, 50.0)
+    write_upload(tmp_path, f'official_{user.id}_ffffffff_b.pbr', security, 60.0)
+    run_import(app, tmp_path)
+
+    # As if a column had been added (or derived differently) after the import
+    Submission.query.update({Submission.cpu_model: None, Submission.intel_13_14_gen_cpu: False})
+    ConfigurationResult.query.delete()
+    db.session.commit()
+
+    assert run_import(app, tmp_path, restart=True)['duplicate'] == 2
+    counts = run_import(app, tmp_path, restart=True, update=True)
+
+    assert (counts['updated'], counts['imported'], counts['duplicate']) == (2, 0, 0)
+    db.session.expire_all()
+    assert {s.cpu_model for s in Submission.query} == {'Intel Core i7-13700K'}
+    assert Submission.query.filter_by(intel_13_14_gen_cpu=True).count() == 2
+    assert ConfigurationResult.query.count() == 2
+    # Owner and anti-spoiler visibility are kept
+    assert Submission.query.filter_by(is_official=True, published=False).count() == 1
+
+    # Refreshing again replaces the category rows rather than adding to them
+    run_import(app, tmp_path, restart=True, update=True)
+    assert ConfigurationResult.query.count() == 2
+
+
+def test_known_files_are_not_stored_again(app, make_user, tmp_path):
+    import import_pbr
+    from utils.blobstore import blob_root
+
+    user = make_user('tester')
+    security = BenchmarkSecurity(base_dir=tmp_path, signing_key=app.config['BENCHMARK_SECURITY_KEY'])
+    path = tmp_path / f'{user.id}_ffffffff_a.pbr'
+    write_upload(tmp_path, path.name, security, 50.0)
+    content_hash = security.content_hash(path.open('rb'))
+
+    import_pbr._init_worker(app.config['BENCHMARK_SECURITY_KEY'], app.config['MAX_CONTENT_LENGTH'],
+                            blob_root(), frozenset({content_hash}), False)
+    assert import_pbr.decode_file(path) == (path, content_hash, None, None)
+
+    import_pbr._init_worker(app.config['BENCHMARK_SECURITY_KEY'], app.config['MAX_CONTENT_LENGTH'],
+                            blob_root(), frozenset({content_hash}), True)
+    _, _, results, blob_key = import_pbr.decode_file(path)
+    assert results is not None and blob_key is None
+    assert not list(blob_root().glob('*/*/*.gz'))
@@ -0,0 +1,167 @@
+"""
+Background job queue and the post-upload submission pipeline
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from models import db, Achievement, DiagnosticIssue, Improvement, Job
+from utils.jobs import JOB_HANDLERS, claim_job, enqueue, job_handler, release_stale_jobs, run_job, run_pending_jobs
+from utils.pipeline import enqueue_submission_pipeline
+
+
+FLAKY_CALLS = []
+
+
+@job_handler('test_flaky')
+def flaky(payload):
+    FLAKY_CALLS.append(payload)
+    if len(FLAKY_CALLS) <= payload['failures']:
+        raise RuntimeError('temporary failure')
+
+
+def test_enqueue_is_idempotent(app):
+    first = enqueue('test_flaky', {'failures': 0}, idempotency_key='flaky:1')
+    db.session.commit()
+    second = enqueue('test_flaky', {'failures': 0}, idempotency_key='flaky:1')
+    db.session.commit()
+
+    assert first.id == second.id
+    assert Job.query.count() == 1
+
+
+def test_failed_job_is_retried_with_backoff_then_gives_up(app):
+    FLAKY_CALLS.clear()
+    enqueue('test_flaky', {'failures': 5}, idempotency_key='flaky:2', max_attempts=2)
+    db.session.commit()
+
+    assert run_job(claim_job('w1')) is False
+    job = Job.query.one()
+    assert job.status == 'pending' and job.attempts == 1 and job.run_after > datetime.utcnow()
+    assert claim_job('w1') is None  # not due yet
+
+    job.run_after = datetime.utcnow()
+    db.session.commit()
+    assert run_job(claim_job('w1')) is False
+
+    job = Job.query.one()
+    assert job.status == 'failed' and job.attempts == 2
+    assert 'temporary failure' in job.last_error
+
+
+def test_job_succeeds_after_retry(app):
+    FLAKY_CALLS.clear()
+    enqueue('test_flaky', {'failures': 1}, idempotency_key='flaky:3')
+    db.session.commit()
+
+    run_job(claim_job('w1'))
+    Job.query.one().run_after = datetime.utcnow()
+    db.session.commit()
+
+    assert run_pending_jobs() == 1
+    assert Job.query.one().status == 'done'
+
+
+def test_stale_running_jobs_are_released(app):
+    enqueue('test_flaky', {'failures': 0}, idempotency_key='flaky:4')
+    db.session.commit()
+
+    job = claim_job('dead-worker')
+    assert job.status == 'running'
+    assert claim_job('w2') is None
+
+    job.locked_at = datetime.utcnow() - timedelta(hours=1)
+    db.session.commit()
+
+    assert release_stale_jobs() == 1
+    assert claim_job('w2').locked_by == 'w2'
+
+
+def test_submission_pipeline(client, make_user, make_submission):
+    user = make_user('tester')
+
+    first = make_submission(user, fps_avg=50.0, cpu_temp_max=96.0)
+    enqueue_submission_pipeline(first)
+    db.session.commit()
+
+    assert client.get(f'/submission/{first.id}/diagnostics/raw').get_json()['processing'] is True
+    assert run_pending_jobs() == 1
+    assert client.get(f'/submission/{first.id}/diagnostics/raw').get_json()['processing'] is False
+
+    assert DiagnosticIssue.query.filter_by(submission_id=first.id).count() > 0
+    assert Improvement.query.count() == 0  # a first submission is not an improvement over itself
+    assert Achievement.query.filter_by(user_id=user.id, achievement_type='first_submission').count() == 1
+
+    second = make_submission(user, fps_avg=80.0)
+    enqueue_submission_pipeline(second)
+    enqueue_submission_pipeline(second)  # duplicate enqueue is a no-op
+    db.session.commit()
+    assert run_pending_jobs() == 1
+
+    improvement = Improvement.query.one()
+    assert (improvement.before_submission_id, improvement.after_submission_id) == (first.id, second.id)
+    assert improvement.fps_gain == 30.0
+    assert db.session.get(type(second), second.id).is_improvement
+
+
+def test_submission_pipeline_is_one_transaction(app, make_user, make_submission):
+    user = make_user('tester')
+    make_submission(user, fps_avg=50.0, cpu_temp_max=96.0)
+    second = make_submission(user, fps_avg=80.0, cpu_temp_max=96.0)
+    enqueue_submission_pipeline(second)
+    db.session.commit()
+
+    commits = []
+    record = commits.append
+    event.listen(db.session, 'after_commit', record)
+    try:
+        job = claim_job('w1')
+        commits.clear()  # the claim is its own transaction
+        assert run_job(job) is True
+    finally:
+        event.remove(db.session, 'after_commit', record)
+
+    # Issues, improvement, achievements and the job status land in one commit
+    assert len(commits) == 1
+    assert DiagnosticIssue.query.filter_by(submission_id=second.id).count() > 0
+    assert Improvement.query.filter_by(after_submission_id=second.id).count() == 1
+    assert Achievement.query.filter_by(user_id=user.id).count() > 0
+
+
+def test_failed_pipeline_leaves_no_partial_writes(app, make_user, make_submission, monkeypatch):
+    submission = make_submission(make_user('tester'), cpu_temp_max=96.0)
+    enqueue_submission_pipeline(submission)
+    db.session.commit()
+
+    def explode(payload):
+        raise RuntimeError('achievements down')
+    monkeypatch.setitem(JOB_HANDLERS, 'award_achievements', explode)
+
+    assert run_job(claim_job('w1')) is False
+    assert DiagnosticIssue.query.count() == 0  # analysis ran but was rolled back with the job
+    assert Job.query.one().status == 'pending'
+
+
+def test_diagnostics_page_shows_processing_state(client, make_user, make_submission):
+    submission = make_submission(make_user('tester'))
+    enqueue_submission_pipeline(submission)
+    db.session.commit()
+
+    page = client.get(f'/submission/{submission.id}/diagnostics').get_data(as_text=True)
+    assert 'Analyzing Your Build' in page and 'http-equiv="refresh"' in page
+
+    run_pending_jobs()
+    page = client.get(f'/submission/{submission.id}/diagnostics').get_data(as_text=True)
+    assert 'Analyzing Your Build' not in page and 'http-equiv="refresh"' not in page
+
+
+def test_diagnostics_page_shows_failed_state(client, make_user, make_submission):
+    submission = make_submission(make_user('tester'))
+    enqueue_submission_pipeline(submission)
+    db.session.commit()
+    Job.query.update({Job.status: 'failed'})
+    db.session.commit()
+
+    page = client.get(f'/submission/{submission.id}/diagnostics').get_data(as_text=True)
+    assert 'Diagnostics Failed' in page and 'http-equiv="refresh"' not in page
+    assert client.get(f'/submission/{submission.id}/diagnostics/raw').json['failed'] is True
@@ -0,0 +1,100 @@
+"""
+Stored price-per-FPS and All-Rounder Score - kept in step with their inputs on
+every change, and backfilled to the values the old computed properties gave
+"""
+import pytest
+from sqlalchemy import text
+
+from models import db, Submission
+from migrate_add_derived_metrics import backfill
+
+
+def old_price_per_fps(fps_avg, gpu_price):
+    """Submission.price_per_fps as it was computed before the column existed"""
+    if fps_avg and gpu_price and fps_avg > 0:
+        return round(gpu_price / fps_avg, 2)
+    return None
+
+
+def old_all_rounder_score(fps_avg, ai_tokens_per_sec):
+    """Submission.all_rounder_score as it was computed before the column existed"""
+    if not fps_avg or not ai_tokens_per_sec:
+        return None
+    fps_normalized = min(100, (fps_avg / 120) * 100)
+    tokens_normalized = min(100, (ai_tokens_per_sec / 50) * 100)
+    return round((fps_normalized + tokens_normalized) / 2, 1)
+
+
+INPUTS = [
+    (60.0, 150.0, 25.0),
+    (144.0, 899.99, 80.0),  # both halves of the score capped
+    (33.3, 120.0, 7.5),
+    (60.0, None, 25.0),
+    (60.0, 0.0, 25.0),
+    (60.0, 150.0, None),
+    (60.0, 150.0, 0.0),
+    (0.0, 150.0, 25.0),
+]
+
+
+def stored_metrics(submission_id):
+    db.session.expire_all()
+    submission = db.session.get(Submission, submission_id)
+    return submission.price_per_fps, submission.all_rounder_score
+
+
+@pytest.mark.parametrize('fps_avg, gpu_price, ai_tokens_per_sec', INPUTS)
+def test_metrics_stored_on_insert(app, make_user, make_submission, fps_avg, gpu_price, ai_tokens_per_sec):
+    submission = make_submission(make_user('tester'), fps_avg=fps_avg, gpu_price=gpu_price,
+                                 ai_tokens_per_sec=ai_tokens_per_sec)
+    db.session.commit()
+
+    assert stored_metrics(submission.id) == (old_price_per_fps(fps_avg, gpu_price),
+                                             old_all_rounder_score(fps_avg, ai_tokens_per_sec))
+
+
+@pytest.mark.parametrize('field, value', [
+    ('fps_avg', 120.0), ('fps_avg', 0.0),
+    ('gpu_price', 300.0), ('gpu_price', None), ('gpu_price', 0.0),
+    ('ai_tokens_per_sec', 50.0), ('ai_tokens_per_sec', None), ('ai_tokens_per_sec', 0.0),
+])
+def test_metrics_follow_their_inputs(app, make_user, make_submission, field, value):
+    submission = make_submission(make_user('tester'), fps_avg=60.0, gpu_price=150.0, ai_tokens_per_sec=25.0)
+    db.session.commit()
+
+    setattr(submission, field, value)
+    db.session.commit()
+
+    inputs = {'fps_avg': 60.0, 'gpu_price': 150.0, 'ai_tokens_per_sec': 25.0, field: value}
+    assert stored_metrics(submission.id) == (
+        old_price_per_fps(inputs['fps_avg'], inputs['gpu_price']),
+        old_all_rounder_score(inputs['fps_avg'], inputs['ai_tokens_per_sec'])
+    )
+
+
+def test_metrics_come_back_after_none(app, make_user, make_submission):
+    submission = make_submission(make_user('tester'), gpu_price=None, ai_tokens_per_sec=None)
+    db.session.commit()
+    assert stored_metrics(submission.id) == (None, None)
+
+    submission = db.session.get(Submission, submission.id)
+    submission.gpu_price = 150.0
+    submission.ai_tokens_per_sec = 25.0
+    db.session.commit()
+    assert stored_metrics(submission.id) == (2.5, 50.0)
+
+
+def test_backfill_matches_old_properties(app, make_user, make_submission):
+    user = make_user('tester')
+    ids = [make_submission(user, fps_avg=fps_avg, gpu_price=gpu_price, ai_tokens_per_sec=tokens).id
+           for fps_avg, gpu_price, tokens in INPUTS]
+    db.session.commit()
+    # Rows from before the migration - the columns exist but hold nothing
+    db.session.execute(text("UPDATE submissions SET price_per_fps = NULL, all_rounder_score = NULL"))
+    db.session.commit()
+
+    assert backfill(db.engine.raw_connection(), batch_size=3) == len(INPUTS)
+
+    for submission_id, (fps_avg, gpu_price, tokens) in zip(ids, INPUTS):
+        assert stored_metrics(submission_id) == (old_price_per_fps(fps_avg, gpu_price),
+                                                 old_all_rounder_score(fps_avg, tokens))
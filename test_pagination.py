@@ -0,0 +1,142 @@
+"""
+Keyset pagination checks - walking the cursors forwards and backwards must
+visit every row exactly once, in order, including rows that tie on the sort value
+"""
+from datetime import datetime, timedelta
+
+from models import Submission
+from utils.pagination import KeysetPagination, decode_cursor, encode_cursor
+
+
+KEY_COLUMNS = [Submission.fps_avg, Submission.submission_date, Submission.id]
+
+
+def seed(make_user, make_submission, count=23):
+    user = make_user('tester')
+    now = datetime.utcnow()
+    # Only a handful of distinct FPS values and dates, so the id tiebreak matters
+    return [
+        make_submission(user, fps_avg=50.0 + i % 4, submission_date=now - timedelta(days=i % 3))
+        for i in range(count)
+    ]
+
+
+def expected_order(submissions):
+    return [s.id for s in sorted(submissions, key=lambda s: (s.fps_avg, s.submission_date, s.id), reverse=True)]
+
+
+def walk(query, per_page, cursor=None, direction='next'):
+    pages = []
+    while True:
+        page = KeysetPagination(query, KEY_COLUMNS, cursor=cursor, per_page=per_page)
+        pages.append(page)
+        cursor = page.next_cursor if direction == 'next' else page.prev_cursor
+        if cursor is None:
+            return pages
+
+
+def test_cursor_walk_visits_every_row_once(app, make_user, make_submission):
+    submissions = seed(make_user, make_submission)
+    query = Submission.query.filter_by(verified=True, published=True)
+
+    pages = walk(query, per_page=5)
+
+    assert [s.id for page in pages for s in page.items] == expected_order(submissions)
+    assert [page.first for page in pages] == [1, 6, 11, 16, 21]
+    assert not pages[0].has_prev and not pages[-1].has_next
+
+
+def test_prev_cursor_walks_back_to_first_page(app, make_user, make_submission):
+    submissions = seed(make_user, make_submission)
+    query = Submission.query.filter_by(verified=True, published=True)
+
+    last = walk(query, per_page=5)[-1]
+    pages = walk(query, per_page=5, cursor=last.prev_cursor, direction='prev')
+
+    visited = [s.id for page in reversed(pages) for s in page.items]
+    assert visited == expected_order(submissions)[:20]
+    assert [page.first for page in reversed(pages)] == [1, 6, 11, 16]
+    assert not pages[-1].has_prev
+
+
+def test_invalid_cursor_falls_back_to_first_page(app, make_user, make_submission):
+    seed(make_user, make_submission, count=3)
+    query = Submission.query.filter_by(verified=True, published=True)
+
+    for cursor in ('garbage', encode_cursor({'k': [1]}), encode_cursor({'k': ['x', 'not-a-date', 1]})):
+        page = KeysetPagination(query, KEY_COLUMNS, cursor=cursor, per_page=5)
+        assert page.first == 1 and len(page.items) == 3
+
+    assert decode_cursor('%%%') is None
+
+
+def test_malformed_cursor_falls_back_to_first_page(client, make_user, make_submission):
+    submissions = seed(make_user, make_submission, count=3)
+    query = Submission.query.filter_by(verified=True, published=True)
+    keys = [60.0, submissions[0].submission_date.isoformat(), 1]
+
+    malformed = [
+        {'k': keys, 'n': 'x'},
+        {'k': keys, 'n': None},
+        {'k': keys, 'n': -5},
+        {'k': keys, 'n': True},
+        {'k': [[1], keys[1], 1], 'n': 5},
+        {'k': [60.0, {'a': 1}, 1], 'n': 5},
+        {'k': [60.0, 12, 1], 'n': 5},
+        {'k': ['fast', keys[1], 1], 'n': 5},
+    ]
+    for payload in malformed:
+        page = KeysetPagination(query, KEY_COLUMNS, cursor=encode_cursor(payload), per_page=5)
+        assert page.first == 1 and len(page.items) == 3 and not page.has_prev
+
+        response = client.get(f'/leaderboard?cursor={encode_cursor(payload)}')
+        assert response.status_code == 200
+
+
+def test_leaderboard_pages_by_cursor(client, make_user, make_submission):
+    seed(make_user, make_submission, count=25)
+
+    first = client.get('/leaderboard?sort=tokens')
+    assert first.status_code == 200
+    assert b'cursor=' in first.data
+
+    ranked = client.get('/leaderboard')
+    assert b'1&ndash;20 of 25' in ranked.data
+
+    # No AI result: still listed, first when sorting worst-first
+    make_submission(make_user('no-ai'), ai_tokens_per_sec=None)
+    assert b'no-ai' in client.get('/leaderboard?sort=tokens&order=asc').data
+
+
+def test_nullable_sort_keeps_rows_without_a_value(app, make_user, make_submission):
+    user = make_user('tester')
+    now = datetime.utcnow()
+    submissions = [
+        make_submission(user, ai_tokens_per_sec=(20.0 + i % 3) if i % 2 else None,
+                        submission_date=now - timedelta(days=i % 4))
+        for i in range(13)
+    ]
+    query = Submission.query.filter_by(verified=True, published=True)
+    columns = [Submission.ai_tokens_per_sec, Submission.submission_date, Submission.id]
+
+    def sort_key(s):
+        return (s.ai_tokens_per_sec is not None, s.ai_tokens_per_sec or 0, s.submission_date, s.id)
+
+    for descending in (True, False):
+        expected = [s.id for s in sorted(submissions, key=sort_key, reverse=descending)]
+        pages, cursor = [], None
+        while True:
+            page = KeysetPagination(query, columns, descending=descending, cursor=cursor, per_page=3, nullable=True)
+            pages.append(page)
+            if page.next_cursor is None:
+                break
+            cursor = page.next_cursor
+        assert [s.id for page in pages for s in page.items] == expected
+
+        # ...and back again from the last page
+        back, cursor = [], pages[-1].prev_cursor
+        while cursor is not None:
+            page = KeysetPagination(query, columns, descending=descending, cursor=cursor, per_page=3, nullable=True)
+            back.append(page)
+            cursor = page.prev_cursor
+        assert [s.id for page in reversed(back) for s in page.items] == expected[:len(expected) - len(pages[-1].items)]
@@ -0,0 +1,43 @@
+"""
+Password hashing - process pool and rehash-on-login
+"""
+from werkzeug.security import generate_password_hash
+
+from models import db, User
+from utils.passwords import PasswordHasher, hash_method
+
+
+def test_pool_hashes_and_verifies():
+    hasher = PasswordHasher(method='pbkdf2:sha256:1000', workers=1)
+    try:
+        pwhash = hasher.hash('password123')
+        assert hash_method(pwhash) == 'pbkdf2:sha256:1000'
+        assert hasher.verify(pwhash, 'password123') == (True, None)
+        assert hasher.verify(pwhash, 'wrong') == (False, None)
+    finally:
+        hasher.shutdown()
+
+
+def test_old_profile_hash_upgraded_at_login(app, client, make_user):
+    user = make_user('tester')
+    user.password_hash = generate_password_hash('password123', method='pbkdf2:sha256:2000')
+    db.session.commit()
+
+    response = client.post('/login', data={'username': 'tester', 'password': 'password123'})
+
+    assert response.status_code == 302
+    db.session.expire_all()
+    stored = db.session.get(User, user.id).password_hash
+    assert hash_method(stored) == app.config['PASSWORD_HASH_METHOD']
+    assert db.session.get(User, user.id).check_password('password123')
+
+
+def test_wrong_password_never_rehashes(client, make_user):
+    user = make_user('tester')
+    user.password_hash = old_hash = generate_password_hash('password123', method='pbkdf2:sha256:2000')
+    db.session.commit()
+
+    client.post('/login', data={'username': 'tester', 'password': 'nope'})
+
+    db.session.expire_all()
+    assert db.session.get(User, user.id).password_hash == old_hash
@@ -0,0 +1,46 @@
+"""
+Per-request query counts for pages that render submission lists
+A page must issue the same number of queries for 2 rows as for 20 - related
+users/submissions are eager loaded, never lazy loaded per row
+"""
+import pytest
+
+from models import db, Improvement
+
+
+LIST_URLS = [
+    '/',
+    '/leaderboard',
+    '/leaderboard?sort=tokens&order=asc',
+    '/leaderboard?gpu_brand=nvidia&time=week',
+    '/official-builds',
+    '/best-all-rounder',
+    '/leaderboard/most-improved',
+    '/leaderboard/most-improved/percent',
+]
+
+
+def seed(make_user, make_submission, count, prefix='user'):
+    """One user per pair of submissions (worst case for N+1), half official, each with an improvement"""
+    for i in range(count):
+        user = make_user(f'{prefix}{i}')
+        before = make_submission(user, fps_avg=40.0 + i)
+        after = make_submission(user, fps_avg=60.0 + i, is_official=i % 2 == 0)
+        db.session.add(Improvement(
+            user_id=user.id, before_submission_id=before.id, after_submission_id=after.id,
+            fps_before=before.fps_avg, fps_after=after.fps_avg, fps_gain=20.0 + i, fps_gain_percent=50.0 - i
+        ))
+    db.session.commit()
+
+
+@pytest.mark.parametrize('url', LIST_URLS)
+def test_list_pages_query_count_does_not_grow_with_rows(make_user, make_submission, count_queries, url):
+    seed(make_user, make_submission, 2)
+    response, few = count_queries(url)
+    assert response.status_code == 200
+
+    seed(make_user, make_submission, 18, prefix='more')
+    response, many = count_queries(url)
+    assert response.status_code == 200
+
+    assert many == few, f'{url}: {few} queries for 2 rows, {many} for 20'
@@ -0,0 +1,111 @@
+"""
+Query plan checks for the public listing routes
+Every ORDER BY issued by these pages must be served by an index, never by
+SQLite sorting the result in a temp B-tree
+"""
+import html
+import re
+
+import pytest
+from sqlalchemy import event
+
+from models import db
+from routes.leaderboard import SORT_COLUMNS
+
+
+LEADERBOARD_URLS = [
+    f'/leaderboard?sort={sort}&order={order}&category={category}&price={price}&time={time}'
+    for sort in ('fps', 'tokens')
+    for order in ('desc', 'asc')
+    for category in ('all', '1920x1080_High')
+    for price in ('all', 'under100', '100-200')
+    for time in ('all', 'week')
+]
+
+LISTING_URLS = [
+    '/',
+    '/leaderboard',
+    '/leaderboard?gpu_brand=nvidia',
+    '/leaderboard?gpu_brand=amd&category=1920x1080_High',
+    '/leaderboard?gpu_brand=intel&sort=tokens',
+    '/official-builds',
+    '/best-all-rounder',
+    '/leaderboard/most-improved',
+    '/leaderboard/most-improved/percent',
+    '/profile/tester',
+]
+
+
+CURSOR_LINK = re.compile(r'href="([^"]*cursor=[^"]*)"')
+
+
+def cursor_links(client, urls):
+    """Collect the Previous/Next cursor links rendered on each URL"""
+    links = []
+    for url in urls:
+        links.extend(html.unescape(link) for link in CURSOR_LINK.findall(client.get(url).get_data(as_text=True)))
+    return links
+
+
+def capture_ordered_selects(client, urls):
+    """Request each URL and collect every SELECT ... ORDER BY it executed"""
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and 'ORDER BY' in statement.upper():
+            captured.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        for url in urls:
+            assert client.get(url).status_code == 200, url
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+    return captured
+
+
+def query_plan(statement, parameters):
+    """Run EXPLAIN QUERY PLAN and return the plan detail lines"""
+    cursor = db.engine.raw_connection().cursor()
+    cursor.execute(f'EXPLAIN QUERY PLAN {statement}', parameters)
+    return [row[-1] for row in cursor.fetchall()]
+
+
+@pytest.mark.parametrize('urls', [LEADERBOARD_URLS, LISTING_URLS], ids=['leaderboard', 'listings'])
+def test_route_queries_never_sort_in_temp_btree(client, make_user, make_submission, urls):
+    user = make_user('tester')
+    make_submission(user)
+    make_submission(user, fps_avg=90.0, fps_resolution='2560x1440', is_official=True)
+
+    statements = capture_ordered_selects(client, urls)
+    assert statements
+
+    for statement, parameters in statements:
+        plan = query_plan(statement, parameters)
+        assert not any('USE TEMP B-TREE FOR' in line and 'ORDER BY' in line for line in plan), (statement, plan)
+
+
+def test_cursor_pages_never_sort_in_temp_btree(client, make_user, make_submission):
+    user = make_user('tester')
+    for i in range(45):
+        make_submission(user, fps_avg=50.0 + i % 7, ai_tokens_per_sec=20.0 + i % 5, is_official=i % 2 == 0)
+
+    # Page 2 (forwards), then back again from page 3
+    page_two = cursor_links(client, LEADERBOARD_URLS + LISTING_URLS)
+    links = page_two + cursor_links(client, page_two)
+    assert any('official-builds' in link for link in links)
+    assert any('best-all-rounder' in link for link in links)
+
+    for statement, parameters in capture_ordered_selects(client, links):
+        plan = query_plan(statement, parameters)
+        assert not any('USE TEMP B-TREE FOR' in line and 'ORDER BY' in line for line in plan), (statement, plan)
+
+
+def test_unknown_sort_column_falls_back_to_fps(client, make_user, make_submission):
+    user = make_user('tester')
+    make_submission(user)
+
+    assert client.get('/leaderboard?sort=password_hash').status_code == 200
+    assert client.get('/leaderboard?sort=__class__&order=asc').status_code == 200
+    assert set(SORT_COLUMNS) == {'fps', 'fps_avg', 'tokens', 'ai_tokens_per_sec'}
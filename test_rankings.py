@@ -0,0 +1,104 @@
+"""
+Materialized leaderboard ranks - incremental maintenance must always agree with
+a rebuild from scratch, through inserts, edits, unpublishing and deletes
+"""
+import random
+from datetime import datetime, timedelta
+
+from models import db, ConfigurationResult, LeaderboardRank, Submission
+from utils.rankings import (is_rankable, rank_percentile, rebuild_rankings, remove_submission_rank,
+                            submission_categories, sync_submission_rank)
+
+
+CATEGORIES = [('1920x1080', 'High'), ('2560x1440', 'Ultra')]
+
+
+def ranks_table():
+    return {
+        (entry.category, entry.submission_id): (entry.rank, entry.fps_avg, entry.ai_tokens_per_sec,
+                                                entry.submission_date, entry.user_id)
+        for entry in LeaderboardRank.query
+    }
+
+
+def expected_ranks():
+    """The ranks worked out directly from submissions: FPS desc, newest first, then ID desc"""
+    by_category = {}
+    for submission in Submission.query:
+        if is_rankable(submission):
+            for category, fps_avg in submission_categories(submission).items():
+                by_category.setdefault(category, []).append((fps_avg, submission))
+
+    expected = {}
+    for category, entries in by_category.items():
+        entries.sort(key=lambda e: (e[0], e[1].submission_date, e[1].id), reverse=True)
+        for rank, (fps_avg, submission) in enumerate(entries, start=1):
+            expected[(category, submission.id)] = (rank, fps_avg, submission.ai_tokens_per_sec,
+                                                   submission.submission_date, submission.user_id)
+    return expected
+
+
+def set_results(submission, rng):
+    """Give a submission a random subset of category results (few distinct values - lots of ties)"""
+    submission.configuration_results = []
+    db.session.flush()
+    for resolution, quality in rng.sample(CATEGORIES, rng.randint(0, len(CATEGORIES))):
+        submission.configuration_results.append(ConfigurationResult(
+            resolution=resolution, quality=quality, fps_avg=rng.choice((30.0, 45.0, 60.0)),
+            fps_min=0.0, fps_max=0.0
+        ))
+
+
+def test_incremental_ranks_match_rebuild(app, make_user, make_submission):
+    rng = random.Random(1234)
+    users = [make_user(f'user{n}') for n in range(3)]
+    now = datetime(2026, 1, 1)
+    dates = [now - timedelta(days=d) for d in range(3)]
+
+    for step in range(120):
+        submissions = Submission.query.all()
+        action = rng.choice(('insert', 'insert', 'edit', 'toggle', 'delete')) if submissions else 'insert'
+
+        if action == 'insert':
+            submission = make_submission(
+                rng.choice(users),
+                fps_avg=rng.choice((50.0, 60.0, 70.0)),
+                ai_tokens_per_sec=rng.choice((None, 20.0)),
+                submission_date=rng.choice(dates),
+                published=rng.random() > 0.2,
+                configuration_results=[]
+            )
+            set_results(submission, rng)
+            sync_submission_rank(submission)
+        elif action == 'edit':
+            submission = rng.choice(submissions)
+            submission.fps_avg = rng.choice((50.0, 60.0, 70.0))
+            submission.ai_tokens_per_sec = rng.choice((None, 20.0, 25.0))
+            if rng.random() < 0.5:
+                set_results(submission, rng)
+            sync_submission_rank(submission)
+        elif action == 'toggle':
+            submission = rng.choice(submissions)
+            submission.published = not submission.published
+            sync_submission_rank(submission)
+        else:
+            submission = rng.choice(submissions)
+            remove_submission_rank(submission)
+            db.session.delete(submission)
+        db.session.commit()
+
+        assert ranks_table() == expected_ranks(), f"step {step}: {action}"
+
+    incremental = ranks_table()
+    assert any(key[0] != 'all' for key in incremental)  # category entries were exercised
+
+    rebuild_rankings()
+    db.session.commit()
+    assert ranks_table() == incremental
+
+
+def test_rank_percentile():
+    assert rank_percentile(1, 4) == 100.0
+    assert rank_percentile(4, 4) == 25.0
+    assert rank_percentile(2, 3) == 66.7
+    assert rank_percentile(1, 0) is None
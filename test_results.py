@@ -0,0 +1,77 @@
+"""
+Table-driven results extraction
+"""
+import pytest
+
+from models import Submission
+from utils.results import FIELDS, SubmissionRecord, extract_submission_data
+
+THERMAL = {'gpu_temp_min': 40.0, 'gpu_temp_avg': 70.0, 'gpu_temp_max': 80.0, 'cpu_temp_max': 75.0}
+
+
+def make_package(fps, cpu=None):
+    return {
+        'version': '1.0.0',
+        'timestamp': '2025-10-25T20:45:00',
+        'hardware_fingerprint': 'f' * 64,
+        'results': {
+            'system_info': {
+                'cpu': {'model': 'AMD Ryzen 5 5600X', 'cores': 6, 'threads': 12, 'max_mhz': '4650.0000'},
+                'gpu': {'model': 'NVIDIA GeForce RTX 3060'},
+                'ram': {'total': '32GB', 'type': 'DDR4', 'speed': '3200 MT/s'}
+            },
+            'fps': fps,
+            'cpu': cpu or {'status': 'skipped'}
+        }
+    }
+
+
+def test_configurations_use_the_fastest_run(app):
+    record = extract_submission_data(make_package({'status': 'completed', 'configurations': {
+        '1080p_low': {'average_fps': 140.0, 'resolution': '1080p', 'quality': 'Low', 'thermal_metrics': THERMAL},
+        '1080p_ultra': {'average_fps': 60.0, 'resolution': '1080p', 'quality': 'Ultra'}
+    }}))
+
+    assert isinstance(record, SubmissionRecord)
+    assert (record.fps_avg, record.fps_resolution, record.fps_quality) == (140.0, '1080p', 'Low')
+    assert record.fps_min == 0.0
+    assert (record.gpu_temp_max, record.cpu_temp_max, record.cpu_util_avg) == (80.0, 75.0, None)
+    assert record.cpu_clock_speed == '4.65 GHz'
+    assert record.ram_speed_mhz == 3200
+    assert record.cpu_score is None and record.ai_tokens_per_sec is None
+
+
+def test_legacy_single_run(app):
+    record = extract_submission_data(make_package(
+        {'status': 'completed', 'average_fps': 78.5, 'resolution': '1080p', 'quality': 'High',
+         'thermal_metrics': THERMAL, 'gpu_metrics': {'temp_max': 85.0, 'load_avg': 75.0}},
+        cpu={'status': 'completed', 'benchmark_type': 'geekbench', 'multi_core_score': 9800.0}
+    ))
+
+    assert record.fps_avg == 78.5
+    # The legacy format's settings were never trusted for categories
+    assert record.fps_resolution is None and record.fps_quality is None
+    # Run thermals win; Phase 2 gpu_metrics only fill the gaps
+    assert (record.gpu_temp_max, record.gpu_load_avg) == (80.0, 75.0)
+    assert record.cpu_score == 9800.0
+
+
+def test_incomplete_benchmarks_leave_columns_unset(app):
+    record = extract_submission_data(make_package({'status': 'failed', 'gpu_metrics': {'temp_max': 85.0}}))
+
+    assert record.fps_avg is None and record.fps_resolution is None
+    assert (record.gpu_temp_max, record.gpu_temp_avg) == (85.0, None)
+    assert record.cpu_model == 'AMD Ryzen 5 5600X'
+
+
+def test_record_builds_a_submission(app):
+    record = extract_submission_data(make_package({'status': 'completed', 'average_fps': 78.5}))
+
+    assert set(record.as_dict()) == {column for column, _, _, _ in FIELDS}
+    assert Submission(user_id=1, **record.as_dict()).fps_avg == 78.5
+    with pytest.raises(AttributeError):
+        record.unknown_column = 1
+
+
+def test_malformed_package_is_rejected(app):
+    assert extract_submission_data({'results': {'fps': 'completed'}}) is None
@@ -0,0 +1,239 @@
+"""
+.pbr signing and verification - format v2 and v1 compatibility
+"""
+import base64
+import hashlib
+import hmac
+import io
+import json
+import zlib
+from pathlib import Path
+
+from models import Submission
+from security import BenchmarkSecurity
+from utils.blobstore import open_upload
+
+
+BASE_DIR = Path(__file__).parent
+
+DATA_PACKAGE = {
+    'version': '1.0.0',
+    'timestamp': '2025-10-25T20:45:00',
+    'hardware_fingerprint': 'f' * 64,
+    'results': {'fps': {'status': 'completed', 'average_fps': 78.5}}
+}
+
+
+def make_security(signing_key=None):
+    return BenchmarkSecurity(base_dir=BASE_DIR, signing_key=signing_key)
+
+
+def test_v2_round_trip():
+    security = make_security()
+    token = security.encode_for_submission(security.sign_data_package(DATA_PACKAGE))
+
+    assert token.startswith('PBR2.')
+    assert security.decode_submission(token) == DATA_PACKAGE
+
+
+def test_v2_signs_bytes_as_written():
+    # A payload a v1 verifier would re-serialize differently ('78.50' -> '78.5')
+    security = make_security()
+    signed_part = 'PBR2.' + base64.b64encode(b'{"results": {"fps": {"average_fps": 78.50}}}').decode()
+    token = f"{signed_part}.{security._hmac(signed_part.encode())}"
+
+    assert security.decode_submission(token) == {'results': {'fps': {'average_fps': 78.5}}}
+
+
+def test_v2_rejects_tampering_before_parsing(monkeypatch):
+    security = make_security()
+    token = security.encode_for_submission(security.sign_data_package(DATA_PACKAGE))
+    payload = base64.b64decode(token.split('.')[1]).replace(b'78.5', b'98.5')
+    forged = f"PBR2.{base64.b64encode(payload).decode()}.{token.rsplit('.', 1)[1]}"
+
+    def no_parsing(*args, **kwargs):
+        raise AssertionError('payload parsed before the signature was checked')
+    monkeypatch.setattr(json, 'loads', no_parsing)
+
+    assert security.decode_submission(forged) is None
+    assert make_security('another-key').decode_submission(token) is None
+    assert security.decode_submission('PBR2.no-signature') is None
+
+
+def test_v1_files_still_verify():
+    content = (BASE_DIR / 'test_benchmark_encoded.pbr').read_text()
+    results = make_security().validate_submission_content(content)
+
+    assert results['hardware_fingerprint'].startswith('TEST-')
+
+
+def test_submission_file_is_v2(tmp_path):
+    security = make_security()
+    path = security.create_submission_file(security.sign_data_package(DATA_PACKAGE), tmp_path)
+
+    assert '# Format: 2' in path.read_text()
+    assert security.validate_submission_file(path) == DATA_PACKAGE
+
+
+def test_v3_container_round_trip_across_chunks(monkeypatch):
+    security = make_security()
+    container = security.pack_container(DATA_PACKAGE)['container']
+    assert container.startswith(b'PBR3')
+
+    # Tiny chunks so the trailing signature straddles reads
+    monkeypatch.setattr(BenchmarkSecurity, 'CHUNK_SIZE', 7)
+    assert security.validate_submission_content(io.BytesIO(container)) == DATA_PACKAGE
+
+
+def test_v3_container_rejects_tampering():
+    security = make_security()
+    container = bytearray(security.pack_container(DATA_PACKAGE)['container'])
+    container[20] ^= 0xFF
+
+    assert security.validate_submission_content(bytes(container)) is None
+    assert make_security('another-key').validate_submission_content(security.pack_container(DATA_PACKAGE)['container']) is None
+    assert security.validate_submission_content(security.pack_container(DATA_PACKAGE)['container'][:-1]) is None
+
+
+def test_v3_container_enforces_decoded_limit():
+    security = make_security()
+    big = dict(DATA_PACKAGE, results={'padding': 'x' * 100_000})
+    container = security.pack_container(big)['container']
+
+    assert len(container) < 1_000  # compresses to almost nothing...
+    assert security.validate_submission_content(container, max_decoded_length=50_000) is None  # ...but decodes too large
+    assert security.validate_submission_content(container, max_decoded_length=200_000) == big
+
+
+def test_v3_container_rejects_understated_length():
+    security = make_security()
+    payload = json.dumps(DATA_PACKAGE).encode()
+    body = BenchmarkSecurity.CONTAINER_HEADER.pack(b'PBR3', BenchmarkSecurity.CODEC_ZLIB, 10) + zlib.compress(payload)
+    container = body + hmac.new(security.signing_key.encode(), body, hashlib.sha256).digest()
+
+    assert security.validate_submission_content(container, max_decoded_length=100) is None
+
+
+def test_text_uploads_respect_decoded_limit():
+    content = (BASE_DIR / 'test_benchmark_encoded.pbr').read_bytes()
+    security = make_security()
+
+    assert security.validate_submission_content(io.BytesIO(content), max_decoded_length=len(content)) is not None
+    assert security.validate_submission_content(io.BytesIO(content), max_decoded_length=100) is None
+
+
+def test_submission_file_is_v3_by_default(tmp_path, monkeypatch):
+    security = make_security()
+    monkeypatch.setattr(security, 'generate_hardware_fingerprint', lambda: 'f' * 64)
+    path = security.create_submission_file(security.sign_results({'fps': {'average_fps': 78.5}}), tmp_path)
+
+    assert path.read_bytes().startswith(b'PBR3')
+    assert security.validate_submission_file(path)['results'] == {'fps': {'average_fps': 78.5}}
+
+
+def login(client, user):
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user.id)
+
+
+def make_upload_container(security, average_fps=78.5):
+    return security.pack_container({
+        'version': '1.0.0',
+        'timestamp': '2025-10-25T20:45:00',
+        'hardware_fingerprint': 'f' * 64,
+        'results': {
+            'system_info': {'cpu': {'model': 'AMD Ryzen 5 5600'}, 'gpu': {'model': 'NVIDIA GeForce RTX 3060'}},
+            'fps': {'status': 'completed', 'configurations': {'1080p_high': {
+                'average_fps': average_fps, 'resolution': '1920x1080', 'quality': 'High'
+            }}}
+        }
+    })['container']
+
+
+def upload(client, content):
+    return client.post('/submit', data={'pbr_file': (io.BytesIO(content), 'results.pbr')},
+                       content_type='multipart/form-data')
+
+
+def test_submit_route_accepts_v3_upload(client, make_user):
+    login(client, make_user('tester'))
+    container = make_upload_container(make_security())
+
+    response = upload(client, container)
+
+    assert response.headers['Location'].startswith('/submission/')
+    submission = Submission.query.one()
+    assert submission.fps_avg == 78.5
+    with open_upload(submission.pbr_filename) as stored:
+        assert stored.read() == container
+
+
+def test_content_hash_ignores_text_comments():
+    security = make_security()
+    content = (BASE_DIR / 'test_benchmark_encoded.pbr').read_bytes()
+    stream = io.BytesIO(content)
+
+    assert security.content_hash(stream) == security.content_hash(io.BytesIO(b'# edited\n' + content))
+    assert stream.tell() == 0  # rewound for validation
+    assert security.content_hash(io.BytesIO(make_upload_container(security))) != \
+        security.content_hash(io.BytesIO(make_upload_container(security, average_fps=80.0)))
+
+
+def test_repeat_upload_goes_to_existing_submission(client, make_user, monkeypatch):
+    login(client, make_user('tester'))
+    container = make_upload_container(make_security())
+    first = upload(client, container)
+
+    # The repeat must not even be decoded
+    monkeypatch.setattr(BenchmarkSecurity, 'validate_submission_content', None)
+    repeat = upload(client, container)
+
+    assert repeat.headers['Location'] == first.headers['Location']
+    assert Submission.query.count() == 1
+
+
+def fake_system(tmp_path, monkeypatch, boot_id='boot-1', board_serial='MB-123'):
+    """Point the fingerprint sources at files under tmp_path"""
+    dmi = tmp_path / 'dmi'
+    dmi.mkdir(exist_ok=True)
+    (dmi / 'board_serial').write_text(f"{board_serial}\n")
+    gpu = tmp_path / 'gpus' / '0000:01:00.0'
+    gpu.mkdir(parents=True, exist_ok=True)
+    (gpu / 'information').write_text("Model: NVIDIA GeForce RTX 3060\nGPU UUID: GPU-1234\n")
+    (tmp_path / 'machine-id').write_text("abc\n")
+    (tmp_path / 'boot_id').write_text(f"{boot_id}\n")
+
+    monkeypatch.setattr(BenchmarkSecurity, 'DMI_DIR', dmi)
+    monkeypatch.setattr(BenchmarkSecurity, 'NVIDIA_GPUS_DIR', tmp_path / 'gpus')
+    monkeypatch.setattr(BenchmarkSecurity, 'MACHINE_ID_FILE', tmp_path / 'machine-id')
+    monkeypatch.setattr(BenchmarkSecurity, 'BOOT_ID_FILE', tmp_path / 'boot_id')
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+
+
+def test_fingerprint_reads_files_and_never_spawns_processes(tmp_path, monkeypatch):
+    import subprocess
+
+    def no_subprocesses(*args, **kwargs):
+        raise AssertionError('fingerprinting spawned a process')
+    monkeypatch.setattr(subprocess, 'run', no_subprocesses)
+    monkeypatch.setattr(subprocess, 'Popen', no_subprocesses)
+    fake_system(tmp_path, monkeypatch)
+
+    fingerprint = make_security().generate_hardware_fingerprint()
+
+    cpu_lines = [line.strip() for line in open('/proc/cpuinfo') if 'model name' in line or 'vendor_id' in line]
+    expected = '|'.join(cpu_lines + ['Serial Number: MB-123', 'abc', 'GPU-1234'])
+    assert fingerprint == hashlib.sha256(expected.encode()).hexdigest()
+
+
+def test_fingerprint_is_cached_per_boot(tmp_path, monkeypatch):
+    fake_system(tmp_path, monkeypatch)
+    first = make_security().generate_hardware_fingerprint()
+
+    # Same boot - served from the cache even though a source changed
+    fake_system(tmp_path, monkeypatch, board_serial='MB-999')
+    assert make_security().generate_hardware_fingerprint() == first
+
+    # New boot - re-read
+    fake_system(tmp_path, monkeypatch, boot_id='boot-2', board_serial='MB-999')
+    assert make_security().generate_hardware_fingerprint() != first
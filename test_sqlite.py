@@ -0,0 +1,77 @@
+"""
+SQLite engine profile - pragmas, read pool routing and write transactions
+"""
+import pytest
+from sqlalchemy import event, text
+
+from app import create_app
+from config import config
+from models import db, User
+from utils.sqlite import READ_ENGINE, WRITING
+
+
+@pytest.fixture
+def file_app(tmp_path, monkeypatch):
+    """Testing app on a database file, so the read pool is in use"""
+    monkeypatch.setattr(config['testing'], 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'test.db'}")
+    app = create_app('testing')
+
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.drop_all()
+        app.extensions[READ_ENGINE].dispose()
+
+
+def record_statements(engine):
+    statements = []
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    return statements
+
+
+def test_pragmas_applied(file_app):
+    assert db.session.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+    assert db.session.execute(text('PRAGMA busy_timeout')).scalar() == 5000
+
+    with file_app.extensions[READ_ENGINE].connect() as conn:
+        assert conn.exec_driver_sql('PRAGMA query_only').scalar() == 1
+        assert conn.exec_driver_sql('PRAGMA busy_timeout').scalar() == 5000
+
+
+def test_reads_use_read_pool_until_first_write(file_app):
+    reads = record_statements(file_app.extensions[READ_ENGINE])
+    writes = record_statements(db.engine)
+
+    user = User(username='tester', email='tester@example.com')
+    user.set_password('password123')
+    db.session.add(user)
+    db.session.commit()
+    assert any(s.startswith('BEGIN IMMEDIATE') for s in writes)
+
+    reads.clear()
+    writes.clear()
+    assert User.query.count() == 1
+    assert reads and not writes
+
+    # Once written, the transaction reads its own changes from the writer
+    user.username = 'renamed'
+    db.session.flush()
+    assert db.session.info[WRITING]
+    assert db.session.execute(text('SELECT username FROM users')).scalar() == 'renamed'
+    db.session.commit()
+    assert WRITING not in db.session.info
+
+
+def test_get_requests_never_touch_the_writer(file_app):
+    writes = record_statements(db.engine)
+    client = file_app.test_client()
+
+    assert client.get('/leaderboard').status_code == 200
+    assert writes == []
+
+
+def test_memory_database_has_no_read_pool(app):
+    assert READ_ENGINE not in app.extensions
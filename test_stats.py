@@ -0,0 +1,76 @@
+"""
+Submission statistics - single aggregate query behind a versioned cache
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from models import db
+from utils.cache import get_version
+from utils.stats import STATS_VERSION, compute_submission_stats, get_submission_stats
+
+
+def count_selects(fn):
+    """Run fn and return (result, number of SELECTs it issued)"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        result = fn()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+    return result, len(statements)
+
+
+def test_stats_match_category_and_time_window(app, make_user, make_submission):
+    alice, bob = make_user('alice'), make_user('bob')
+    make_submission(alice, fps_avg=60.0, ai_tokens_per_sec=20.0)
+    make_submission(alice, fps_avg=90.0, ai_tokens_per_sec=None, fps_resolution='2560x1440')
+    make_submission(bob, fps_avg=30.0, ai_tokens_per_sec=40.0, submission_date=datetime.utcnow() - timedelta(days=20))
+    make_submission(bob, fps_avg=500.0, published=False)
+
+    assert compute_submission_stats() == {
+        'total_submissions': 3, 'unique_users': 2, 'avg_fps': 60.0, 'avg_tokens': 30.0, 'week_submissions': 2,
+    }
+    assert compute_submission_stats('1920x1080', 'High')['total_submissions'] == 2
+    assert compute_submission_stats(time_period='week')['unique_users'] == 1
+    assert compute_submission_stats(time_period='month')['total_submissions'] == 3
+
+
+def test_cached_stats_cost_one_version_read(app, make_user, make_submission):
+    make_submission(make_user('alice'))
+
+    first, queries = count_selects(get_submission_stats)
+    assert queries == 2  # version read + aggregate
+
+    second, queries = count_selects(get_submission_stats)
+    assert queries == 1 and second == first
+
+
+def test_stats_invalidated_on_insert_publish_and_delete(app, make_user, make_submission):
+    user = make_user('alice')
+    make_submission(user)
+    assert get_submission_stats()['total_submissions'] == 1
+
+    hidden = make_submission(user, published=False)
+    version = get_version(STATS_VERSION)
+
+    hidden.published = True
+    db.session.commit()
+    assert get_version(STATS_VERSION) == version + 1
+    assert get_submission_stats()['total_submissions'] == 2
+
+    db.session.delete(hidden)
+    db.session.commit()
+    assert get_submission_stats()['total_submissions'] == 1
+
+
+def test_pages_render_cached_stats(client, make_user, make_submission):
+    make_submission(make_user('alice'))
+
+    for url in ('/', '/leaderboard', '/leaderboard?time=week&category=1920x1080_High'):
+        assert client.get(url).status_code == 200
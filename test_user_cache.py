@@ -0,0 +1,97 @@
+"""
+Session user cache and hashed verification tokens
+"""
+import time
+
+from sqlalchemy import event, text
+
+from models import db, User
+from utils.cache import bump_version
+from utils.passwords import hash_token
+from utils.user_cache import USER_CACHE
+
+
+def login(client, user):
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user.id)
+        session['_fresh'] = True
+
+
+def user_loads(app, client, url):
+    """Request a URL and return the statements it ran to load the session user"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, *args):
+        if 'FROM users' in statement or 'users' in (parameters or ()):
+            statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        with app.app_context():
+            client.get(url).get_data()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    return statements
+
+
+def test_cached_user_costs_no_query(app, client, make_user, monkeypatch):
+    user = make_user('tester')
+    login(client, user)
+    cache = app.extensions[USER_CACHE]
+
+    assert len(user_loads(app, client, '/')) == 2  # users version + row
+    assert user_loads(app, client, '/') == []
+    assert b'tester' in request(client, 'GET', '/').data
+
+    # Another worker renames the user (plain SQL - no listener runs in this worker)
+    db.session.execute(text("UPDATE users SET username = 'renamed' WHERE id = :id"), {'id': user.id})
+    bump_version('users')
+    db.session.commit()
+    assert b'renamed' not in request(client, 'GET', '/').data  # within USER_CACHE_VERSION_TTL
+
+    later = time.monotonic() + cache.version_ttl
+    monkeypatch.setattr(time, 'monotonic', lambda: later)
+    assert b'renamed' in request(client, 'GET', '/').data
+
+
+def request(client, method, url):
+    """Make a request in a fresh app context (fresh session and g), as a real worker would"""
+    with client.application.app_context():
+        return client.open(url, method=method)
+
+
+def test_admin_changes_evict_cached_users(client, make_user):
+    admin = make_user('admin', is_admin=True)
+    target = make_user('target', is_admin=True)
+    other = make_user('other')
+    target_client = client.application.test_client()
+    other_client = client.application.test_client()
+    login(client, admin)
+    login(target_client, target)
+    login(other_client, other)
+
+    assert request(target_client, 'GET', '/admin').status_code == 200  # now cached as an admin
+    request(client, 'POST', f'/admin/users/{target.id}/toggle-admin')
+    assert request(target_client, 'GET', '/admin').status_code == 302
+
+    assert b'other' in request(other_client, 'GET', '/').data
+    request(client, 'POST', f'/admin/users/{other.id}/delete')
+    assert b'other' not in request(other_client, 'GET', '/').data
+
+
+def test_verification_token_stored_hashed_and_indexed(client, make_user):
+    user = make_user('tester')
+    user.email_verified = False
+    token = user.generate_verification_token()
+    db.session.commit()
+
+    assert user.verification_token == hash_token(token) != token
+    plan = db.session.execute(text(
+        "EXPLAIN QUERY PLAN SELECT id FROM users WHERE verification_token = :token"
+    ), {'token': hash_token(token)}).fetchall()
+    assert 'ix_users_verification_token' in str(plan)
+
+    client.get(f'/verify-email/{token}')
+    db.session.expire_all()
+    assert db.session.get(User, user.id).email_verified
+    assert User.find_by_verification_token(token) is None
@@ -86,7 +86,7 @@ def check_and_award_achievements(improvement=None, user_id=None):
         user_id: User ID (for submission-based achievements)
 
     Returns:
-        list: List of newly awarded Achievement objects
+        list: List of newly awarded Achievement objects (added to the session, not committed)
     """
     awarded = []
 
@@ -127,7 +127,6 @@ def check_and_award_achievements(improvement=None, user_id=None):
                         badge_emoji=achievement['badge'],
                         improvement_id=improvement.id
                     )
-                    db.session.add(new_achievement)
                     awarded.append(new_achievement)
 
     if user_id:
@@ -150,7 +149,6 @@ def check_and_award_achievements(improvement=None, user_id=None):
                     description=ACHIEVEMENTS['first_submission']['description'],
                     badge_emoji=ACHIEVEMENTS['first_submission']['badge']
                 )
-                db.session.add(new_achievement)
                 awarded.append(new_achievement)
 
         # Dedicated tuner achievement (5+ submissions of same hardware)
@@ -177,12 +175,10 @@ def check_and_award_achievements(improvement=None, user_id=None):
                     description=ACHIEVEMENTS['dedicated_tuner']['description'],
                     badge_emoji=ACHIEVEMENTS['dedicated_tuner']['badge']
                 )
-                db.session.add(new_achievement)
                 awarded.append(new_achievement)
 
-    # Commit all new achievements
-    if awarded:
-        db.session.commit()
+    # Add all new achievements in one batch - the caller commits the unit of work
+    db.session.add_all(awarded)
 
     return awarded
 
@@ -0,0 +1,179 @@
+"""
+PiggyBankPC Leaderboard - Analytics Rollups
+Hourly and daily event counts (event_type x issue_type x product) in the
+analytics_rollups table, added to in the same transaction that writes the
+events, so dashboard stats and time series never scan analytics_events
+"""
+
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db, AnalyticsEvent, AnalyticsRollup
+
+
+# Period -> length of one bucket
+PERIODS = {
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+}
+
+# Columns a series can be split by
+DIMENSIONS = ('event_type', 'issue_type', 'product')
+
+# Dialect name -> INSERT construct with ON CONFLICT DO UPDATE (both spell it the same way)
+UPSERT_INSERTS = {
+    'sqlite': sqlite.insert,
+    'postgresql': postgresql.insert,
+}
+
+
+def bucket_start(moment, period):
+    """Start of the hour/day containing a datetime"""
+    if period == 'day':
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def _dimension(event_data, key, length):
+    value = event_data.get(key) if isinstance(event_data, dict) else None
+    return str(value)[:length] if value is not None else ''
+
+
+def rollup_rows(events):
+    """
+    Aggregate event rows (dicts of AnalyticsEvent columns) into rollup increments
+
+    Returns:
+        list: Dicts of AnalyticsRollup columns, one per (period, bucket, dimensions)
+    """
+    counts = Counter()
+    for event in events:
+        dimensions = (
+            event['event_type'],
+            _dimension(event['event_data'], 'issue_type', 100),
+            _dimension(event['event_data'], 'product', 200)
+        )
+        for period in PERIODS:
+            counts[(period, bucket_start(event['created_at'], period)) + dimensions] += 1
+
+    return [
+        {'period': period, 'bucket': bucket, 'event_type': event_type,
+         'issue_type': issue_type, 'product': product, 'count': count}
+        for (period, bucket, event_type, issue_type, product), count in counts.items()
+    ]
+
+
+def _upsert_insert(connection):
+    """INSERT construct supporting upserts for the database behind a connection or session"""
+    dialect = connection.dialect if hasattr(connection, 'dialect') else connection.get_bind().dialect
+    try:
+        return UPSERT_INSERTS[dialect.name]
+    except KeyError:
+        raise NotImplementedError(f"Analytics rollups need an upsert, not supported on {dialect.name}") from None
+
+
+def add_to_rollups(connection, events):
+    """
+    Count events into the rollups - run in the transaction that inserts them
+
+    Args:
+        connection: Connection (or session) the events are being written with
+        events: Dicts of AnalyticsEvent columns
+    """
+    rows = rollup_rows(events)
+    if not rows:
+        return
+
+    upsert = _upsert_insert(connection)(AnalyticsRollup)
+    connection.execute(
+        upsert.on_conflict_do_update(
+            index_elements=[c.name for c in AnalyticsRollup.__table__.primary_key],
+            set_={'count': AnalyticsRollup.count + upsert.excluded['count']}
+        ),
+        rows
+    )
+
+
+def rebuild_rollups(batch_size=5000):
+    """
+    Recount the rollups from analytics_events (caller commits)
+    Used to backfill existing data
+
+    Only buckets from the day of the oldest remaining event onwards are rebuilt:
+    earlier buckets count events that retention has since archived and deleted,
+    so they are kept as they are. Pruning cuts at a day boundary (see
+    utils.retention), so that first day still holds all of its events
+
+    Returns:
+        int: Number of events counted
+    """
+    oldest = db.session.query(func.min(AnalyticsEvent.created_at)).scalar()
+    if oldest is None:
+        return 0
+
+    since = bucket_start(oldest, 'day')
+    AnalyticsRollup.query.filter(AnalyticsRollup.bucket >= since).delete(synchronize_session=False)
+
+    columns = (AnalyticsEvent.event_type, AnalyticsEvent.event_data, AnalyticsEvent.created_at)
+    batch = []
+    counted = 0
+    for event in db.session.query(*columns).filter(AnalyticsEvent.created_at >= since).yield_per(batch_size):
+        batch.append(event._asdict())
+        if len(batch) == batch_size:
+            add_to_rollups(db.session, batch)
+            counted += len(batch)
+            batch = []
+
+    add_to_rollups(db.session, batch)
+    return counted + len(batch)
+
+
+def event_counts(event_types):
+    """
+    All-time totals per event type, summed from the daily rollups
+
+    Returns:
+        dict: {event_type: count} (0 for types with no events)
+    """
+    totals = dict(
+        db.session.query(AnalyticsRollup.event_type, func.sum(AnalyticsRollup.count)).filter(
+            AnalyticsRollup.period == 'day',
+            AnalyticsRollup.event_type.in_(event_types)
+        ).group_by(AnalyticsRollup.event_type).all()
+    )
+    return {event_type: totals.get(event_type, 0) for event_type in event_types}
+
+
+def event_series(period, points, by='event_type', event_type=None, now=None):
+    """
+    Event counts for the last `points` buckets of a period, split by a dimension
+
+    Args:
+        period: 'hour' or 'day'
+        points: Number of buckets, ending with the current one
+        by: Dimension to split by (see DIMENSIONS)
+        event_type: Only count this event type
+
+    Returns:
+        tuple: (bucket start datetimes, {dimension value: [count per bucket]})
+    """
+    step = PERIODS[period]
+    last = bucket_start(now or datetime.utcnow(), period)
+    buckets = [last - step * n for n in range(points - 1, -1, -1)]
+    positions = {bucket: i for i, bucket in enumerate(buckets)}
+
+    key = getattr(AnalyticsRollup, by)
+    query = db.session.query(AnalyticsRollup.bucket, key, func.sum(AnalyticsRollup.count)).filter(
+        AnalyticsRollup.period == period,
+        AnalyticsRollup.bucket >= buckets[0]
+    )
+    if event_type:
+        query = query.filter(AnalyticsRollup.event_type == event_type)
+
+    series = {}
+    for bucket, value, count in query.group_by(AnalyticsRollup.bucket, key):
+        if bucket in positions:
+            series.setdefault(value, [0] * points)[positions[bucket]] = count
+    return buckets, series
@@ -0,0 +1,146 @@
+"""
+PiggyBankPC Leaderboard - Content-Addressed Upload Storage
+Uploaded .pbr files are stored once per distinct content, gzip-compressed, as
+UPLOAD_FOLDER/blobs/<ab>/<cd>/<sha256>.gz. Submission.pbr_filename holds the
+key (the SHA-256 of the original bytes); rows from before the blob store
+still hold a plain filename in UPLOAD_FOLDER
+"""
+
+import gzip
+import hashlib
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+
+from flask import current_app
+from models import db, Submission
+
+
+BLOB_DIRNAME = 'blobs'
+TMP_DIRNAME = 'tmp'
+CHUNK_SIZE = 64 * 1024
+
+# Unreferenced blobs younger than this are kept - an upload may have stored
+# its blob but not yet committed the row that points at it
+GC_GRACE_SECONDS = 3600
+
+BLOB_KEY = re.compile(r'^[0-9a-f]{64}$')
+
+
+def blob_root(root=None):
+    """Directory holding the blob shards (defaults to UPLOAD_FOLDER/blobs)"""
+    return Path(root) if root else Path(current_app.config['UPLOAD_FOLDER']) / BLOB_DIRNAME
+
+
+def is_blob_key(name):
+    """True if a pbr_filename is a blob key rather than a legacy filename"""
+    return bool(name and BLOB_KEY.match(name))
+
+
+def blob_path(key, root=None):
+    """Where the blob for a key lives: <root>/<ab>/<cd>/<key>.gz"""
+    return blob_root(root) / key[:2] / key[2:4] / f"{key}.gz"
+
+
+def put_blob(stream, root=None):
+    """
+    Store an upload, compressing it as it is read
+
+    The blob is written to a temp file and renamed into place, so readers never
+    see a partial blob and two writers of the same content can't corrupt it.
+
+    Args:
+        stream: Binary file-like object (read from its current position) or bytes
+        root: Blob directory, for use outside an app context
+
+    Returns:
+        str: Blob key (hex SHA-256 of the uncompressed bytes)
+    """
+    root = blob_root(root)
+    tmp_dir = root / TMP_DIRNAME
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    if isinstance(stream, bytes):
+        chunks = [stream]
+    else:
+        chunks = iter(lambda: stream.read(CHUNK_SIZE), b'')
+
+    digest = hashlib.sha256()
+    fd, tmp_name = tempfile.mkstemp(dir=tmp_dir, suffix='.gz')
+    try:
+        with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as compressed:
+            for chunk in chunks:
+                digest.update(chunk)
+                compressed.write(chunk)
+
+        key = digest.hexdigest()
+        path = blob_path(key, root)
+        if path.exists():
+            # Already stored - touch it so a concurrent GC pass treats it as fresh
+            os.unlink(tmp_name)
+            os.utime(path)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp_name, path)
+        return key
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+def open_upload(pbr_filename):
+    """
+    Open a stored upload for reading (blob or legacy file)
+
+    Returns:
+        file object: Binary stream of the original bytes
+    """
+    if is_blob_key(pbr_filename):
+        return gzip.open(blob_path(pbr_filename), 'rb')
+
+    return open(Path(current_app.config['UPLOAD_FOLDER']) / pbr_filename, 'rb')
+
+
+def collect_garbage(grace_seconds=GC_GRACE_SECONDS, dry_run=False, root=None):
+    """
+    Delete blobs no submission points at any more, plus abandoned temp files
+
+    Args:
+        grace_seconds: Keep files modified more recently than this
+        dry_run: Only count what would be deleted
+
+    Returns:
+        dict: {'kept': n, 'deleted': n, 'bytes_freed': n}
+    """
+    root = blob_root(root)
+    cutoff = time.time() - grace_seconds
+    stats = {'kept': 0, 'deleted': 0, 'bytes_freed': 0}
+
+    if not root.exists():
+        return stats
+
+    referenced = {
+        name for (name,) in db.session.query(Submission.pbr_filename).filter(Submission.pbr_filename.isnot(None))
+        if is_blob_key(name)
+    }
+
+    for path in root.glob('*/*/*.gz'):
+        key = path.name[:-len('.gz')]
+        stat = path.stat()
+        if key in referenced or stat.st_mtime > cutoff:
+            stats['kept'] += 1
+            continue
+
+        stats['deleted'] += 1
+        stats['bytes_freed'] += stat.st_size
+        if not dry_run:
+            path.unlink()
+
+    for path in (root / TMP_DIRNAME).glob('*'):
+        if path.stat().st_mtime <= cutoff and not dry_run:
+            path.unlink()
+
+    return stats
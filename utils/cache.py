@@ -0,0 +1,85 @@
+"""
+PiggyBankPC Leaderboard - Versioned Result Cache
+Per-process cache of computed results, invalidated by a version counter stored
+in the database so a write in any worker invalidates the cache in every worker
+"""
+
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import update
+from models import db, CacheVersion
+
+
+def get_version(name):
+    """
+    Current version of a named counter (primary key read)
+
+    Returns:
+        int: Version, 0 if the counter has never been bumped
+    """
+    return db.session.query(CacheVersion.version).filter(
+        CacheVersion.name == name
+    ).scalar() or 0
+
+
+def bump_version(name, connection=None):
+    """
+    Increment a named counter, invalidating results cached under it
+    Runs in the caller's transaction (pass `connection` from inside flush events)
+    """
+    execute = (connection or db.session).execute
+
+    result = execute(
+        update(CacheVersion).where(CacheVersion.name == name).values(version=CacheVersion.version + 1)
+    )
+    if result.rowcount == 0:
+        execute(CacheVersion.__table__.insert().values(name=name, version=1))
+
+
+class VersionedCache:
+    """
+    Results cached against a version counter
+
+    A lookup reads the counter and returns the cached value if it was computed
+    at that version (and, for entries with a ttl, is younger than ttl seconds)
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute, ttl=None):
+        """
+        Args:
+            key: Hashable cache key
+            compute: Zero-argument callable producing the value on a miss
+            ttl: Optional max age in seconds (for results that depend on the clock)
+        """
+        version = get_version(self.name)
+        now = time.monotonic()
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry_version, computed_at, value = entry
+            if entry_version == version and (ttl is None or now - computed_at < ttl):
+                return value
+
+        value = compute()
+        with self._lock:
+            self._entries[key] = (version, now, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def get_cache(name):
+    """Get the app's cache for a named version counter (created on first use)"""
+    caches = current_app.extensions.setdefault('versioned_caches', {})
+    if name not in caches:
+        caches[name] = VersionedCache(name)
+    return caches[name]
@@ -37,7 +37,7 @@ def analyze_submission(submission):
         submission: Submission object
 
     Returns:
-        list: List of detected issues (also saved to database)
+        list: List of detected issues (added to the session, not committed)
     """
     issues = []
 
@@ -81,7 +81,6 @@ def analyze_submission(submission):
                 get_product_with_link('Arctic P12 120mm')  # Case fan for airflow
             ]
         )
-        db.session.add(issue)
         issues.append(issue)
 
     # 1B. GPU THERMAL THROTTLING (High Priority) 🔥💰
@@ -112,7 +111,6 @@ def analyze_submission(submission):
                 get_product_with_link('Arctic P12 120mm')  # Case fan for airflow
             ]
         )
-        db.session.add(issue)
         issues.append(issue)
 
     # 2. CPU BOTTLENECK (Medium Priority) ⚠️💰
@@ -146,7 +144,6 @@ def analyze_submission(submission):
             youtube_title='Is Your CPU Bottlenecking Your GPU? How to Tell',
             products=[]  # No affiliate program for CPUs - recommend checking used market
         )
-        db.session.add(issue)
         issues.append(issue)
 
     # 3. LOW RAM (Low Priority) 📊💰
@@ -174,33 +171,38 @@ def analyze_submission(submission):
                         get_product_with_link('ram_ddr3_16gb')
                     ]
                 )
-                db.session.add(issue)
                 issues.append(issue)
         except (ValueError, IndexError):
             pass  # Couldn't parse RAM, skip this check
 
-    # Save all issues to database
-    if issues:
-        db.session.commit()
+    # Add all issues in one batch - the caller commits the unit of work
+    db.session.add_all(issues)
 
     return issues
 
 
-def get_submission_rank(submission):
+def get_submission_rank(submission, category=None):
     """
-    Calculate submission's rank on the leaderboard
+    Get submission's rank on the leaderboard
 
     Args:
         submission: Submission object
+        category: Category key (defaults to the overall leaderboard)
 
     Returns:
         int: Rank (1 = best)
     """
     from models import Submission
+    from utils.rankings import get_rank_entry, ALL_CATEGORY
 
-    # Count submissions with higher FPS
+    entry = get_rank_entry(submission.id, category or ALL_CATEGORY)
+    if entry:
+        return entry.rank
+
+    # Unranked (e.g. unpublished official build) - count published submissions ahead of it
     rank = Submission.query.filter(
         Submission.verified == True,
+        Submission.published == True,
         Submission.fps_avg > submission.fps_avg
     ).count() + 1
 
@@ -39,14 +39,14 @@ def send_email(subject, recipients, text_body, html_body):
     Thread(target=send_async_email, args=(app, msg)).start()
 
 
-def send_verification_email(user):
+def send_verification_email(user, token):
     """
     Send email verification link to user
 
     Args:
-        user: User object with email and verification_token
+        user: User object with email
+        token: Verification token from user.generate_verification_token()
     """
-    token = user.verification_token
 
     # Create verification URL
     verify_url = f"https://{current_app.config['DOMAIN']}/verify-email/{token}"
@@ -0,0 +1,146 @@
+"""
+PiggyBankPC Leaderboard - Buffered Analytics Ingestion
+Click tracking must not put a write transaction on every request, so events are
+accepted into a per-process buffer and written to analytics_events (and counted
+into the hourly/daily rollups) in batches, one executemany per transaction, by a
+background thread - when the buffer reaches ANALYTICS_BATCH_SIZE, or every
+ANALYTICS_FLUSH_INTERVAL seconds. After a failed flush the thread backs off
+(doubling from ANALYTICS_FLUSH_INTERVAL up to MAX_RETRY_SECONDS) rather than
+retrying a locked or unreachable database in a loop.
+Whatever is still buffered is written when the process exits gracefully
+"""
+
+import atexit
+import threading
+import time
+
+from sqlalchemy import insert
+from models import db, AnalyticsEvent
+from utils.analytics import add_to_rollups
+
+
+# app.extensions key for the app's buffer
+EVENT_BUFFER = 'analytics_event_buffer'
+
+# Events kept for a retry while the database is unavailable; past this the oldest are dropped
+MAX_PENDING = 10_000
+
+# Longest wait between retries of a failing flush
+MAX_RETRY_SECONDS = 60
+
+
+class EventBuffer:
+    """
+    Per-process buffer of analytics_events rows
+
+    With flush_interval 0 the buffer is write-through: add() writes the rows
+    before returning (used for tests and single-threaded tools)
+    """
+
+    def __init__(self, engine, logger, batch_size=100, flush_interval=2.0):
+        self.engine = engine
+        self.logger = logger
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._rows = []
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+        self._failures = 0
+
+    def add(self, rows):
+        """
+        Queue rows (dicts of AnalyticsEvent columns) for the next batch
+
+        Returns:
+            int: Number of rows accepted
+        """
+        if not self.flush_interval or self._closed:
+            with self._condition:
+                self._rows.extend(rows)
+            self.flush()
+            return len(rows)
+
+        with self._condition:
+            self._rows.extend(rows)
+            if self._thread is None:
+                self._start()
+            if len(self._rows) >= self.batch_size:
+                self._condition.notify()
+        return len(rows)
+
+    def flush(self):
+        """
+        Write everything buffered so far in one transaction
+        On failure the rows go back to the front of the buffer for the next flush
+
+        Returns:
+            int: Number of rows written
+        """
+        with self._flush_lock:
+            with self._condition:
+                rows, self._rows = self._rows, []
+            if not rows:
+                return 0
+
+            try:
+                with self.engine.begin() as connection:
+                    connection.execute(insert(AnalyticsEvent), rows)
+                    add_to_rollups(connection, rows)
+            except Exception as e:
+                with self._condition:
+                    self._failures += 1
+                    self._rows[:0] = rows
+                    dropped = len(self._rows) - MAX_PENDING
+                    if dropped > 0:
+                        del self._rows[:dropped]
+                self.logger.error(f"Analytics flush of {len(rows)} events failed: {e}"
+                                  + (f" ({dropped} oldest dropped)" if dropped > 0 else ''))
+                return 0
+            self._failures = 0
+            return len(rows)
+
+    def close(self):
+        """Stop the flusher thread and write what is left (registered with atexit)"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def _start(self):
+        # Started on first use, so each forked gunicorn worker gets its own thread
+        self._thread = threading.Thread(target=self._run, name='analytics-flusher', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _retry_delay(self):
+        """Backoff after consecutive failed flushes: flush_interval, doubling, capped"""
+        return min(self.flush_interval * 2 ** (self._failures - 1), MAX_RETRY_SECONDS)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if self._failures:
+                    # A full buffer doesn't cut the backoff short - only close() does
+                    deadline = time.monotonic() + self._retry_delay()
+                    while not self._closed and time.monotonic() < deadline:
+                        self._condition.wait(deadline - time.monotonic())
+                elif not self._closed and len(self._rows) < self.batch_size:
+                    self._condition.wait(self.flush_interval)
+                if self._closed:
+                    return
+            self.flush()
+
+
+def init_event_buffer(app):
+    """Create the app's analytics buffer (reads ANALYTICS_BATCH_SIZE, ANALYTICS_FLUSH_INTERVAL)"""
+    with app.app_context():
+        app.extensions[EVENT_BUFFER] = EventBuffer(
+            db.engine,
+            app.logger,
+            batch_size=app.config.get('ANALYTICS_BATCH_SIZE', 100),
+            flush_interval=app.config.get('ANALYTICS_FLUSH_INTERVAL', 2.0)
+        )
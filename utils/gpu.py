@@ -0,0 +1,77 @@
+"""
+PiggyBankPC Leaderboard - GPU Classification
+Derive GPU brand and a normalized model key from the reported GPU model string
+Computed once at ingest and stored on the submission (indexed for filtering)
+"""
+
+import re
+
+
+# Brand patterns, checked in order (word boundaries so 'RX' doesn't match inside other words)
+GPU_BRAND_PATTERNS = [
+    ('NVIDIA', re.compile(r'\b(NVIDIA|GEFORCE|QUADRO|TESLA|TITAN)\b|\b(GTX|RTX)(\b|\d)')),
+    ('AMD', re.compile(r'\b(AMD|ATI|RADEON|VEGA)\b|\bRX\s?\d')),
+    ('Intel', re.compile(r'\b(INTEL|ARC|IRIS)\b')),
+]
+
+# Vendor and filler words dropped from the normalized model key
+GPU_KEY_STOPWORDS = {
+    'nvidia', 'geforce', 'amd', 'ati', 'radeon', 'intel', 'corporation', 'corp',
+    'graphics', 'series', 'gpu', 'tm', 'r', 'inc', 'technologies', 'advanced', 'micro', 'devices', 'with',
+}
+
+# Series prefixes sometimes written without a space ('RX6600' -> 'RX 6600')
+GPU_SERIES_PREFIX = re.compile(r'\b(rx|rtx|gtx|gt|hd)(?=\d)')
+
+# Leaderboard filter values -> stored brand
+GPU_BRAND_FILTERS = {
+    'nvidia': 'NVIDIA',
+    'amd': 'AMD',
+    'intel': 'Intel',
+}
+
+
+def detect_gpu_brand(gpu_model):
+    """
+    Detect GPU brand from model string
+
+    Args:
+        gpu_model: GPU model string (e.g. 'NVIDIA GeForce RTX 3060')
+
+    Returns:
+        str: 'NVIDIA', 'AMD', 'Intel' or 'Unknown'
+    """
+    if not gpu_model:
+        return 'Unknown'
+
+    model_upper = gpu_model.upper()
+    for brand, pattern in GPU_BRAND_PATTERNS:
+        if pattern.search(model_upper):
+            return brand
+
+    return 'Unknown'
+
+
+def normalize_gpu_model(gpu_model):
+    """
+    Build a normalized GPU model key for grouping identical cards
+
+    Examples:
+        'NVIDIA GeForce RTX 3060 Ti'  -> 'rtx-3060-ti'
+        'AMD Radeon RX 580 Series'    -> 'rx-580'
+        'Intel(R) Arc(TM) A770'       -> 'arc-a770'
+        'Radeon RX6600'               -> 'rx-6600'
+
+    Returns:
+        str: Model key, or None if the model is unknown
+    """
+    if not gpu_model or gpu_model == 'Unknown':
+        return None
+
+    tokens = re.findall(r'[a-z0-9]+', GPU_SERIES_PREFIX.sub(r'\1 ', gpu_model.lower()))
+    tokens = [token for token in tokens if token not in GPU_KEY_STOPWORDS]
+
+    if not tokens:
+        return None
+
+    return '-'.join(tokens)[:100]
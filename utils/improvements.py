@@ -7,22 +7,28 @@ from models import db, Improvement, Submission
 from utils.achievements import check_and_award_achievements
 
 
-def detect_improvement_opportunity(user_id, hardware_fingerprint):
+def detect_improvement_opportunity(user_id, hardware_fingerprint, before_submission_id=None):
     """
     Check if user has previous submissions with same hardware (improvement opportunity)
 
     Args:
         user_id: User ID
         hardware_fingerprint: Hardware fingerprint from new submission
+        before_submission_id: Only consider submissions older than this one
+                              (pass the new submission's id once it is saved)
 
     Returns:
         dict: Previous submission data if found, None otherwise
     """
-    previous = Submission.query.filter_by(
+    query = Submission.query.filter_by(
         user_id=user_id,
         hardware_fingerprint=hardware_fingerprint,
         verified=True
-    ).order_by(Submission.submission_date.desc()).first()
+    )
+    if before_submission_id is not None:
+        query = query.filter(Submission.id < before_submission_id)
+
+    previous = query.order_by(Submission.submission_date.desc()).first()
 
     if previous:
         return {
@@ -36,6 +42,7 @@ def detect_improvement_opportunity(user_id, hardware_fingerprint):
 def track_improvement(before_submission_id, after_submission, fixes_applied=None):
     """
     Create an improvement record linking before and after submissions
+    Adds to the session without committing - the caller commits the unit of work
 
     Args:
         before_submission_id: ID of previous submission
@@ -66,14 +73,14 @@ def track_improvement(before_submission_id, after_submission, fixes_applied=None
         fixes_applied=fixes_applied or []
     )
 
-    db.session.add(improvement)
-    db.session.commit()
-
     # Mark after submission as an improvement
     after_submission.is_improvement = True
     after_submission.improvement_percent = fps_gain_percent
     after_submission.parent_submission_id = before.id
-    db.session.commit()
+
+    # One flush writes both and assigns improvement.id for the achievements
+    db.session.add(improvement)
+    db.session.flush()
 
     # Check and award achievements
     check_and_award_achievements(improvement=improvement)
@@ -0,0 +1,201 @@
+"""
+PiggyBankPC Leaderboard - Background Job Queue
+A small job queue stored in the app database (no broker needed), consumed by
+worker.py processes. Jobs are retried with exponential backoff, and every job
+has an idempotency key so enqueueing the same work twice is harmless
+"""
+
+import traceback
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import update
+from models import db, Job
+
+
+# Job kind -> handler(payload); handlers add to the session without committing
+# (run_job commits their work together with the job status) and must be safe to re-run
+JOB_HANDLERS = {}
+
+# Retry backoff: 2, 4, 8, ... seconds, capped
+RETRY_BASE_SECONDS = 2
+RETRY_MAX_SECONDS = 300
+
+# A 'running' job whose worker has been silent this long is assumed dead and re-queued
+LOCK_TIMEOUT = timedelta(minutes=10)
+
+ACTIVE_STATUSES = ('pending', 'running')
+
+
+def job_handler(kind):
+    """Register a function as the handler for a job kind"""
+    def register(func):
+        JOB_HANDLERS[kind] = func
+        return func
+    return register
+
+
+def enqueue(kind, payload, idempotency_key, submission_id=None, max_attempts=5):
+    """
+    Add a job in the caller's transaction (the caller commits)
+
+    Args:
+        kind: Registered handler name
+        payload: JSON-serializable handler argument
+        idempotency_key: Unique key - if a job with this key exists, it is returned instead
+        submission_id: Submission the job belongs to, if any
+
+    Returns:
+        Job: New or existing job
+    """
+    existing = Job.query.filter_by(idempotency_key=idempotency_key).first()
+    if existing:
+        return existing
+
+    job = Job(
+        kind=kind,
+        payload=payload,
+        idempotency_key=idempotency_key,
+        submission_id=submission_id,
+        max_attempts=max_attempts
+    )
+    db.session.add(job)
+    return job
+
+
+def has_active_jobs(submission_id):
+    """True while a submission still has pending or running jobs"""
+    return db.session.query(
+        Job.query.filter(
+            Job.submission_id == submission_id,
+            Job.status.in_(ACTIVE_STATUSES)
+        ).exists()
+    ).scalar()
+
+
+def has_failed_jobs(submission_id):
+    """True if any of a submission's jobs gave up after its last attempt"""
+    return db.session.query(
+        Job.query.filter(
+            Job.submission_id == submission_id,
+            Job.status == 'failed'
+        ).exists()
+    ).scalar()
+
+
+def release_stale_jobs():
+    """Put jobs locked by workers that died back in the queue"""
+    cutoff = datetime.utcnow() - LOCK_TIMEOUT
+    result = db.session.execute(
+        update(Job).where(
+            Job.status == 'running',
+            Job.locked_at < cutoff
+        ).values(status='pending', locked_by=None, locked_at=None)
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+def claim_job(worker_id):
+    """
+    Atomically claim the next due job
+
+    The conditional UPDATE only succeeds for one worker - SQLite serializes writers,
+    so a job can never be claimed twice.
+
+    Returns:
+        Job: Claimed job, or None if the queue is empty
+    """
+    while True:
+        now = datetime.utcnow()
+        candidate = db.session.query(Job.id).filter(
+            Job.status == 'pending',
+            Job.run_after <= now
+        ).order_by(Job.run_after, Job.id).limit(1).scalar()
+
+        if candidate is None:
+            db.session.commit()
+            return None
+
+        result = db.session.execute(
+            update(Job).where(
+                Job.id == candidate,
+                Job.status == 'pending'
+            ).values(
+                status='running',
+                locked_by=worker_id,
+                locked_at=now,
+                attempts=Job.attempts + 1
+            )
+        )
+        db.session.commit()
+
+        if result.rowcount == 1:
+            return db.session.get(Job, candidate)
+        # Another worker got it first - try the next one
+
+
+def retry_delay(attempts):
+    """Backoff before the next attempt"""
+    return timedelta(seconds=min(RETRY_BASE_SECONDS ** attempts, RETRY_MAX_SECONDS))
+
+
+def run_job(job):
+    """
+    Run a claimed job and record the outcome
+
+    Returns:
+        bool: True if the job succeeded
+    """
+    job_id = job.id
+    handler = JOB_HANDLERS.get(job.kind)
+
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for job kind '{job.kind}'")
+        handler(job.payload or {})
+
+        # The handler's writes and the job's completion commit together - one
+        # transaction, so a crash either keeps all of it or none of it
+        job.status = 'done'
+        job.finished_at = datetime.utcnow()
+        job.locked_by = None
+        job.locked_at = None
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        job = db.session.get(Job, job_id)
+        job.last_error = f"{e}\n{traceback.format_exc()}"[-4000:]
+        job.locked_by = None
+        job.locked_at = None
+
+        if job.attempts >= job.max_attempts:
+            job.status = 'failed'
+            job.finished_at = datetime.utcnow()
+            current_app.logger.error(f"Job {job_id} ({job.kind}) failed permanently: {e}")
+        else:
+            job.status = 'pending'
+            job.run_after = datetime.utcnow() + retry_delay(job.attempts)
+            current_app.logger.warning(f"Job {job_id} ({job.kind}) failed, attempt {job.attempts}: {e}")
+
+        db.session.commit()
+        return False
+
+    return True
+
+
+def run_pending_jobs(worker_id='inline', limit=None):
+    """
+    Run due jobs until the queue is empty (or `limit` jobs have run)
+
+    Returns:
+        int: Number of jobs run
+    """
+    count = 0
+    while limit is None or count < limit:
+        job = claim_job(worker_id)
+        if job is None:
+            break
+        run_job(job)
+        count += 1
+    return count
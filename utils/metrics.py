@@ -0,0 +1,41 @@
+"""
+PiggyBankPC Leaderboard - Derived Performance Metrics
+Stored on each submission (indexed) so pages can ORDER BY them in SQL
+"""
+
+
+def calculate_price_per_fps(fps_avg, gpu_price):
+    """
+    Calculate price-per-FPS performance metric
+
+    Returns:
+        float: GPU price per average FPS, or None if either is missing/zero
+    """
+    if fps_avg and gpu_price and fps_avg > 0:
+        return round(gpu_price / fps_avg, 2)
+    return None
+
+
+def calculate_all_rounder_score(fps_avg, ai_tokens_per_sec):
+    """
+    Calculate All-Rounder Score - balanced performance for gaming + AI
+    Combines FPS (gaming) and Tokens/sec (AI) into a single score
+
+    Formula: (FPS_normalized + Tokens_normalized) / 2
+    - Normalizes FPS to 0-100 scale (60 FPS = baseline, 120+ = max)
+    - Normalizes Tokens/sec to 0-100 scale (10 t/s = baseline, 50+ = max)
+    - Returns average of both for balanced score
+    """
+    if not fps_avg or not ai_tokens_per_sec:
+        return None
+
+    # Normalize FPS (60 = baseline, 120+ = excellent)
+    fps_normalized = min(100, (fps_avg / 120) * 100)
+
+    # Normalize Tokens/sec (10 = baseline, 50+ = excellent)
+    tokens_normalized = min(100, (ai_tokens_per_sec / 50) * 100)
+
+    # Average of both (0-100 scale)
+    score = (fps_normalized + tokens_normalized) / 2
+
+    return round(score, 1)
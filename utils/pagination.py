@@ -0,0 +1,201 @@
+"""
+PiggyBankPC Leaderboard - Keyset (Cursor) Pagination
+Pages through ordered listings with WHERE (sort, date, id) < (cursor) instead
+of OFFSET, so page 1000 costs the same index seek as page 1
+"""
+
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, Integer, Numeric, String, and_, asc, desc, or_, tuple_
+
+
+def encode_cursor(payload):
+    """Encode a cursor payload as an opaque URL-safe token"""
+    raw = json.dumps(payload, separators=(',', ':'), default=_encode_value).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    Decode a cursor token
+
+    Returns:
+        dict: Cursor payload, or None if the token is missing or malformed
+    """
+    if not token:
+        return None
+
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(raw)
+    except (ValueError, TypeError):
+        return None
+
+    if not isinstance(payload, dict) or not isinstance(payload.get('k'), list):
+        return None
+    return payload
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value).__name__} in cursor")
+
+
+def _decode_keys(columns, values, nullable=False):
+    """
+    Convert JSON cursor values back to the column types
+
+    Raises:
+        TypeError, ValueError: A value that doesn't fit its column (tampered cursor)
+    """
+    keys = []
+    for position, (column, value) in enumerate(zip(columns, values)):
+        if value is None:
+            if not (nullable and position == 0):
+                raise ValueError(f"Cursor key for {column} is NULL")
+            keys.append(value)
+            continue
+        if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+            raise TypeError(f"Cursor key for {column} is not a scalar")
+        if isinstance(column.type, DateTime):
+            if not isinstance(value, str):
+                raise TypeError(f"Cursor key for {column} is not a timestamp")
+            value = datetime.fromisoformat(value)
+        elif isinstance(column.type, (Integer, Float, Numeric)) and isinstance(value, str):
+            raise TypeError(f"Cursor key for {column} is not a number")
+        elif isinstance(column.type, String) and not isinstance(value, str):
+            raise TypeError(f"Cursor key for {column} is not a string")
+        keys.append(value)
+    return keys
+
+
+def _decode_position(value):
+    """Rank carried by a cursor - a non-negative int"""
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        raise ValueError("Cursor position is not a non-negative integer")
+    return value
+
+
+def _beyond(columns, keys, descending, nullable):
+    """
+    Filter for rows past the cursor keys in the walk direction
+
+    With `nullable`, the first column may be NULL and NULL sorts as its lowest
+    value - SQLite's own order, so the index still serves the ORDER BY
+    """
+    key_tuple = tuple_(*columns)
+    cursor_tuple = tuple_(*keys)
+    beyond = key_tuple < cursor_tuple if descending else key_tuple > cursor_tuple
+    if not nullable:
+        return beyond
+
+    first, rest, rest_keys = columns[0], tuple_(*columns[1:]), tuple_(*keys[1:])
+    if keys[0] is None:
+        # Inside the NULL block: compare the remaining keys, and walking up leaves it
+        within = and_(first.is_(None), rest < rest_keys if descending else rest > rest_keys)
+        return within if descending else or_(first.isnot(None), within)
+    # Past the values: walking down ends in the NULL block
+    return or_(beyond, first.is_(None)) if descending else beyond
+
+
+class KeysetPagination:
+    """
+    Cursor-based pagination over a query ordered by unique key columns
+
+    Args:
+        query: Base query (filters applied, no ORDER BY)
+        columns: Key columns, most significant first - must be unique together
+                 and non-NULL (e.g. sort value, submission_date, id)
+        descending: Sort direction for all key columns
+        nullable: The first key column may be NULL (NULLs sort lowest: last when
+                  descending, first when ascending)
+        cursor: Opaque cursor token from a previous page (None = first page)
+        per_page: Items per page
+        total: Total item count if already known (e.g. from cached stats)
+
+    The page is fetched with one LIMIT per_page + 1 query; the extra row tells us
+    whether there is another page, so no COUNT(*) is needed.
+    """
+
+    def __init__(self, query, columns, descending=True, cursor=None, per_page=20, total=None, nullable=False):
+        self.columns = list(columns)
+        self.descending = descending
+        self.per_page = per_page
+        self.total = total
+
+        # A cursor that doesn't decode cleanly (stale or tampered) means page 1
+        payload = decode_cursor(cursor)
+        keys = None
+        position = 0
+        if payload and len(payload['k']) == len(self.columns):
+            try:
+                keys = _decode_keys(self.columns, payload['k'], nullable)
+                position = _decode_position(payload.get('n', 0))
+            except (TypeError, ValueError):
+                keys = None
+                position = 0
+
+        backwards = bool(keys) and payload.get('d') == 'prev'
+
+        # Walking backwards flips the comparison and the ORDER BY, then the page is reversed
+        walk_descending = descending != backwards
+        order = desc if walk_descending else asc
+
+        query = query.order_by(None)
+        if keys:
+            query = query.filter(_beyond(self.columns, keys, walk_descending, nullable))
+
+        rows = query.add_columns(*self.columns).order_by(
+            *[order(column) for column in self.columns]
+        ).limit(per_page + 1).all()
+
+        more = len(rows) > per_page
+        rows = rows[:per_page]
+        if backwards:
+            rows.reverse()
+
+        self.items = [row[0] for row in rows]
+        self._keys = [list(row[1:]) for row in rows]
+
+        if backwards:
+            # position = rank of the first item on the page we came back from
+            self.first = max(position - len(self.items), 1)
+            self.has_prev = more
+            self.has_next = True
+        else:
+            # position = rank of the last item on the previous page
+            self.first = position + 1
+            self.has_prev = bool(keys)
+            self.has_next = more
+
+    def __iter__(self):
+        return iter(self.items)
+
+    @property
+    def last(self):
+        """Rank of the last item on this page"""
+        return self.first + len(self.items) - 1
+
+    @property
+    def next_cursor(self):
+        """Cursor for the page after this one (None on the last page)"""
+        if not self.has_next or not self.items:
+            return None
+        return encode_cursor({'k': self._keys[-1], 'n': self.last, 'd': 'next'})
+
+    @property
+    def prev_cursor(self):
+        """Cursor for the page before this one (None on the first page)"""
+        if not self.has_prev or not self.items:
+            return None
+        return encode_cursor({'k': self._keys[0], 'n': self.first, 'd': 'prev'})
+
+    @property
+    def pages(self):
+        """Total number of pages, if the total is known"""
+        if not self.total:
+            return 0
+        return (self.total + self.per_page - 1) // self.per_page
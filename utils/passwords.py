@@ -0,0 +1,131 @@
+"""
+PiggyBankPC Leaderboard - Password Hashing
+Password hashes are deliberately slow (~100ms of CPU each). Running them in the
+web worker lets a burst of logins take every core away from page views, so they
+run in a small per-worker process pool instead: at most PASSWORD_HASH_WORKERS
+at a time per web worker, at a lower CPU priority (PASSWORD_HASH_NICE) so the
+scheduler serves page views first.
+
+The cost profile is PASSWORD_HASH_METHOD (a werkzeug method string). Hashes
+made with any other method are upgraded the next time their owner logs in
+"""
+
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from flask import current_app, has_app_context
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+# app.extensions key for the app's hasher
+PASSWORD_HASHER = 'password_hasher'
+
+# Method used outside an app (werkzeug's own default)
+DEFAULT_METHOD = 'scrypt:32768:8:1'
+
+
+def _lower_priority(nice):
+    os.nice(nice)
+
+
+def _verify(pwhash, password, method):
+    """Check a password, and rehash it if its hash is not in the current profile"""
+    if not check_password_hash(pwhash, password):
+        return False, None
+    if hash_method(pwhash) != method:
+        return True, generate_password_hash(password, method=method)
+    return True, None
+
+
+def hash_token(token):
+    """
+    Stored form of an emailed token (verification, password reset)
+    Tokens are random, so a plain SHA-256 is enough - no slow hash, no pool -
+    and, unlike a salted hash, the column can be indexed and looked up directly
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def hash_method(pwhash):
+    """Cost profile a hash was made with, e.g. 'pbkdf2:sha256:600000'"""
+    return pwhash.split('$', 1)[0]
+
+
+class PasswordHasher:
+    """
+    Hashes and verifies passwords in a bounded process pool
+
+    With workers 0 the work runs in the calling process (tests and scripts)
+    """
+
+    def __init__(self, method=DEFAULT_METHOD, workers=2, nice=5):
+        self.method = method
+        self.workers = workers
+        self.nice = nice
+        self._pool = None
+        self._pool_pid = None
+        self._lock = threading.Lock()
+
+    def hash(self, password):
+        """Hash a password with the current cost profile"""
+        return self._run(generate_password_hash, password, method=self.method)
+
+    def verify(self, pwhash, password):
+        """
+        Check a password against its hash
+
+        Returns:
+            tuple: (matches, new hash to store if the old one needs upgrading, else None)
+        """
+        return self._run(_verify, pwhash, password, self.method)
+
+    def _run(self, func, *args, **kwargs):
+        if not self.workers:
+            return func(*args, **kwargs)
+        try:
+            return self._executor().submit(func, *args, **kwargs).result()
+        except BrokenProcessPool:
+            # A pool process died (OOM kill...) - start a new pool next time, hash here now
+            with self._lock:
+                self._pool = None
+            return func(*args, **kwargs)
+
+    def _executor(self):
+        # Created on first use, and again in a forked child - a pool can't cross a fork.
+        # Its processes are spawned, not forked: the web worker has threads and open connections
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_lower_priority,
+                    initargs=(self.nice,)
+                )
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None and self._pool_pid == os.getpid():
+                self._pool.shutdown()
+            self._pool = None
+
+
+def get_hasher():
+    """The current app's hasher (an in-process default outside an app)"""
+    if has_app_context() and PASSWORD_HASHER in current_app.extensions:
+        return current_app.extensions[PASSWORD_HASHER]
+    return PasswordHasher(workers=0)
+
+
+def init_password_hasher(app):
+    """Create the app's hasher (reads PASSWORD_HASH_METHOD, PASSWORD_HASH_WORKERS, PASSWORD_HASH_NICE)"""
+    app.extensions[PASSWORD_HASHER] = PasswordHasher(
+        method=app.config.get('PASSWORD_HASH_METHOD', DEFAULT_METHOD),
+        workers=app.config.get('PASSWORD_HASH_WORKERS', 2),
+        nice=app.config.get('PASSWORD_HASH_NICE', 5)
+    )
@@ -0,0 +1,103 @@
+"""
+PiggyBankPC Leaderboard - Post-Upload Submission Pipeline
+Diagnostics, improvement tracking and achievements for a new submission, run
+as one background job so the upload request only verifies, inserts and enqueues.
+All stages add to one unit of work; the job runner commits it once
+"""
+
+from flask import current_app
+from models import db, Submission, DiagnosticIssue, Improvement
+from utils.jobs import JOB_HANDLERS, enqueue, job_handler
+from utils.diagnostics import analyze_submission
+from utils.improvements import track_improvement, detect_fixes_from_diagnostics, detect_improvement_opportunity
+from utils.achievements import check_and_award_achievements
+
+
+# Stages run for a community upload, in order
+SUBMISSION_PIPELINE = ('analyze_submission', 'track_improvement', 'award_achievements')
+
+
+def enqueue_submission_pipeline(submission, stages=SUBMISSION_PIPELINE):
+    """
+    Queue the post-upload stages for a submission as a single job (the caller commits)
+    The idempotency key is 'process_submission:<submission id>', so it is queued at most once
+    """
+    return enqueue(
+        'process_submission',
+        {'submission_id': submission.id, 'stages': list(stages)},
+        idempotency_key=f"process_submission:{submission.id}",
+        submission_id=submission.id
+    )
+
+
+@job_handler('process_submission')
+def process_submission(payload):
+    """Run the requested stages in order, in one transaction"""
+    for stage in payload.get('stages', SUBMISSION_PIPELINE):
+        JOB_HANDLERS[stage](payload)
+
+
+@job_handler('analyze_submission')
+def run_analysis(payload):
+    """Detect diagnostic issues (skipped if this submission was already analyzed)"""
+    submission = db.session.get(Submission, payload['submission_id'])
+    if submission is None:
+        return
+
+    if DiagnosticIssue.query.filter_by(submission_id=submission.id).first():
+        return
+
+    issues = analyze_submission(submission)
+    current_app.logger.info(f"Diagnostic analysis complete for submission {submission.id}: {len(issues)} issues detected")
+
+
+@job_handler('track_improvement')
+def run_improvement_tracking(payload):
+    """Link a re-submission of the same hardware to the previous one and award improvement achievements"""
+    submission = db.session.get(Submission, payload['submission_id'])
+    if submission is None:
+        return
+
+    improvement = Improvement.query.filter_by(after_submission_id=submission.id).first()
+    if improvement:
+        # Tracked on an earlier attempt - finish what that attempt may not have
+        if not submission.is_improvement:
+            submission.is_improvement = True
+            submission.improvement_percent = improvement.fps_gain_percent
+            submission.parent_submission_id = improvement.before_submission_id
+        check_and_award_achievements(improvement=improvement)
+        return
+
+    previous = detect_improvement_opportunity(
+        submission.user_id,
+        submission.hardware_fingerprint,
+        before_submission_id=submission.id
+    )
+    if not previous:
+        return
+
+    current_app.logger.info(f"Detected re-submission for user {submission.user_id}")
+
+    # Auto-detect which fixes were applied from the previous submission's issues
+    before_issues = DiagnosticIssue.query.filter_by(submission_id=previous['id']).all()
+    fixes = detect_fixes_from_diagnostics(before_issues, submission)
+
+    # Also awards the improvement-based achievements
+    improvement = track_improvement(
+        before_submission_id=previous['id'],
+        after_submission=submission,
+        fixes_applied=fixes
+    )
+
+    if improvement:
+        current_app.logger.info(f"Improvement tracked: +{improvement.fps_gain:.1f} FPS")
+
+
+@job_handler('award_achievements')
+def run_achievements(payload):
+    """Award submission-based achievements (first submission, dedicated tuner)"""
+    submission = db.session.get(Submission, payload['submission_id'])
+    if submission is None:
+        return
+
+    check_and_award_achievements(user_id=submission.user_id)
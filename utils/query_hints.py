@@ -0,0 +1,33 @@
+"""
+PiggyBankPC Leaderboard - Query Planner Hints
+Dialect-aware hints that keep SQLite on the composite leaderboard indexes
+"""
+
+from sqlalchemy import Boolean
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+
+class likely(FunctionElement):
+    """
+    Mark a filter as matching most rows
+
+    On SQLite this renders as likely(<filter>), which stops the planner from
+    driving the query off a range index (e.g. submission_date >= week_ago) and
+    then sorting the result in a temp B-tree. The filter is still applied, just
+    while walking the index that already provides the ORDER BY. Other
+    databases get the plain filter.
+    """
+    type = Boolean()
+    name = 'likely'
+    inherit_cache = True
+
+
+@compiles(likely)
+def _compile_likely(element, compiler, **kw):
+    return compiler.process(element.clauses, **kw)
+
+
+@compiles(likely, 'sqlite')
+def _compile_likely_sqlite(element, compiler, **kw):
+    return f"likely({compiler.process(element.clauses, **kw)})"
@@ -0,0 +1,261 @@
+"""
+PiggyBankPC Leaderboard - Materialized Rankings
+Maintains the leaderboard_rank table incrementally so leaderboard pages and
+rank lookups are indexed point reads instead of scans over submissions
+"""
+
+from sqlalchemy import and_, or_, func, insert
+from models import db, ConfigurationResult, LeaderboardRank, Submission
+
+
+# Category key covering every published submission
+ALL_CATEGORY = 'all'
+
+
+def category_key(resolution, quality):
+    """
+    Build the category key used by the leaderboard
+
+    Returns:
+        str: e.g. '1920x1080_High', or None if resolution/quality missing
+    """
+    if not resolution or not quality:
+        return None
+    return f"{resolution}_{quality}"
+
+
+def is_rankable(submission):
+    """Only verified, published submissions with an FPS result are ranked"""
+    return bool(submission.verified and submission.published and submission.fps_avg is not None)
+
+
+def submission_categories(submission):
+    """
+    Get the categories a submission is ranked in, with the FPS it is ranked by
+    Overall by its headline FPS, per category by that configuration's result
+
+    Returns:
+        dict: {category key: fps_avg}
+    """
+    categories = {ALL_CATEGORY: submission.fps_avg}
+    for result in submission.configuration_results:
+        categories[category_key(result.resolution, result.quality)] = result.fps_avg
+    return categories
+
+
+def _ranked_ahead(fps_avg, submission_date, submission_id):
+    """
+    Filter for entries that sort ahead of the given sort keys
+    Ordering matches the leaderboard: FPS desc, newest first, then ID desc
+    """
+    return or_(
+        LeaderboardRank.fps_avg > fps_avg,
+        and_(
+            LeaderboardRank.fps_avg == fps_avg,
+            or_(
+                LeaderboardRank.submission_date > submission_date,
+                and_(
+                    LeaderboardRank.submission_date == submission_date,
+                    LeaderboardRank.submission_id > submission_id
+                )
+            )
+        )
+    )
+
+
+def _insert_entry(category, submission, fps_avg):
+    """Insert a submission into a category, shifting lower entries down one place"""
+    rank = LeaderboardRank.query.filter(
+        LeaderboardRank.category == category,
+        _ranked_ahead(fps_avg, submission.submission_date, submission.id)
+    ).count() + 1
+
+    LeaderboardRank.query.filter(
+        LeaderboardRank.category == category,
+        LeaderboardRank.rank >= rank
+    ).update({LeaderboardRank.rank: LeaderboardRank.rank + 1}, synchronize_session=False)
+
+    db.session.add(LeaderboardRank(
+        category=category,
+        submission_id=submission.id,
+        user_id=submission.user_id,
+        rank=rank,
+        fps_avg=fps_avg,
+        ai_tokens_per_sec=submission.ai_tokens_per_sec,
+        submission_date=submission.submission_date
+    ))
+    db.session.flush()
+
+
+def _remove_entry(entry):
+    """Remove a ranking entry, shifting lower entries up one place"""
+    category = entry.category
+    rank = entry.rank
+
+    db.session.delete(entry)
+    db.session.flush()
+
+    LeaderboardRank.query.filter(
+        LeaderboardRank.category == category,
+        LeaderboardRank.rank > rank
+    ).update({LeaderboardRank.rank: LeaderboardRank.rank - 1}, synchronize_session=False)
+
+
+def remove_submission_rank(submission):
+    """
+    Remove a submission from every leaderboard it is ranked in
+    Call before deleting or unpublishing a submission (caller commits)
+
+    Args:
+        submission: Submission object
+    """
+    entries = LeaderboardRank.query.filter_by(submission_id=submission.id).all()
+    for entry in entries:
+        _remove_entry(entry)
+
+
+def sync_submission_rank(submission):
+    """
+    Bring a submission's ranking entries in line with its current state
+    Call after inserting, publishing or editing a submission (caller commits);
+    entries that already match are left alone
+
+    Args:
+        submission: Submission object (must already be flushed)
+    """
+    db.session.flush()
+
+    wanted = submission_categories(submission) if is_rankable(submission) else {}
+    entries = LeaderboardRank.query.filter_by(submission_id=submission.id).all()
+
+    # Already ranked with the same sort keys (e.g. only the title changed) - nothing moves
+    sort_keys = (submission.user_id, submission.ai_tokens_per_sec, submission.submission_date)
+    if {entry.category: (entry.fps_avg, entry.user_id, entry.ai_tokens_per_sec, entry.submission_date)
+            for entry in entries} == {category: (fps_avg, *sort_keys) for category, fps_avg in wanted.items()}:
+        return
+
+    for entry in entries:
+        _remove_entry(entry)
+    for category, fps_avg in wanted.items():
+        _insert_entry(category, submission, fps_avg)
+
+
+def rebuild_rankings():
+    """
+    Rebuild the whole leaderboard_rank table from submissions and their
+    per-category configuration results
+    Used to backfill existing data (caller commits)
+
+    Returns:
+        int: Number of ranking entries written
+    """
+    LeaderboardRank.query.delete(synchronize_session=False)
+
+    rankable = (
+        Submission.verified == True,
+        Submission.published == True,
+        Submission.fps_avg.isnot(None)
+    )
+
+    overall = db.session.query(
+        Submission.id,
+        Submission.user_id,
+        Submission.fps_avg,
+        Submission.ai_tokens_per_sec,
+        Submission.submission_date
+    ).filter(*rankable).order_by(
+        Submission.fps_avg.desc(),
+        Submission.submission_date.desc(),
+        Submission.id.desc()
+    )
+
+    per_category = db.session.query(
+        Submission.id,
+        Submission.user_id,
+        ConfigurationResult.fps_avg,
+        Submission.ai_tokens_per_sec,
+        Submission.submission_date,
+        ConfigurationResult.resolution,
+        ConfigurationResult.quality
+    ).join(
+        ConfigurationResult, ConfigurationResult.submission_id == Submission.id
+    ).filter(*rankable).order_by(
+        ConfigurationResult.fps_avg.desc(),
+        Submission.submission_date.desc(),
+        Submission.id.desc()
+    )
+
+    rows = []
+    positions = {}
+
+    def add_row(category, sub):
+        positions[category] = positions.get(category, 0) + 1
+        rows.append({
+            'category': category,
+            'submission_id': sub.id,
+            'user_id': sub.user_id,
+            'rank': positions[category],
+            'fps_avg': sub.fps_avg,
+            'ai_tokens_per_sec': sub.ai_tokens_per_sec,
+            'submission_date': sub.submission_date
+        })
+
+    for sub in overall:
+        add_row(ALL_CATEGORY, sub)
+    for sub in per_category:
+        add_row(category_key(sub.resolution, sub.quality), sub)
+
+    if rows:
+        db.session.execute(insert(LeaderboardRank), rows)
+
+    return len(rows)
+
+
+def category_size(category):
+    """
+    Number of ranked submissions in a category
+    Read as MAX(rank) so SQLite answers it from the (category, rank) index
+    """
+    return db.session.query(func.max(LeaderboardRank.rank)).filter(
+        LeaderboardRank.category == category
+    ).scalar() or 0
+
+
+def rank_percentile(rank, total):
+    """
+    Percentile of a position within a category (100 = top of category)
+    Derived when read rather than stored, so a rank change only touches the
+    entries that actually moved
+
+    Args:
+        rank: Position (1 = best)
+        total: Category size, from category_size()
+
+    Returns:
+        float: Percentile rounded to one decimal, or None for an empty category
+    """
+    if not total:
+        return None
+    return round(100.0 * (total - rank + 1) / total, 1)
+
+
+def get_rank_entry(submission_id, category=ALL_CATEGORY):
+    """
+    Get the ranking entry for a submission
+
+    Returns:
+        LeaderboardRank: Entry, or None if the submission is not ranked
+    """
+    return db.session.get(LeaderboardRank, (category, submission_id))
+
+
+def ranked_submissions(category=ALL_CATEGORY):
+    """
+    Query the submissions ranked in a category, joined to their rank entry
+    Callers order/page by LeaderboardRank.rank, which walks the (category, rank) index
+    """
+    return Submission.query.join(
+        LeaderboardRank, LeaderboardRank.submission_id == Submission.id
+    ).filter(
+        LeaderboardRank.category == category
+    )
@@ -0,0 +1,227 @@
+"""
+PiggyBankPC Leaderboard - Benchmark Results Extraction
+One declarative table maps a verified results package onto Submission columns.
+The package's sections are located once, then the table is applied in a single
+pass - shared by the upload routes and the bulk importer. Multi-configuration
+uploads also yield one ConfigurationResult per valid category
+"""
+
+from flask import current_app
+from models import ConfigurationResult
+from utils.categories import is_valid_category
+
+
+def format_clock_speed(max_mhz):
+    """'4400' -> '4.40 GHz', '800' -> '800.0 MHz'"""
+    if not max_mhz:
+        return None
+    try:
+        mhz_value = float(max_mhz)
+    except (ValueError, TypeError):
+        return str(max_mhz)
+    if mhz_value >= 1000:
+        return f"{mhz_value / 1000:.2f} GHz"
+    return f"{mhz_value} MHz"
+
+
+def parse_ram_speed(speed):
+    """'2666 MT/s' -> 2666"""
+    if not speed or not isinstance(speed, str):
+        return None
+    try:
+        return int(speed.split()[0])
+    except (ValueError, IndexError):
+        return None
+
+
+# Sections of a results package (located once per package by _locate_sections):
+#   package     - the verified data package (version, timestamp, fingerprint)
+#   system      - results.system_info; cpu / gpu / ram are its sub-dicts
+#   run         - the FPS run: the fastest of results.fps.configurations (in a
+#                 valid category, if any is), or results.fps itself for the
+#                 legacy single-run format
+#   configuration - the run again, only when it came from configurations (the
+#                 legacy format's resolution/quality were never trusted)
+#   thermal     - run.thermal_metrics
+#   gpu_metrics - results.fps.gpu_metrics (sampled by the Phase 2 client)
+#   ai          - results.ai
+#   geekbench / sysbench - results.cpu, by benchmark_type
+# The FPS, AI and CPU sections only exist when that benchmark completed.
+#
+# (column, sources, default, convert): the first source whose section has the key
+# wins; the default applies when a source section exists but none has the key, and
+# the column stays None when no source section exists at all. Converters map a
+# missing value (None) to None
+FIELDS = (
+    ('hardware_fingerprint', (('package', 'hardware_fingerprint'),), '', None),
+    ('benchmark_version', (('package', 'version'),), '1.0.0', None),
+    ('benchmark_timestamp', (('package', 'timestamp'),), '', None),
+
+    ('cpu_model', (('cpu', 'model'),), 'Unknown', None),
+    ('cpu_cores', (('cpu', 'cores'),), None, None),
+    ('cpu_threads', (('cpu', 'threads'),), None, None),
+    ('cpu_clock_speed', (('cpu', 'max_mhz'),), None, format_clock_speed),
+    ('gpu_model', (('gpu', 'model'),), 'Unknown', None),
+    ('gpu_price', (('system', 'gpu_price'),), 0.0, None),
+    ('ram_total', (('ram', 'total'),), 'Unknown', None),
+    ('ram_type', (('ram', 'type'),), None, None),
+    ('ram_speed_mhz', (('ram', 'speed'),), None, parse_ram_speed),
+
+    ('fps_avg', (('run', 'average_fps'),), 0.0, None),
+    ('fps_min', (('run', 'min_fps'),), 0.0, None),
+    ('fps_max', (('run', 'max_fps'),), 0.0, None),
+    ('fps_resolution', (('configuration', 'resolution'),), '', None),
+    ('fps_quality', (('configuration', 'quality'),), '', None),
+
+    # Per-run thermal metrics first; the Phase 2 gpu_metrics only fill in what they lack
+    ('gpu_temp_min', (('thermal', 'gpu_temp_min'),), None, None),
+    ('gpu_temp_avg', (('thermal', 'gpu_temp_avg'), ('gpu_metrics', 'temp_avg')), None, None),
+    ('gpu_temp_max', (('thermal', 'gpu_temp_max'), ('gpu_metrics', 'temp_max')), None, None),
+    ('gpu_util_min', (('thermal', 'gpu_util_min'),), None, None),
+    ('gpu_util_avg', (('thermal', 'gpu_util_avg'),), None, None),
+    ('gpu_util_max', (('thermal', 'gpu_util_max'),), None, None),
+    ('gpu_load_avg', (('gpu_metrics', 'load_avg'),), None, None),
+    ('cpu_temp_min', (('thermal', 'cpu_temp_min'),), None, None),
+    ('cpu_temp_avg', (('thermal', 'cpu_temp_avg'),), None, None),
+    ('cpu_temp_max', (('thermal', 'cpu_temp_max'),), None, None),
+    ('cpu_util_min', (('thermal', 'cpu_util_min'),), None, None),
+    ('cpu_util_avg', (('thermal', 'cpu_util_avg'),), None, None),
+    ('cpu_util_max', (('thermal', 'cpu_util_max'),), None, None),
+
+    ('ai_tokens_per_sec', (('ai', 'tokens_per_second'),), 0.0, None),
+    ('cpu_score', (('geekbench', 'multi_core_score'), ('sysbench', 'events_per_second')), 0.0, None),
+)
+
+
+class SubmissionRecord:
+    """Extracted submission columns - one slot per FIELDS entry"""
+
+    __slots__ = tuple(column for column, _, _, _ in FIELDS)
+
+    def as_dict(self):
+        """The column values, ready for Submission(**record.as_dict())"""
+        return {column: getattr(self, column) for column in self.__slots__}
+
+
+def _best_configuration(configurations):
+    """
+    The configuration with the highest average FPS (None if none ran above 0)
+    Runs in a valid leaderboard category win over any that aren't
+    """
+    best_config = None
+    best_key = (False, 0)
+    for config_data in configurations.values():
+        fps = config_data.get('average_fps', 0)
+        if fps > 0:
+            key = (is_valid_category(config_data.get('resolution'), config_data.get('quality')), fps)
+            if key > best_key:
+                best_key = key
+                best_config = config_data
+    return best_config
+
+
+def _locate_sections(package):
+    """Find every section FIELDS reads from, in one walk of the package"""
+    results = package.get('results', {})
+    system_info = results.get('system_info', {})
+    fps_data = results.get('fps', {})
+    ai_data = results.get('ai', {})
+    cpu_data = results.get('cpu', {})
+
+    sections = {
+        'package': package,
+        'system': system_info,
+        'cpu': system_info.get('cpu', {}),
+        'gpu': system_info.get('gpu', {}),
+        'ram': system_info.get('ram', {}),
+        'gpu_metrics': fps_data.get('gpu_metrics') or None,
+    }
+
+    if fps_data.get('status') == 'completed':
+        if fps_data.get('configurations'):
+            run = _best_configuration(fps_data['configurations'])
+            sections['configuration'] = run
+        else:
+            run = fps_data
+        if run is not None:
+            sections['run'] = run
+            sections['thermal'] = run.get('thermal_metrics') or None
+
+    if ai_data.get('status') == 'completed':
+        sections['ai'] = ai_data
+
+    if cpu_data.get('status') == 'completed':
+        kind = 'geekbench' if cpu_data.get('benchmark_type') == 'geekbench' else 'sysbench'
+        sections[kind] = cpu_data
+
+    return sections
+
+
+def _extract(sections):
+    """Apply FIELDS to the located sections"""
+    record = SubmissionRecord()
+    for column, sources, default, convert in FIELDS:
+        value = None
+        for name, key in sources:
+            section = sections.get(name)
+            if section is None:
+                continue
+            if key in section:
+                value = section[key]
+                break
+            value = default
+        setattr(record, column, convert(value) if convert is not None else value)
+    return record
+
+
+def extract_submission_data(validated_results):
+    """
+    Extract submission data from validated results
+
+    Args:
+        validated_results: Validated benchmark results from security module
+
+    Returns:
+        SubmissionRecord: Extracted columns, or None if the package is malformed
+    """
+    try:
+        return _extract(_locate_sections(validated_results))
+
+    except Exception as e:
+        current_app.logger.error(f"Failed to extract submission data: {str(e)}")
+        return None
+
+
+def extract_configuration_results(validated_results):
+    """
+    Per-category FPS results of a multi-configuration upload
+    Only runs in valid leaderboard categories are kept (the fastest, if a category
+    was run twice); legacy single-run files have none
+
+    Args:
+        validated_results: Validated benchmark results from security module
+
+    Returns:
+        list: Unsaved ConfigurationResult objects
+    """
+    fps_data = validated_results.get('results', {}).get('fps', {})
+    if fps_data.get('status') != 'completed' or not fps_data.get('configurations'):
+        return []
+
+    best = {}
+    for config_data in fps_data['configurations'].values():
+        category = (config_data.get('resolution'), config_data.get('quality'))
+        fps = config_data.get('average_fps', 0)
+        if fps > 0 and is_valid_category(*category) and fps > best.get(category, {}).get('average_fps', 0):
+            best[category] = config_data
+
+    return [
+        ConfigurationResult(
+            resolution=resolution,
+            quality=quality,
+            fps_avg=config_data['average_fps'],
+            fps_min=config_data.get('min_fps', 0.0),
+            fps_max=config_data.get('max_fps', 0.0)
+        )
+        for (resolution, quality), config_data in best.items()
+    ]
@@ -0,0 +1,120 @@
+"""
+PiggyBankPC Leaderboard - Analytics Event Retention
+Raw analytics_events older than ANALYTICS_RETENTION_DAYS are moved out of the
+database into gzip-compressed JSON-lines archives, one file per month:
+ANALYTICS_ARCHIVE_FOLDER/analytics-<YYYY-MM>.jsonl.gz
+
+Events are counted into analytics_rollups as they are written, so pruning never
+loses chart history; the cutoff is always a midnight, so no day is left half
+pruned. Each batch is appended (and fsynced) to its archive before it is
+deleted, in a transaction of its own, so the write lock is only ever held for
+one small DELETE. A crash between the two archives a batch twice - every
+line carries the event id, so readers can drop the repeats
+"""
+
+import gzip
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from flask import current_app
+from sqlalchemy import delete, func, select
+from models import db, AnalyticsEvent
+from utils.analytics import bucket_start
+
+
+# Events per archive-and-delete transaction
+PRUNE_BATCH_SIZE = 500
+
+# Pause between batches, letting waiting writers take the lock
+PRUNE_PAUSE_SECONDS = 0.05
+
+
+def archive_root(root=None):
+    """Directory holding the monthly archives (defaults to ANALYTICS_ARCHIVE_FOLDER)"""
+    return Path(root) if root else Path(current_app.config['ANALYTICS_ARCHIVE_FOLDER'])
+
+
+def archive_path(month, root=None):
+    """Archive file for a 'YYYY-MM' month"""
+    return archive_root(root) / f"analytics-{month}.jsonl.gz"
+
+
+def _append(path, events):
+    """Append events to an archive as a new gzip member, durably"""
+    with open(path, 'ab') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='ab') as archive:
+            for event in events:
+                line = dict(event, created_at=event['created_at'].isoformat())
+                archive.write(json.dumps(line).encode() + b'\n')
+        raw.flush()
+        os.fsync(raw.fileno())
+
+
+def read_archive(month, root=None):
+    """Yield the events archived for a 'YYYY-MM' month, oldest first"""
+    path = archive_path(month, root)
+    if not path.exists():
+        return
+    with gzip.open(path, 'rt', encoding='utf-8') as archive:
+        for line in archive:
+            yield json.loads(line)
+
+
+def prune_events(retention_days=None, root=None, batch_size=PRUNE_BATCH_SIZE,
+                 pause=PRUNE_PAUSE_SECONDS, dry_run=False, now=None):
+    """
+    Archive and delete events older than the retention period
+
+    Args:
+        retention_days: Days of raw events to keep (defaults to ANALYTICS_RETENTION_DAYS)
+        root: Archive directory (defaults to ANALYTICS_ARCHIVE_FOLDER)
+        dry_run: Only count what would be pruned
+
+    Returns:
+        dict: {'archived': events moved, 'batches': transactions, 'months': archive months written}
+    """
+    if retention_days is None:
+        retention_days = current_app.config['ANALYTICS_RETENTION_DAYS']
+    # Cut at midnight, so the oldest remaining day keeps all of its events and
+    # rebuild_rollups() can recount it exactly
+    cutoff = bucket_start((now or datetime.utcnow()) - timedelta(days=retention_days), 'day')
+    expired = AnalyticsEvent.created_at < cutoff
+
+    stats = {'archived': 0, 'batches': 0, 'months': set()}
+    if dry_run:
+        stats['archived'] = db.session.query(func.count(AnalyticsEvent.id)).filter(expired).scalar()
+        return stats
+
+    root = archive_root(root)
+    root.mkdir(parents=True, exist_ok=True)
+
+    # Oldest first, straight off the created_at index
+    oldest = select(AnalyticsEvent.__table__).where(expired).order_by(
+        AnalyticsEvent.created_at, AnalyticsEvent.id
+    ).limit(batch_size)
+
+    while True:
+        events = db.session.execute(oldest).mappings().all()
+        if not events:
+            break
+
+        by_month = {}
+        for event in events:
+            by_month.setdefault(event['created_at'].strftime('%Y-%m'), []).append(event)
+        for month, month_events in by_month.items():
+            _append(archive_path(month, root), month_events)
+            stats['months'].add(month)
+
+        db.session.execute(delete(AnalyticsEvent).where(AnalyticsEvent.id.in_([e['id'] for e in events])))
+        db.session.commit()
+
+        stats['archived'] += len(events)
+        stats['batches'] += 1
+        if len(events) < batch_size:
+            break
+        time.sleep(pause)
+
+    return stats
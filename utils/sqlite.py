@@ -0,0 +1,150 @@
+"""
+PiggyBankPC Leaderboard - SQLite Engine Profile
+Tunes SQLite for several gunicorn workers (plus the job workers) sharing one
+database file:
+
+- every new connection gets the SQLITE_PRAGMAS profile (WAL, busy_timeout, ...)
+- reads go to a separate query_only connection pool until the transaction makes
+  its first write, so requests that only read never touch the writer pool
+- write transactions open with BEGIN IMMEDIATE, taking the write lock up front
+  where waiting for it is safe (rather than failing mid-transaction when a
+  read snapshot can't be upgraded), and retry the BEGIN with backoff if the
+  lock is still busy after busy_timeout
+"""
+
+import random
+import time
+
+from flask import current_app, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.sql.elements import TextClause
+
+
+# app.extensions key for the read pool's engine
+READ_ENGINE = 'sqlite_read_engine'
+
+# Session.info flag: this transaction has written, so it stays on the writer
+WRITING = 'sqlite_writing'
+
+# Only the writer may switch the database's journal mode
+WRITER_ONLY_PRAGMAS = ('journal_mode',)
+
+# First retry waits about this long; each further retry doubles it
+RETRY_BACKOFF = 0.05
+
+
+def is_file_database(uri):
+    """True for a SQLite database in a file (a read pool can't share :memory:)"""
+    url = make_url(uri)
+    return (
+        url.get_backend_name() == 'sqlite' and
+        url.database not in (None, '', ':memory:') and
+        url.query.get('mode') != 'memory'
+    )
+
+
+def is_locked_error(error):
+    """True if an OperationalError is SQLite's 'database is locked' / busy"""
+    message = str(getattr(error, 'orig', error)).lower()
+    return 'database is locked' in message or 'database is busy' in message
+
+
+def _is_read(clause):
+    """True for statements that can run on the query_only read pool"""
+    if isinstance(clause, TextClause):
+        return clause.text.lstrip()[:6].upper() == 'SELECT'
+    return bool(clause is not None and getattr(clause, 'is_select', False))
+
+
+def _apply_pragmas(dbapi_connection, pragmas):
+    cursor = dbapi_connection.cursor()
+    for name, value in pragmas.items():
+        cursor.execute(f"PRAGMA {name} = {value}")
+    cursor.close()
+
+
+def begin_immediate(connection, retries):
+    """
+    Open a write transaction, retrying with jittered exponential backoff while
+    the database stays locked - safe to repeat, nothing has run in it yet
+    """
+    for attempt in range(retries + 1):
+        try:
+            connection.exec_driver_sql('BEGIN IMMEDIATE')
+            return
+        except OperationalError as e:
+            if attempt == retries or not is_locked_error(e):
+                raise
+            time.sleep(RETRY_BACKOFF * 2 ** attempt * random.uniform(0.5, 1.5))
+
+
+def init_sqlite(app, engine):
+    """
+    Apply the engine profile to an app's (not yet connected) SQLite engine
+    Non-SQLite databases are left alone
+
+    Args:
+        app: Flask app (reads SQLITE_PRAGMAS, SQLITE_READ_POOL, SQLITE_WRITE_RETRIES)
+        engine: The app's default engine, before its first connection
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    pragmas = dict(app.config.get('SQLITE_PRAGMAS') or {})
+    use_read_pool = app.config.get('SQLITE_READ_POOL') and is_file_database(str(engine.url))
+    retries = app.config.get('SQLITE_WRITE_RETRIES', 0)
+
+    @event.listens_for(engine, 'connect')
+    def _connect_writer(dbapi_connection, connection_record):
+        _apply_pragmas(dbapi_connection, pragmas)
+        if use_read_pool:
+            # We issue BEGIN ourselves (see _begin_writer) instead of pysqlite's deferred BEGIN
+            dbapi_connection.isolation_level = None
+
+    if not use_read_pool:
+        return
+
+    @event.listens_for(engine, 'begin')
+    def _begin_writer(connection):
+        begin_immediate(connection, retries)
+
+    read_engine = create_engine(engine.url, **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    read_pragmas = {name: value for name, value in pragmas.items() if name not in WRITER_ONLY_PRAGMAS}
+
+    @event.listens_for(read_engine, 'connect')
+    def _connect_reader(dbapi_connection, connection_record):
+        _apply_pragmas(dbapi_connection, dict(read_pragmas, query_only='ON'))
+        # Autocommit: each read sees the latest commit, as pysqlite's reads outside a
+        # write transaction always have - a long-lived session never holds a stale snapshot
+        dbapi_connection.isolation_level = None
+
+    app.extensions[READ_ENGINE] = read_engine
+
+
+class RoutingSession(Session):
+    """
+    Session that reads from the SQLite read pool (when the app has one) until
+    its transaction first writes, then stays on the writer until commit/rollback
+    so the transaction sees its own changes
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self.info.get(WRITING) and has_app_context():
+            read_engine = current_app.extensions.get(READ_ENGINE)
+            if read_engine is not None:
+                if _is_read(clause):
+                    return read_engine
+                # Flushes, DML and session.connection() all arrive here
+                self.info[WRITING] = True
+
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_transaction_end')
+def _end_write(session, transaction):
+    """Back to the read pool once the outermost transaction is over"""
+    if transaction.parent is None:
+        session.info.pop(WRITING, None)
@@ -0,0 +1,113 @@
+"""
+PiggyBankPC Leaderboard - Submission Statistics
+All leaderboard/home page statistics for a (category, time window) come from a
+single aggregate query, cached until a submission is added, changed or deleted
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, event, func, inspect
+from models import db, ConfigurationResult, Submission
+from utils.cache import bump_version, get_cache
+
+
+# Version counter bumped on every submission change that affects the stats
+STATS_VERSION = 'submission_stats'
+
+# Time windows (days) - matches the leaderboard 'time' filter
+TIME_WINDOWS = {
+    'week': 7,
+    'month': 30,
+}
+
+# Windowed stats (and the home page's "this week" figure) move with the clock,
+# so cached entries also expire after this many seconds
+STATS_TTL = 60
+
+# Submission columns the stats depend on (per-category results are only ever
+# written together with their submission)
+STATS_COLUMNS = (
+    'verified', 'published', 'user_id', 'fps_avg', 'ai_tokens_per_sec',
+    'fps_resolution', 'fps_quality', 'submission_date',
+)
+
+
+def compute_submission_stats(resolution=None, quality=None, time_period='all'):
+    """
+    Compute stats for published submissions in one aggregate query
+
+    Args:
+        resolution, quality: Category filter (both or neither)
+        time_period: 'all', 'week' or 'month'
+
+    Returns:
+        dict: total_submissions, unique_users, avg_fps, avg_tokens, week_submissions
+    """
+    now = datetime.utcnow()
+    week_ago = now - timedelta(days=TIME_WINDOWS['week'])
+
+    # In a category, FPS is that category's result (one per submission)
+    in_category = bool(resolution and quality)
+    fps_column = ConfigurationResult.fps_avg if in_category else Submission.fps_avg
+
+    query = db.session.query(
+        func.count(Submission.id),
+        func.count(func.distinct(Submission.user_id)),
+        func.avg(fps_column),
+        func.avg(Submission.ai_tokens_per_sec),
+        func.sum(case((Submission.submission_date >= week_ago, 1), else_=0))
+    ).filter(
+        Submission.verified == True,
+        Submission.published == True
+    )
+
+    if in_category:
+        query = query.join(
+            ConfigurationResult, ConfigurationResult.submission_id == Submission.id
+        ).filter(
+            ConfigurationResult.resolution == resolution,
+            ConfigurationResult.quality == quality
+        )
+
+    if time_period in TIME_WINDOWS:
+        query = query.filter(Submission.submission_date >= now - timedelta(days=TIME_WINDOWS[time_period]))
+
+    total, unique_users, avg_fps, avg_tokens, week_submissions = query.one()
+
+    return {
+        'total_submissions': total,
+        'unique_users': unique_users,
+        'avg_fps': round(avg_fps or 0, 1),
+        'avg_tokens': round(avg_tokens or 0, 1),
+        'week_submissions': week_submissions or 0,
+    }
+
+
+def get_submission_stats(resolution=None, quality=None, time_period='all'):
+    """Cached compute_submission_stats - one version read on a hit"""
+    if time_period not in TIME_WINDOWS:
+        time_period = 'all'
+
+    return get_cache(STATS_VERSION).get_or_compute(
+        (resolution, quality, time_period),
+        lambda: compute_submission_stats(resolution, quality, time_period),
+        ttl=STATS_TTL
+    )
+
+
+def _affects_stats(submission):
+    state = inspect(submission)
+    return any(state.attrs[column].history.has_changes() for column in STATS_COLUMNS)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _bump_stats_version(session, flush_context):
+    """Invalidate cached stats when submissions are inserted, published/edited or deleted"""
+    changed = (
+        any(isinstance(obj, Submission) for obj in session.new) or
+        any(isinstance(obj, Submission) for obj in session.deleted) or
+        any(isinstance(obj, Submission) and _affects_stats(obj) for obj in session.dirty)
+    )
+
+    if changed:
+        bump_version(STATS_VERSION, connection=session.connection())
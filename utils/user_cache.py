@@ -0,0 +1,121 @@
+"""
+PiggyBankPC Leaderboard - Session User Cache
+Flask-Login loads the logged-in user on every authenticated request. Each web
+worker keeps a detached copy of recently loaded users for USER_CACHE_TTL
+seconds and merges it into the request's session without a query.
+
+Every cached copy is tagged with the 'users' version counter (utils.cache),
+which is bumped in the same transaction as any ORM update or delete of a user
+(admin toggle/delete, email verification, rehash at login). A worker re-reads
+the counter at most every USER_CACHE_VERSION_TTL seconds and drops copies
+tagged with an older version, so a change made in one worker reaches every
+other worker within that interval - and a cache hit costs no query at all.
+The worker making the change evicts its own copy straight away
+"""
+
+import threading
+import time
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import make_transient_to_detached
+from models import db, User
+from utils.cache import bump_version, get_version
+
+
+# app.extensions key for the app's cache
+USER_CACHE = 'user_cache'
+
+# Version counter bumped whenever a user row changes
+USERS_VERSION = 'users'
+
+
+class UserCache:
+    """Per-worker {user_id: detached User} with a TTL, tagged with the users version"""
+
+    def __init__(self, ttl=15, version_ttl=1):
+        self.ttl = ttl
+        self.version_ttl = version_ttl
+        self._entries = {}
+        self._version = None
+        self._version_expires = 0
+        self._lock = threading.Lock()
+
+    def version(self):
+        """The users version, read from the database at most every version_ttl seconds"""
+        now = time.monotonic()
+        if self._version is None or now >= self._version_expires:
+            version = get_version(USERS_VERSION)
+            with self._lock:
+                self._version = version
+                self._version_expires = now + self.version_ttl
+        return self._version
+
+    def get(self, user_id, version):
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires, entry_version, user = entry
+        if entry_version != version or time.monotonic() >= expires:
+            self.forget(user_id)
+            return None
+        return user
+
+    def put(self, user, version):
+        # A copy of the column values only - the cached object never joins a session
+        snapshot = User(**{column.key: getattr(user, column.key) for column in User.__table__.columns})
+        make_transient_to_detached(snapshot)
+        with self._lock:
+            self._entries[user.id] = (time.monotonic() + self.ttl, version, snapshot)
+
+    def forget(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+
+def load_session_user(user_id):
+    """
+    The user behind a session, from this worker's cache when it is still current
+
+    Returns:
+        User: Attached to the current session, or None if the user doesn't exist
+    """
+    cache = current_app.extensions.get(USER_CACHE)
+    if cache is None or not cache.ttl:
+        return db.session.get(User, user_id)
+
+    # Read before the row, so a copy is never tagged newer than its contents
+    version = cache.version()
+
+    cached = cache.get(user_id, version)
+    if cached is not None:
+        # load=False: attach a copy as-is, no SELECT
+        return db.session.merge(cached, load=False)
+
+    user = db.session.get(User, user_id)
+    if user is not None:
+        cache.put(user, version)
+    return user
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate(mapper, connection, target):
+    # The bump commits (or rolls back) with the change itself, so no worker can
+    # see the new version with the old row
+    bump_version(USERS_VERSION, connection=connection)
+
+    cache = current_app.extensions.get(USER_CACHE) if has_app_context() else None
+    if cache is not None:
+        cache.forget(target.id)
+
+
+def init_user_cache(app):
+    """
+    Create the app's session user cache
+    (reads USER_CACHE_TTL, 0 disables it, and USER_CACHE_VERSION_TTL)
+    """
+    app.extensions[USER_CACHE] = UserCache(
+        ttl=app.config.get('USER_CACHE_TTL', 15),
+        version_ttl=app.config.get('USER_CACHE_VERSION_TTL', 1)
+    )
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+PiggyBankPC Leaderboard - Background Job Worker
+Runs the post-upload pipeline (diagnostics, improvement tracking, achievements)
+from the jobs table. Start alongside gunicorn:
+
+    python worker.py                # 2 worker processes
+    python worker.py --workers 4
+    python worker.py --once         # drain the queue and exit (cron / debugging)
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+
+# Seconds to sleep when the queue is empty
+POLL_INTERVAL = 1.0
+
+# Seconds between sweeps for jobs left 'running' by a worker that died
+STALE_CHECK_INTERVAL = 60.0
+
+
+def work(worker_number, once=False, poll_interval=POLL_INTERVAL, stale_check_interval=STALE_CHECK_INTERVAL):
+    """
+    Worker process loop - claim, run, repeat until SIGTERM/SIGINT
+    Every stale_check_interval seconds the loop also re-queues jobs whose worker
+    died mid-run, so they don't wait for the next worker restart
+    """
+    from app import create_app
+    from models import db
+    from utils.jobs import claim_job, run_job, release_stale_jobs
+    import utils.pipeline  # noqa: F401 - registers the pipeline job handlers
+
+    app = create_app()
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:{worker_number}"
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    with app.app_context():
+        app.logger.info(f"👷 Job worker {worker_id} started")
+        next_stale_check = 0.0
+
+        while not stopping:
+            try:
+                if time.monotonic() >= next_stale_check:
+                    released = release_stale_jobs()
+                    if released:
+                        app.logger.warning(f"Job worker {worker_id} re-queued {released} stale job(s)")
+                    next_stale_check = time.monotonic() + stale_check_interval
+
+                job = claim_job(worker_id)
+                if job is not None:
+                    run_job(job)
+                elif once:
+                    break
+                else:
+                    time.sleep(poll_interval)
+            except Exception as e:
+                # Lost the database (locked, restarted...) - back off and keep going
+                db.session.rollback()
+                app.logger.error(f"Job worker {worker_id} error: {e}")
+                time.sleep(poll_interval)
+            finally:
+                db.session.remove()
+
+        app.logger.info(f"👷 Job worker {worker_id} stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='PiggyBankPC background job worker')
+    parser.add_argument('--workers', type=int, default=2, help='Number of worker processes')
+    parser.add_argument('--once', action='store_true', help='Drain the queue and exit')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(processName)s %(message)s')
+
+    if args.workers <= 1:
+        work(0, once=args.once)
+        return
+
+    processes = [
+        multiprocessing.Process(target=work, args=(number, args.once), name=f'job-worker-{number}')
+        for number in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+
+    def forward(signum, frame):
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+
+    for process in processes:
+        process.join()
+
+
+if __name__ == '__main__':
+    main()